@@ -1,24 +1,60 @@
 from django.contrib import admin
+from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.admin import UserAdmin
 from modeltranslation.admin import TranslationAdmin, TranslationTabularInline
 from .models import (
     Proceedings, User, Conference, Submission, GalleryMedia,
-    SubmissionVersion, Document, ContactPerson, CommitteeMember
+    SubmissionVersion, Document, ContactPerson, CommitteeMember, OutboxEmail, FormatRules, Keyword, ReviewAssignment,
+    ArchivePack,
 )
 from .services import create_conference_proceedings
+from .search import search_submissions
+from .pagination import EstimatedCountPaginator
+
+# Тексты страниц конференции (все языки) не нужны в списках, где конференция — только название
+CONFERENCE_TEXT_FIELDS = tuple(
+    field.name for field in Conference._meta.concrete_fields if isinstance(field, models.TextField)
+)
 
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
     list_display = ('username', 'email', 'last_name', 'first_name', 'organization', 'role')
+    list_filter = UserAdmin.list_filter + ('role',)
+    # Email — точное совпадение, остальное — по началу: так поиск (и автодополнение пользователя
+    # в заявках) идет по индексам из миграции 0023, а не перебором всей таблицы через LIKE '%...%'
+    search_fields = ('=email', '^username', '^last_name', '^first_name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ('expertise',)
     fieldsets = UserAdmin.fieldsets + (
-        ('Доп. информация', {'fields': ('organization', 'role')}),
+        ('Доп. информация', {'fields': ('organization', 'role', 'language')}),
+        ('Рецензирование', {'fields': ('expertise', 'review_capacity')}),
     )
     add_fieldsets = UserAdmin.add_fieldsets + (
         ('Доп. информация', {'fields': ('organization', 'role')}),
     )
 
 
+@admin.register(Keyword)
+class KeywordAdmin(admin.ModelAdmin):
+    search_fields = ('name',)
+
+
+class FormatRulesInline(admin.StackedInline):
+    model = FormatRules
+    can_delete = True
+    fieldsets = (
+        (None, {'fields': (('max_pages', 'min_words', 'max_words'), ('abstract_min_words', 'abstract_max_words'))}),
+        ('Поля, мм', {'fields': (('margin_top', 'margin_bottom', 'margin_left', 'margin_right'),)}),
+        ('Шрифт', {'fields': (('font_name', 'font_size'),)}),
+        (None, {'fields': ('required_headings',)}),
+    )
+
+
 @admin.register(Conference)
 class ConferenceAdmin(TranslationAdmin):
     list_display = ('title', 'start_date', 'is_active', 'slug')
@@ -26,6 +62,7 @@ class ConferenceAdmin(TranslationAdmin):
     search_fields = ('title', 'description')
     prepopulated_fields = {'slug': ('title',)}
     actions = ['make_proceedings']
+    inlines = [FormatRulesInline]
 
     class Media:
         js = (
@@ -42,6 +79,9 @@ class ConferenceAdmin(TranslationAdmin):
             'fields': (
             'title', 'short_title', 'slug', 'description', 'location', 'location_description', 'poster', 'is_active')
         }),
+        ('Рецензирование', {
+            'fields': ('reviews_per_submission',)
+        }),
         ('Даты', {
             'fields': ('start_date', 'registration_deadline', 'notification_date')
         }),
@@ -64,10 +104,47 @@ class ConferenceAdmin(TranslationAdmin):
 class SubmissionVersionInline(admin.TabularInline):
     model = SubmissionVersion
     extra = 0
-    readonly_fields = ('version_number', 'author_comment', 'created_at')
-    fields = ('version_number', 'file', 'author_comment', 'admin_comment', 'created_at')
+    readonly_fields = (
+        'version_number', 'author_comment', 'created_at', 'get_word_count', 'get_page_count', 'get_format_status'
+    )
+    fields = (
+        'version_number', 'file', 'author_comment', 'admin_comment', 'created_at',
+        'get_word_count', 'get_page_count', 'get_format_status',
+    )
     can_delete = False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('manuscript', 'format_report').defer('manuscript__text')
+
+    def get_word_count(self, obj):
+        return obj.manuscript.word_count if obj.manuscript else None
+
+    get_word_count.short_description = "Слов"
+
+    def get_page_count(self, obj):
+        return obj.manuscript.page_count if obj.manuscript else None
+
+    get_page_count.short_description = "Страниц"
+
+    def get_format_status(self, obj):
+        report = getattr(obj, 'format_report', None)
+        if report is None:
+            return None
+        if report.passed is None:
+            return report.error
+        return "Соответствует" if report.passed else "; ".join(
+            f"{check['label']}: {check['detail']}" for check in report.failed_checks
+        )
+
+    get_format_status.short_description = "Оформление"
+
+
+class ReviewAssignmentInline(admin.TabularInline):
+    model = ReviewAssignment
+    extra = 0
+    autocomplete_fields = ('reviewer',)
+    readonly_fields = ('score', 'created_at')
+
 
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
@@ -75,8 +152,12 @@ class SubmissionAdmin(admin.ModelAdmin):
     list_filter = ('status', 'conference')
     search_fields = ('title', 'user__last_name', 'user__email')
     list_editable = ('status',)
+    list_select_related = ('user', 'conference')
+    autocomplete_fields = ('user', 'conference')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-    inlines = [SubmissionVersionInline]
+    inlines = [SubmissionVersionInline, ReviewAssignmentInline]
     fieldsets = (
         ('Основная информация', {
             'fields': ('user', 'conference', 'status', 'title', 'authors_list', 'abstract_text', 'keywords')
@@ -86,10 +167,29 @@ class SubmissionAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Полнотекстовый индекс вместо icontains по каждому полю. Email автора не входит
+        # в поисковый текст заявки: адрес ищется обычным поиском по search_fields
+        if not search_term:
+            return queryset, False
+        if '@' in search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return search_submissions(queryset, search_term), False
+
+    def get_queryset(self, request):
+        # Подзапрос, а не Count с GROUP BY: считается только для строк текущей страницы
+        version_count = SubmissionVersion.objects.filter(submission=OuterRef('pk')).order_by().values(
+            'submission'
+        ).annotate(count=Count('id')).values('count')
+        return super().get_queryset(request).annotate(
+            version_count=Coalesce(Subquery(version_count), 0)
+        ).defer('search_document', *(f'conference__{name}' for name in CONFERENCE_TEXT_FIELDS))
+
     def get_version_count(self, obj):
-        return obj.versions.count()
+        return obj.version_count
 
     get_version_count.short_description = "Версий"
+    get_version_count.admin_order_field = 'version_count'
 
 @admin.register(Proceedings)
 class ProceedingsAdmin(admin.ModelAdmin):
@@ -97,6 +197,37 @@ class ProceedingsAdmin(admin.ModelAdmin):
     list_filter = ('conference',)
     readonly_fields = ('created_at',)
 
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'recipient', 'language', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind', 'language')
+    search_fields = ('recipient',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    raw_id_fields = ('submission',)
+    actions = ['retry']
+
+    @admin.action(description="Отправить повторно")
+    def retry(modeladmin, request, queryset):
+        updated = queryset.exclude(status='sent').update(status='pending', next_attempt_at=timezone.now())
+        modeladmin.message_user(request, f"Писем поставлено в очередь: {updated}.")
+
+
+@admin.register(ArchivePack)
+class ArchivePackAdmin(admin.ModelAdmin):
+    """Только просмотр: архивы создает manage.py archive_conference."""
+    list_display = ('file_name', 'conference', 'file_count', 'original_bytes', 'size', 'created_at')
+    list_filter = ('conference',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(GalleryMedia)
 class GalleryMediaAdmin(TranslationAdmin):
     list_display = ('conference', 'caption', 'is_video', 'file')
@@ -1,17 +1,18 @@
 from django.http import JsonResponse
+from django.urls import reverse
 from .models import Conference
 
-def active_conferences_api(request):
-    conferences = Conference.objects.filter(is_active=True)
+async def active_conferences_api(request):
+    conferences = Conference.objects.for_language('description').filter(is_active=True)
     
     data = []
-    for conf in conferences:
+    async for conf in conferences:
         data.append({
             "title": conf.title,
             "short_title": conf.short_title,
-            "description": conf.description,
+            "description": conf.description_html,
             "poster": request.build_absolute_uri(conf.poster.url) if conf.poster else None,
-	    "url": request.build_absolute_uri('/')
+            "url": request.build_absolute_uri(reverse('conferences:detail', args=[conf.slug])),
         })
     
     return JsonResponse(data, safe=False, json_dumps_params={'ensure_ascii': False})
@@ -5,3 +5,10 @@ class ConferencesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'conferences'
     verbose_name = "Конференции"
+
+    def ready(self):
+        from . import conditional, page_cache, routing, search
+        conditional.connect_signals()
+        page_cache.connect_signals()
+        routing.connect_signals()
+        search.connect_signals(self)
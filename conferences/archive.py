@@ -0,0 +1,396 @@
+"""
+Холодный архив медиафайлов прошедших конференций (manage.py archive_conference).
+
+Файлы конференции (итоговые PDF, версии работ, галерея, документы, сборник)
+переписываются в файлы архива в ARCHIVE_ROOT и удаляются из MEDIA_ROOT. Формат
+файла архива:
+
+    KZPACK01 | блоки | индекс (JSON, zlib) | смещение индекса, длина индекса, KZPACK01
+
+Каждый файл режется на блоки по BLOCK_SIZE байт, блок сжимается zlib отдельно
+(или хранится как есть, если почти не сжимается). Таблица смещений блоков
+записывается и в индекс в конце архива, и в ArchivedFile, поэтому чтение
+произвольного диапазона распаковывает только нужные блоки. Индекс в самом
+архиве нужен, чтобы восстановить записи в БД по одним файлам (read_index).
+
+ArchiveAwareStorage открывает перенесенные файлы из архива, а media_view отдает
+их по прежним адресам /media/... с поддержкой Range.
+"""
+import io
+import os
+import re
+import json
+import zlib
+import struct
+import hashlib
+import logging
+import mimetypes
+
+from django.conf import settings
+from django.core.files.base import File
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from django.views.static import serve
+
+from .models import (
+    ArchivedFile, ArchivePack, Document, GalleryMedia, Proceedings, Submission, SubmissionVersion,
+)
+from .storage import BLOB_DIR
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'KZPACK01'
+FOOTER = struct.Struct('<QQ8s')
+BLOCK_SIZE = 1024 * 1024
+COMPRESS_LEVEL = 6
+# Блок, который сжимается меньше чем на эту долю (JPEG, MP4, PDF с картинками), хранится как есть
+MIN_SAVING = 0.03
+# Примерный предел исходного объема одного файла архива
+PACK_LIMIT = 1024 * 1024 * 1024
+STREAM_CHUNK = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class ArchivedFileIO(io.RawIOBase):
+    """Чтение одного файла из архива с произвольным перемещением; распаковывает только нужные блоки."""
+
+    def __init__(self, path, size, block_size, blocks):
+        self._path = path
+        self._size = size
+        self._block_size = block_size
+        self._blocks = blocks
+        self._handle = None
+        self._position = 0
+        self._cached_index = None
+        self._cached = b''
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f'недопустимое значение whence: {whence}')
+        if position < 0:
+            raise ValueError('отрицательная позиция')
+        self._position = position
+        return position
+
+    def _block(self, index):
+        if index != self._cached_index:
+            if self._handle is None:
+                self._handle = open(self._path, 'rb')
+            offset, length, compressed = self._blocks[index]
+            self._handle.seek(offset)
+            data = self._handle.read(length)
+            if len(data) != length:
+                raise ArchiveError(f'{self._path}: блок обрезан')
+            try:
+                self._cached = zlib.decompress(data) if compressed else data
+            except zlib.error as e:
+                raise ArchiveError(f'{self._path}: блок поврежден ({e})') from e
+            self._cached_index = index
+        return self._cached
+
+    def readinto(self, buffer):
+        if self._position >= self._size:
+            return 0
+        index, start = divmod(self._position, self._block_size)
+        data = self._block(index)
+        count = min(len(buffer), len(data) - start, self._size - self._position)
+        buffer[:count] = data[start:start + count]
+        self._position += count
+        return count
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        super().close()
+
+
+def _reader(archived):
+    return ArchivedFileIO(archived.pack.path, archived.size, archived.block_size, archived.blocks)
+
+
+def open_archived(archived):
+    """Файл из архива как django File (для FieldFile.open и storage.open)."""
+    return File(io.BufferedReader(_reader(archived), buffer_size=STREAM_CHUNK), name=archived.name)
+
+
+def conference_files(conference):
+    """
+    Медиафайлы конференции, которые еще лежат в MEDIA_ROOT: [(имя, хранилище)].
+    Содержимое версий, на которое ссылаются работы других конференций, остается на месте.
+    """
+    files = {}
+
+    def add(field_files):
+        for field_file in field_files:
+            if field_file and field_file.name not in files:
+                files[field_file.name] = field_file.storage
+
+    submissions = Submission.objects.filter(conference=conference)
+    add(submission.final_file for submission in submissions.only('final_file').exclude(final_file=''))
+    shared = set(
+        SubmissionVersion.objects.exclude(submission__conference=conference).values_list('file', flat=True)
+    )
+    add(
+        version.file
+        for version in SubmissionVersion.objects.filter(submission__conference=conference).only('file')
+        if version.file.name not in shared
+    )
+    add(item.file for item in GalleryMedia.objects.filter(conference=conference).only('file'))
+    add(item.file for item in Document.objects.filter(conference=conference).only('file'))
+    add(item.file for item in Proceedings.objects.filter(conference=conference).only('file'))
+
+    archived = set(ArchivedFile.objects.filter(name__in=list(files)).values_list('name', flat=True))
+    return [
+        (name, storage) for name, storage in sorted(files.items())
+        if name not in archived and storage.on_disk(name)
+    ]
+
+
+def _write_file(target, source):
+    """Дописывает файл блоками в открытый архив; возвращает (размер, sha256, таблица блоков)."""
+    digest = hashlib.sha256()
+    blocks = []
+    size = 0
+    while True:
+        data = source.read(BLOCK_SIZE)
+        if not data:
+            break
+        digest.update(data)
+        size += len(data)
+        compressed = zlib.compress(data, COMPRESS_LEVEL)
+        stored, is_compressed = (compressed, True) if len(compressed) < len(data) * (1 - MIN_SAVING) else (data, False)
+        blocks.append([target.tell(), len(stored), is_compressed])
+        target.write(stored)
+    return size, digest.hexdigest(), blocks
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_pack(path, files):
+    """Записывает файл архива; возвращает индекс [{name, size, sha256, block_size, blocks}]."""
+    index = []
+    partial = path + '.part'
+    try:
+        with open(partial, 'wb') as target:
+            target.write(MAGIC)
+            for name, storage in files:
+                with storage.open(name, 'rb') as source:
+                    size, sha256, blocks = _write_file(target, source)
+                index.append({'name': name, 'size': size, 'sha256': sha256, 'block_size': BLOCK_SIZE, 'blocks': blocks})
+            index_offset = target.tell()
+            packed_index = zlib.compress(json.dumps(index, ensure_ascii=False).encode(), 9)
+            target.write(packed_index)
+            target.write(FOOTER.pack(index_offset, len(packed_index), MAGIC))
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(partial, path)
+        _fsync_dir(os.path.dirname(path))
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return index
+
+
+def read_index(path):
+    """Индекс файла архива (для проверки и восстановления записей ArchivedFile)."""
+    with open(path, 'rb') as f:
+        f.seek(0, io.SEEK_END)
+        end = f.tell()
+        if end < len(MAGIC) + FOOTER.size:
+            raise ArchiveError(f'{path}: слишком короткий файл')
+        f.seek(0)
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ArchiveError(f'{path}: не файл архива')
+        f.seek(end - FOOTER.size)
+        index_offset, index_length, magic = FOOTER.unpack(f.read(FOOTER.size))
+        if magic != MAGIC or index_offset + index_length + FOOTER.size != end:
+            raise ArchiveError(f'{path}: поврежден конец файла')
+        f.seek(index_offset)
+        return json.loads(zlib.decompress(f.read(index_length)))
+
+
+def _verify(path, index):
+    for entry in index:
+        digest = hashlib.sha256()
+        with io.BufferedReader(ArchivedFileIO(path, entry['size'], entry['block_size'], entry['blocks'])) as f:
+            for chunk in iter(lambda: f.read(STREAM_CHUNK), b''):
+                digest.update(chunk)
+        if digest.hexdigest() != entry['sha256']:
+            raise ArchiveError(f"{path}: содержимое {entry['name']} не совпадает с исходным")
+
+
+def _delete_hot(files):
+    """Удаляет файлы из MEDIA_ROOT после фиксации транзакции: читать их уже можно из архива."""
+    def delete():
+        for name, storage in files:
+            if storage.on_disk(name):
+                storage.delete(name)
+    transaction.on_commit(delete)
+
+
+def _batches(files):
+    batch, total = [], 0
+    for name, storage in files:
+        size = os.path.getsize(storage.path(name))
+        if batch and total + size > PACK_LIMIT:
+            yield batch
+            batch, total = [], 0
+        batch.append((name, storage))
+        total += size
+    if batch:
+        yield batch
+
+
+def archive_conference(conference):
+    """
+    Переносит медиафайлы конференции в холодный архив и освобождает место в MEDIA_ROOT.
+    Повторный запуск архивирует только файлы, появившиеся после прошлого. Возвращает список ArchivePack.
+    """
+    os.makedirs(settings.ARCHIVE_ROOT, exist_ok=True)
+    packs = []
+    for number, files in enumerate(_batches(conference_files(conference)), start=1):
+        file_name = f"{conference.slug}-{timezone.now():%Y%m%d%H%M%S}-{number}.kzpack"
+        path = os.path.join(settings.ARCHIVE_ROOT, file_name)
+        index = _write_pack(path, files)
+        # Исходные файлы удаляются, только если архив читается и совпадает с ними побайтно
+        try:
+            _verify(path, index)
+            with transaction.atomic():
+                pack = ArchivePack.objects.create(
+                    conference=conference,
+                    file_name=file_name,
+                    size=os.path.getsize(path),
+                    file_count=len(index),
+                    original_bytes=sum(entry['size'] for entry in index),
+                )
+                ArchivedFile.objects.bulk_create([
+                    ArchivedFile(
+                        name=entry['name'], pack=pack, size=entry['size'], sha256=entry['sha256'],
+                        block_size=entry['block_size'], blocks=entry['blocks'],
+                    )
+                    for entry in index
+                ])
+                _delete_hot(files)
+        except BaseException:
+            os.remove(path)
+            raise
+        logger.info(
+            f"Конференция {conference.slug}: {pack.file_count} файлов перенесено в архив {file_name}, "
+            f"{pack.original_bytes} -> {pack.size} байт"
+        )
+        packs.append(pack)
+    return packs
+
+
+def _parse_range(header, size):
+    """
+    (начало, конец включительно) для одного диапазона bytes=...; None — заголовок не разобран
+    или недопустим (first > last) и игнорируется, False — диапазон вне файла (416).
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first and last and int(first) > int(last):
+        return None
+    # В пустом файле нет ни одного байта, любой диапазон невыполним
+    if size == 0:
+        return False
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    first = int(first)
+    if first >= size:
+        return False
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _stream(reader, first, length):
+    with reader:
+        reader.seek(first)
+        while length > 0:
+            chunk = reader.read(min(STREAM_CHUNK, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def media_view(request, path):
+    """
+    /media/<path>: файлы из архива по прежним адресам, с поддержкой Range (видео, PDF).
+    Файлы в MEDIA_ROOT в продакшене отдает веб-сервер, сюда он передает только
+    отсутствующие на диске (try_files $uri @django); при DEBUG они отдаются здесь же.
+    """
+    # Версии работ отдаются только через download_version, с проверкой прав — и из архива, и с диска при DEBUG
+    if path.startswith(f'{BLOB_DIR}/'):
+        raise Http404
+    archived = ArchivedFile.objects.select_related('pack').filter(name=path).first()
+    if archived is None:
+        if settings.DEBUG:
+            return serve(request, path, document_root=settings.MEDIA_ROOT)
+        raise Http404
+
+    etag = f'"{archived.sha256}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    content_type, encoding = mimetypes.guess_type(path)
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': etag,
+        'Content-Type': content_type or 'application/octet-stream',
+    }
+    if encoding:
+        headers['Content-Encoding'] = encoding
+
+    first, last = 0, archived.size - 1
+    status = 200
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range', etag) == etag:
+        byte_range = _parse_range(range_header, archived.size)
+        if byte_range is False:
+            return HttpResponse(status=416, headers={'Content-Range': f'bytes */{archived.size}', 'ETag': etag})
+        if byte_range:
+            first, last = byte_range
+            status = 206
+            headers['Content-Range'] = f'bytes {first}-{last}/{archived.size}'
+
+    length = last - first + 1
+    headers['Content-Length'] = str(length)
+    if request.method == 'HEAD':
+        return HttpResponse(status=status, headers=headers)
+    return StreamingHttpResponse(_stream(_reader(archived), first, length), status=status, headers=headers)
@@ -0,0 +1,266 @@
+"""
+Распределение работ между рецензентами.
+
+Каждой открытой работе (на проверке или на доработке) нужно
+Conference.reviews_per_submission рецензентов. Рецензент не получает свою работу
+и работы авторов из своей организации, а число его открытых назначений во всех
+конференциях не превышает review_capacity. Из допустимых выбирается рецензент
+с наибольшим пересечением ключевых слов работы и его экспертизы, при равенстве —
+наименее загруженный (по доле занятых мест).
+
+Работы обходятся жадно, начиная с тех, у которых меньше всего подходящих
+экспертов; работы без подходящих экспертов — последними. Если свободного допустимого рецензента не осталось, ищется
+увеличивающий путь, как в алгоритмах потоков: поиском в ширину по рецензентам
+находится цепочка переносов уже распределенных в этом проходе работ, которая
+освобождает место. Сохраненные назначения не переставляются, поэтому повторный
+проход только снимает назначения выбывших рецензентов и закрывает пробелы.
+"""
+import logging
+from collections import Counter, defaultdict, deque
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Conference, ReviewAssignment, Submission, User
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ('under_review', 'revision')
+
+
+def normalize_organization(name):
+    return ' '.join((name or '').split()).lower()
+
+
+def solve(submissions, reviewers, existing, per_submission):
+    """
+    Распределение на простых структурах, без обращений к БД.
+
+    submissions: {id работы: (id автора, организация автора, множество id ключевых слов)}
+    reviewers: {id рецензента: (организация, множество id ключевых слов экспертизы, лимит, занято мест)}
+    existing: {id работы: множество id рецензентов} — сохраняемые назначения (уже учтены в «занято»)
+
+    Возвращает ({(id работы, id рецензента): score}, число мест, оставшихся без рецензента).
+    """
+    capacity = {rid: reviewer[2] for rid, reviewer in reviewers.items()}
+    spare = {rid: reviewer[2] - reviewer[3] for rid, reviewer in reviewers.items()}
+    all_reviewers = sorted(reviewers)
+    assigned = defaultdict(set, {sid: set(rids) for sid, rids in existing.items()})
+    # Назначения этого прохода по рецензентам и организациям авторов — только их можно
+    # переносить при поиске увеличивающего пути
+    held = defaultdict(lambda: defaultdict(set))
+    new = {}
+    total_spare = sum(max(free, 0) for free in spare.values())
+
+    by_keyword = defaultdict(list)
+    for rid, (_, expertise, _, _) in reviewers.items():
+        for keyword in expertise:
+            by_keyword[keyword].append(rid)
+
+    def eligible(sid, rid):
+        author_id, organization, _ = submissions[sid]
+        return (
+            rid != author_id
+            and rid not in assigned[sid]
+            and not (organization and reviewers[rid][0] == organization)
+        )
+
+    def score(sid, rid):
+        keywords = submissions[sid][2]
+        return len(keywords & reviewers[rid][1]) / len(keywords) if keywords else 0.0
+
+    def load(rid):
+        return 1 - spare[rid] / capacity[rid]
+
+    def place(sid, rid):
+        nonlocal total_spare
+        assigned[sid].add(rid)
+        held[rid][submissions[sid][1]].add(sid)
+        spare[rid] -= 1
+        total_spare -= 1
+        new[sid, rid] = score(sid, rid)
+
+    def unplace(sid, rid):
+        nonlocal total_spare
+        assigned[sid].discard(rid)
+        held[rid][submissions[sid][1]].discard(sid)
+        spare[rid] += 1
+        total_spare += 1
+        del new[sid, rid]
+
+    # Рецензенты, из которых увеличивающий путь заведомо не найти: все заняты, как и все достижимые из них.
+    # Обычные назначения не меняют связи внутри этого множества, переносы — меняют, поэтому оно
+    # сбрасывается после каждого успешного поиска. Без него при нехватке рецензентов каждая
+    # оставшаяся работа заново обходила бы весь граф.
+    closed = set()
+
+    def augment(sid):
+        """Освобождает место для работы переносами по цепочке рецензентов; True, если удалось."""
+        parent = {rid: None for rid in all_reviewers if eligible(sid, rid)}
+        if closed.issuperset(parent):
+            return False
+        queue = deque(parent)
+        unvisited = [rid for rid in all_reviewers if rid not in parent]
+        while queue and unvisited:
+            rid = queue.popleft()
+            # Работы одной организации допустимы почти для одних и тех же рецензентов — проверяются группой
+            for organization, moved_group in held[rid].items():
+                remaining = []
+                for other in unvisited:
+                    if organization and reviewers[other][0] == organization:
+                        remaining.append(other)
+                        continue
+                    moved = next((moved for moved in moved_group if eligible(moved, other)), None)
+                    if moved is None:
+                        remaining.append(other)
+                        continue
+                    parent[other] = (rid, moved)
+                    if spare[other] <= 0:
+                        queue.append(other)
+                        continue
+                    target = other
+                    while parent[target] is not None:
+                        source, moved_sid = parent[target]
+                        unplace(moved_sid, source)
+                        place(moved_sid, target)
+                        target = source
+                    place(sid, target)
+                    closed.clear()
+                    return True
+                unvisited = remaining
+        closed.update(parent)
+        return False
+
+    overlaps = {}
+    for sid, (_, _, keywords) in submissions.items():
+        counter = Counter()
+        for keyword in keywords:
+            counter.update(by_keyword.get(keyword, ()))
+        overlaps[sid] = counter
+
+    unfilled = 0
+    # Работы без подходящих экспертов подойдут любому рецензенту — они идут последними,
+    # чтобы не занять экспертов, единственных для других работ
+    for sid in sorted(submissions, key=lambda sid: (not overlaps[sid], len(overlaps[sid]), sid)):
+        missing = per_submission - len(assigned[sid])
+        while missing > 0:
+            candidates = [
+                (-overlap, load(rid), rid) for rid, overlap in overlaps[sid].items()
+                if spare[rid] > 0 and eligible(sid, rid)
+            ]
+            if not candidates:
+                candidates = [(load(rid), rid) for rid in all_reviewers if spare[rid] > 0 and eligible(sid, rid)]
+            if candidates:
+                place(sid, min(candidates)[-1])
+            elif not (total_spare > 0 and augment(sid)):
+                break
+            missing -= 1
+        unfilled += missing
+    return new, unfilled
+
+
+def rebalance(conference):
+    """
+    Снимает назначения выбывших рецензентов (роль или активность сняты, лимит уменьшен,
+    появился конфликт интересов) и распределяет работы, которым не хватает рецензентов.
+    Возвращает (снято, назначено, мест без рецензента).
+    """
+    with transaction.atomic():
+        # Параллельный проход по той же конференции превысил бы лимиты рецензентов
+        Conference.objects.select_for_update().get(pk=conference.pk)
+
+        reviewers = {
+            rid: (normalize_organization(organization), set(), capacity)
+            for rid, organization, capacity in User.objects.filter(
+                role='reviewer', is_active=True, review_capacity__gt=0
+            ).values_list('id', 'organization', 'review_capacity')
+        }
+        for rid, keyword_id in User.expertise.through.objects.filter(
+            user_id__in=list(reviewers)
+        ).values_list('user_id', 'keyword_id'):
+            reviewers[rid][1].add(keyword_id)
+
+        submissions = {
+            sid: (author_id, normalize_organization(organization), set())
+            for sid, author_id, organization in Submission.objects.filter(
+                conference=conference, status__in=OPEN_STATUSES
+            ).values_list('id', 'user_id', 'user__organization')
+        }
+        for sid, keyword_id in Submission.keyword_set.through.objects.filter(
+            submission__conference=conference, submission__status__in=OPEN_STATUSES
+        ).values_list('submission_id', 'keyword_id'):
+            submissions[sid][2].add(keyword_id)
+
+        open_assignments = ReviewAssignment.objects.filter(submission__status__in=OPEN_STATUSES)
+        load = Counter(dict(
+            open_assignments.exclude(submission__conference=conference)
+            .values_list('reviewer').annotate(count=Count('id')).values_list('reviewer', 'count')
+        ))
+
+        # Сохраняются старые назначения в пределах лимита; более новые сверх него снимаются
+        released = []
+        existing = defaultdict(set)
+        for assignment_id, sid, rid in open_assignments.filter(submission__conference=conference).order_by(
+            'created_at', 'id'
+        ).values_list('id', 'submission_id', 'reviewer_id'):
+            reviewer = reviewers.get(rid)
+            author_id, organization, _ = submissions[sid]
+            if (reviewer is None or load[rid] >= reviewer[2] or rid == author_id
+                    or (organization and reviewer[0] == organization)):
+                released.append(assignment_id)
+                continue
+            load[rid] += 1
+            existing[sid].add(rid)
+        if released:
+            ReviewAssignment.objects.filter(pk__in=released).delete()
+
+        new, unfilled = solve(
+            submissions,
+            {rid: (organization, expertise, capacity, load[rid])
+             for rid, (organization, expertise, capacity) in reviewers.items()},
+            existing,
+            conference.reviews_per_submission,
+        )
+        ReviewAssignment.objects.bulk_create(
+            [ReviewAssignment(submission_id=sid, reviewer_id=rid, score=score) for (sid, rid), score in new.items()],
+            batch_size=1000,
+        )
+
+    if released or new:
+        logger.info(
+            f"Рецензенты конференции {conference.pk}: назначено {len(new)}, снято {len(released)}, "
+            f"мест без рецензента: {unfilled}"
+        )
+    if unfilled:
+        logger.warning(f"Конференция {conference.pk}: не хватает рецензентов на {unfilled} мест")
+    return len(released), len(new), unfilled
+
+
+def understaffed_submissions():
+    """Открытые работы, которым назначено меньше рецензентов, чем требует конференция."""
+    return Submission.objects.filter(status__in=OPEN_STATUSES).annotate(
+        reviewer_count=Count('review_assignments')
+    ).filter(reviewer_count__lt=F('conference__reviews_per_submission'))
+
+
+def dropped_assignments():
+    """Открытые назначения рецензентов, которые больше не рецензируют."""
+    return ReviewAssignment.objects.filter(submission__status__in=OPEN_STATUSES).filter(
+        ~Q(reviewer__role='reviewer') | Q(reviewer__is_active=False) | Q(reviewer__review_capacity=0)
+    )
+
+
+def pending_conferences():
+    conference_ids = set(understaffed_submissions().values_list('conference_id', flat=True))
+    conference_ids.update(dropped_assignments().values_list('submission__conference_id', flat=True))
+    return Conference.objects.filter(pk__in=conference_ids)
+
+
+def process_pending(batch_size=10, conference=None):
+    """Перераспределяет конференции с пробелами; возвращает число снятых и созданных назначений."""
+    conferences = [conference] if conference else pending_conferences().order_by('id')[:batch_size]
+    changed = 0
+    for item in conferences:
+        released, created, _ = rebalance(item)
+        changed += released + created
+    return changed
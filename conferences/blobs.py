@@ -0,0 +1,177 @@
+"""
+Хранение файлов версий работ: одинаковые загрузки — один файл (DedupStorage),
+версии, замененные более новыми, сжимаются фоновым воркером
+(manage.py compact_submission_files). Он же переносит файлы, загруженные до
+появления хранилища по содержимому (submissions/<id>/<n>.<ext>), и удаляет
+содержимое, на которое больше не ссылается ни одна версия.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from .models import ArchivedFile, FileBlob, SubmissionVersion, file_sha256
+from .storage import BLOB_DIR, blob_name
+
+logger = logging.getLogger(__name__)
+
+# Сжатие, экономящее меньше этой доли, не стоит распаковки при каждом чтении.
+# DOCX — уже zip-архив, xz сокращает его на 5–10 %; старые DOC сжимаются в разы.
+MIN_SAVING = 0.05
+
+
+def _storage():
+    return SubmissionVersion._meta.get_field('file').storage
+
+
+def _delete_unused(names):
+    """Удаляет файлы после фиксации транзакции, если на них не ссылается ни одна версия."""
+    def delete():
+        storage = _storage()
+        used = set(SubmissionVersion.objects.filter(file__in=names).values_list('file', flat=True))
+        for name in set(names) - used:
+            storage.delete(name)
+    transaction.on_commit(delete)
+
+
+def legacy_versions():
+    """Версии, файлы которых еще лежат по старой схеме, вне хранилища по содержимому (и не в архиве)."""
+    return SubmissionVersion.objects.exclude(file='').exclude(file__startswith=f'{BLOB_DIR}/').exclude(
+        file__in=ArchivedFile.objects.values('name')
+    )
+
+
+def latest_versions():
+    return SubmissionVersion.objects.filter(
+        ~Exists(SubmissionVersion.objects.filter(submission=OuterRef('submission'), id__gt=OuterRef('id')))
+    )
+
+
+def pending_packing():
+    """
+    Содержимое, которое есть только у замененных версий и еще не проверялось на сжатие.
+    Перенесенное в холодный архив (conferences/archive.py) уже сжато там.
+    """
+    return FileBlob.objects.filter(packed_at__isnull=True).filter(
+        Exists(SubmissionVersion.objects.filter(file_hash=OuterRef('sha256')))
+    ).exclude(sha256__in=latest_versions().values('file_hash')).exclude(
+        name__in=ArchivedFile.objects.values('name')
+    )
+
+
+def orphan_blobs():
+    return FileBlob.objects.filter(~Exists(SubmissionVersion.objects.filter(file_hash=OuterRef('sha256'))))
+
+
+def move_legacy(version):
+    """
+    Переносит файл версии в хранилище по содержимому; такое же содержимое не копируется.
+    Возвращает False, если файла нет на диске (версия остается как есть).
+    """
+    storage = _storage()
+    old_name = version.file.name
+    if not storage.exists(old_name):
+        logger.warning(f"Файл версии {version.pk} не найден: {old_name}")
+        return False
+    sha256 = version.file_hash or file_sha256(version.file)
+    blob = FileBlob.objects.filter(sha256=sha256).first()
+    if blob is None:
+        with storage.open(old_name, 'rb') as f:
+            # DedupStorage.save сам кладет файл в blobs/<sha>, а если он уже там — возвращает имя
+            name = storage.save(blob_name(sha256, old_name[old_name.rfind('.'):]), f)
+        size = storage.size(name)
+        blob, _ = FileBlob.objects.get_or_create(
+            sha256=sha256, defaults={'name': name, 'size': size, 'stored_size': size}
+        )
+    with transaction.atomic():
+        SubmissionVersion.objects.filter(pk=version.pk).update(file=blob.name, file_hash=sha256)
+        _delete_unused([old_name])
+    logger.info(f"Файл версии {version.pk} перенесен: {old_name} -> {blob.name}")
+    return True
+
+
+def pack(blob):
+    """Сжимает содержимое замененных версий; при малой экономии оставляет файл как есть."""
+    storage = _storage()
+    packed_name, packed_size = storage.pack(blob.name, MIN_SAVING)
+    if packed_name is None:
+        FileBlob.objects.filter(pk=blob.pk).update(packed_at=timezone.now())
+        logger.info(f"{blob.name}: сжатие сэкономило бы слишком мало ({blob.size} -> {packed_size} байт)")
+        return
+    with transaction.atomic():
+        # Под блокировкой строки: версия, загружаемая сейчас, либо уже сохранена и будет
+        # переписана здесь, либо после коммита увидит новое имя (SubmissionVersion.save)
+        FileBlob.objects.select_for_update().filter(pk=blob.pk).first()
+        SubmissionVersion.objects.filter(file_hash=blob.sha256).update(file=packed_name)
+        FileBlob.objects.filter(pk=blob.pk).update(
+            name=packed_name, packed=True, stored_size=packed_size, packed_at=timezone.now()
+        )
+        _delete_unused([blob.name])
+    logger.info(f"{blob.name} сжат: {blob.size} -> {packed_size} байт")
+
+
+def delete_orphans(batch_size):
+    blobs = list(orphan_blobs().order_by('id')[:batch_size])
+    if not blobs:
+        return 0
+    storage = _storage()
+    with transaction.atomic():
+        # Повторная проверка под блокировкой: пока пачка выбиралась, загрузка того же
+        # содержимого могла на него сослаться
+        orphans = list(orphan_blobs().select_for_update().filter(pk__in=[blob.pk for blob in blobs]))
+        FileBlob.objects.filter(pk__in=[blob.pk for blob in orphans]).delete()
+        # Файлы удаляются до снятия блокировки, чтобы загрузка, ждущая ее, записала файл заново.
+        # При откате остаются строки без файлов и без версий — их удалит следующий проход
+        for blob in orphans:
+            storage.delete(blob.name)
+    if orphans:
+        logger.info(f"Удалено содержимое без версий: {len(orphans)}")
+    # Пачка обработана, даже если часть содержимого снова в ходу
+    return len(blobs)
+
+
+def process_pending(batch_size=20):
+    """Перенос старых файлов, сжатие замененных версий, удаление лишнего; возвращает число обработанных."""
+    processed = 0
+    # Версии с пропавшими файлами остаются в выборке, поэтому не считаются и не занимают место в пачке
+    for version in legacy_versions().order_by('id').iterator():
+        if processed >= batch_size:
+            break
+        processed += move_legacy(version)
+    for blob in pending_packing().order_by('id')[:max(batch_size - processed, 0)]:
+        pack(blob)
+        processed += 1
+    if processed < batch_size:
+        processed += delete_orphans(batch_size - processed)
+    return processed
+
+
+def report():
+    """
+    Сколько места занимали бы версии, если бы каждая хранилась отдельным несжатым
+    файлом, и сколько занимает их содержимое на самом деле.
+    """
+    versions = dict(
+        SubmissionVersion.objects.filter(file__startswith=f'{BLOB_DIR}/').values('file_hash')
+        .annotate(count=Count('id')).values_list('file_hash', 'count')
+    )
+    logical = unique = stored = packed = 0
+    for sha256, size, stored_size, is_packed in FileBlob.objects.values_list('sha256', 'size', 'stored_size', 'packed'):
+        count = versions.get(sha256)
+        if not count:
+            continue
+        logical += size * count
+        unique += size
+        stored += stored_size
+        packed += is_packed
+    return {
+        'versions': sum(versions.values()),
+        'legacy_versions': legacy_versions().count(),
+        'blobs': len(versions),
+        'packed_blobs': packed,
+        'logical_bytes': logical,
+        'stored_bytes': stored,
+        'dedup_saved': logical - unique,
+        'compression_saved': unique - stored,
+    }
@@ -0,0 +1,154 @@
+"""
+Условные GET для публичных страниц: ETag и Last-Modified по времени последнего
+изменения контента, 304 без рендеринга шаблона.
+
+Время изменения страницы — наибольший updated_at среди всех конференций (они
+выводятся в шапке и подвале) и строк моделей, от которых зависит страница
+(page_cache.PAGE_DEPENDENCIES), одним запросом с подзапросами по индексам.
+Удаление строки не оставляет updated_at, поэтому при удалении материалов
+конференции сдвигается updated_at самой конференции, а при смене имени автора
+или превью PDF — updated_at опубликованных работ и сборников, которые их показывают.
+
+Страница зависит и от времени (идет ли прием заявок, опубликованы ли материалы,
+текущая дата в шапке), поэтому в ETag, кроме времени изменения, входят дата и
+это состояние. Анонимным посетителям отдается Cache-Control для общих кэшей
+(s-maxage, затем обязательная перепроверка), авторизованным — private: в шапке
+их имя, на главной — их заявка.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Max, Subquery
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .page_cache import INDIRECT_DEPENDENCIES, PAGE_DEPENDENCIES, published_rows, shows_change
+
+
+def _latest(model, **filters):
+    return Subquery(
+        model.objects.filter(**filters).order_by().values(*filters).annotate(latest=Max('updated_at')).values('latest')
+    )
+
+
+def last_modified_query(url_name, conference):
+    """Запрос (для .first()) updated_at всех источников страницы; None в строке — источник пуст."""
+    Conference = apps.get_model('conferences', 'Conference')
+    conference_id = conference.pk if conference is not None else None
+    sources = {'site': Subquery(Conference.objects.order_by('-updated_at').values('updated_at')[:1])}
+    if conference_id is not None:
+        for label, url_names in PAGE_DEPENDENCIES.items():
+            if label != 'conferences.Conference' and url_name in url_names:
+                sources[label.split('.')[1].lower()] = _latest(apps.get_model(label), conference_id=conference_id)
+    # Строка-носитель для подзапросов: любая конференция подойдет, значения от нее не зависят
+    return Conference.objects.annotate(**sources).values_list(*sources)
+
+
+def _validators(request, url_name, conference, row):
+    timestamps = [value for value in (row or ()) if value is not None]
+    if not timestamps:
+        return None, None
+    latest = max(timestamps)
+    now = timezone.now()
+    # В ETag — время с микросекундами: две правки за одну секунду дают разные ETag.
+    # Last-Modified в HTTP точен до секунды, поэтому If-Modified-Since проверяется грубее.
+    state = [url_name, request.LANGUAGE_CODE, timezone.localdate().isoformat(), latest.isoformat()]
+    if conference is not None:
+        # Материалы открываются по дате UTC, как в conference_proceedings, а не по местной дате
+        state.extend([conference.pk, conference.registration_deadline < now, now.date() >= conference.notification_date])
+    etag = 'W/' + quote_etag(hashlib.md5(repr(state).encode()).hexdigest())
+    return etag, latest.replace(microsecond=0)
+
+
+def _precondition(request, url_name, conference, row, anonymous):
+    """(etag, last_modified, ответ 304/412 или None); авторизованным валидаторы не выдаются."""
+    if not anonymous:
+        return None, None, None
+    etag, last_modified = _validators(request, url_name, conference, row)
+    if etag is None:
+        return None, None, None
+    return etag, last_modified, get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+
+
+def _finish(response, etag, last_modified, anonymous):
+    if etag and response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+    if anonymous:
+        patch_cache_control(
+            response, public=True, max_age=0, s_maxage=getattr(settings, 'PROXY_CACHE_MAX_AGE', 60),
+            must_revalidate=True,
+        )
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional_page(url_name):
+    """
+    Декоратор публичного представления (синхронного или асинхронного): отвечает 304 на
+    If-None-Match / If-Modified-Since, если контент не менялся, и ставит ETag,
+    Last-Modified и Cache-Control.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                anonymous = not (await request.auser()).is_authenticated
+                conference = getattr(request, 'conference', None)
+                row = await last_modified_query(url_name, conference).afirst() if anonymous else None
+                etag, last_modified, response = _precondition(request, url_name, conference, row, anonymous)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified, anonymous)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return view(request, *args, **kwargs)
+                anonymous = not request.user.is_authenticated
+                conference = getattr(request, 'conference', None)
+                row = last_modified_query(url_name, conference).first() if anonymous else None
+                etag, last_modified, response = _precondition(request, url_name, conference, row, anonymous)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified, anonymous)
+        return wrapper
+    return decorator
+
+
+def _on_delete(sender, instance, **kwargs):
+    if sender._meta.label == 'conferences.Submission' and instance.status != 'ready_for_print':
+        return
+    Conference = apps.get_model('conferences', 'Conference')
+    Conference.objects.filter(pk=instance.conference_id).update(updated_at=timezone.now())
+
+
+def _on_indirect_change(sender, instance, update_fields=None, **kwargs):
+    if not shows_change(sender, update_fields):
+        return
+    now = timezone.now()
+    for rows in published_rows(sender._meta.label, instance):
+        rows.update(updated_at=now)
+
+
+def connect_signals():
+    for label in PAGE_DEPENDENCIES:
+        if label == 'conferences.Conference':
+            continue
+        post_delete.connect(_on_delete, sender=apps.get_model(label), dispatch_uid=f'conditional_delete_{label}')
+    for label in INDIRECT_DEPENDENCIES:
+        post_save.connect(_on_indirect_change, sender=apps.get_model(label), dispatch_uid=f'conditional_save_{label}')
+    pre_delete.connect(
+        _on_indirect_change, sender=apps.get_model('conferences.PdfPreview'), dispatch_uid='conditional_delete_preview',
+    )
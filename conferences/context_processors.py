@@ -1,12 +1,25 @@
-from .models import Conference
+from . import routing
+from .profiling import timed
 
 def latest_conference(request):
-    return {
-        'current_conf': Conference.objects.order_by('-id').first()
-    }
+    # Из словаря конференций в памяти процесса, без запроса к БД
+    with timed('ctx'):
+        return {
+            'current_conf': getattr(request, 'conference', None) or routing.default_conference(),
+            'all_conferences': routing.all_conferences,
+        }
 
 def base_site(request):
     from django.conf import settings
     return {
         'BASE_SITE': getattr(settings, 'BASE_SITE')
-    }
\ No newline at end of file
+    }
+
+# Ключ request.META не из заголовков HTTP: снаружи его не передать, только из export_static_site
+LANGUAGE_LINKS_KEY = 'conferences.static_export.language_links'
+
+
+def static_language_links(request):
+    # Статическая копия (conferences/static_export.py): вместо формы set_language с токеном CSRF —
+    # ссылки [(язык, путь)] на языковые версии страницы
+    return {'static_language_links': request.META.get(LANGUAGE_LINKS_KEY)}
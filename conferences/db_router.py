@@ -0,0 +1,75 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.db import connections
+
+from .page_cache import PUBLIC_PAGES
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+# Страницы (имена URL в пространстве conferences), которые могут читать с реплики
+REPLICA_URL_NAMES = PUBLIC_PAGES + ('api_conferences',)
+
+
+class _RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+# Состояние текущего запроса (изменяемый объект, чтобы запись из потоков sync_to_async была видна middleware)
+_state = contextvars.ContextVar('conferences_db_routing', default=None)
+
+
+def start(use_replica):
+    state = _RoutingState(use_replica)
+    return state, _state.set(state)
+
+
+def stop(token):
+    _state.reset(token)
+
+
+def allow_replica():
+    """Разрешает текущему запросу читать с реплики (до первой записи)."""
+    state = _state.get()
+    if state is not None:
+        state.use_replica = True
+
+
+@contextmanager
+def replica_reads():
+    """Чтение с реплики вне HTTP-запроса, например для экспорта."""
+    state, token = start(True)
+    try:
+        yield state
+    finally:
+        stop(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись всегда идет на основную БД. Чтение идет с реплики только там, где это
+    явно разрешено (безопасные запросы без «прилипания», replica_reads()) и вне
+    транзакций; после записи запрос и следующие запросы сессии читают с основной БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return PRIMARY
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
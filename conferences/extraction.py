@@ -0,0 +1,155 @@
+"""
+Фоновое извлечение текста из файлов работ (DOCX/DOC версий и итоговых PDF).
+Результат хранится в ManuscriptText по SHA-256 файла: каждый файл разбирается
+один раз, а при запросах страниц файлы не открываются.
+"""
+import os
+import re
+import shutil
+import logging
+import zipfile
+import tempfile
+import subprocess
+from io import BytesIO
+
+from lxml import etree
+from django.db import IntegrityError, transaction
+
+from .models import ManuscriptText, Submission, SubmissionVersion
+from .search import index_submission
+from .similarity import index_manuscript, pending_manuscripts
+
+logger = logging.getLogger(__name__)
+
+_APP_XML_PAGES = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}Pages'
+
+
+class ExtractionError(Exception):
+    pass
+
+
+def _normalize(text):
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def docx_pages(archive):
+    """Число страниц, которое Word сохраняет в docProps/app.xml при последнем сохранении."""
+    try:
+        root = etree.fromstring(archive.read('docProps/app.xml'))
+        pages = root.find(_APP_XML_PAGES)
+        return int(pages.text) if pages is not None and pages.text else None
+    except (KeyError, ValueError, etree.XMLSyntaxError):
+        return None
+
+
+def extract_docx(data):
+    from docx import Document
+    document = Document(BytesIO(data))
+    parts = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            parts.append('\t'.join(cell.text for cell in row.cells))
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        pages = docx_pages(archive)
+    return _normalize('\n'.join(parts)), pages
+
+
+def extract_pdf(data):
+    from pypdf import PdfReader
+    reader = PdfReader(BytesIO(data))
+    text = '\n'.join(page.extract_text() or '' for page in reader.pages)
+    return _normalize(text), len(reader.pages)
+
+
+def extract_doc(data):
+    """Старый формат .doc разбирается через LibreOffice (как и конвертация в PDF)."""
+    workdir = tempfile.mkdtemp(prefix='extract_')
+    try:
+        source = os.path.join(workdir, 'source.doc')
+        with open(source, 'wb') as f:
+            f.write(data)
+        subprocess.run(
+            ['soffice', '--headless', '--convert-to', 'txt:Text (encoded):UTF8', '--outdir', workdir, source],
+            check=True, capture_output=True, timeout=120,
+        )
+        with open(os.path.join(workdir, 'source.txt'), encoding='utf-8', errors='replace') as f:
+            return _normalize(f.read()), None
+    except (subprocess.SubprocessError, OSError) as e:
+        raise ExtractionError(f'LibreOffice: {e}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+EXTRACTORS = {
+    '.docx': extract_docx,
+    '.pdf': extract_pdf,
+    '.doc': extract_doc,
+}
+
+
+def extract(field_file, sha256):
+    """Возвращает ManuscriptText для файла; разбирает файл, только если такой текст еще не извлекался."""
+    existing = ManuscriptText.objects.filter(sha256=sha256).first()
+    if existing:
+        return existing
+
+    text, page_count, error = '', None, ''
+    ext = os.path.splitext(field_file.name)[1].lower()
+    try:
+        extractor = EXTRACTORS.get(ext)
+        if extractor is None:
+            raise ExtractionError(f'неподдерживаемый формат {ext}')
+        with field_file.open('rb') as f:
+            data = f.read()
+        text, page_count = extractor(data)
+    except Exception as e:
+        error = str(e)[:255] or type(e).__name__
+        logger.warning(f"Не удалось извлечь текст из {field_file.name}: {error}")
+
+    try:
+        with transaction.atomic():
+            return ManuscriptText.objects.create(
+                sha256=sha256,
+                text=text,
+                word_count=len(re.findall(r'\w+', text)),
+                page_count=page_count,
+                error=error,
+            )
+    except IntegrityError:
+        # Тот же файл параллельно обработал другой воркер
+        return ManuscriptText.objects.get(sha256=sha256)
+
+
+def pending_versions():
+    return SubmissionVersion.objects.filter(manuscript__isnull=True).exclude(file_hash='')
+
+
+def pending_final_files():
+    return Submission.objects.filter(final_manuscript__isnull=True).exclude(final_file_hash='')
+
+
+def process_pending(batch_size=20):
+    """Обрабатывает очередь извлечения; возвращает число обработанных файлов."""
+    processed = 0
+    for version in pending_versions().select_related('submission__user').order_by('id')[:batch_size]:
+        manuscript = extract(version.file, version.file_hash)
+        SubmissionVersion.objects.filter(pk=version.pk).update(manuscript=manuscript)
+        index_submission(version.submission)
+        processed += 1
+        logger.info(
+            f"Текст версии {version.pk} заявки {version.submission_id}: "
+            f"{manuscript.word_count} слов, страниц: {manuscript.page_count}"
+        )
+
+    for submission in pending_final_files().order_by('id')[:max(batch_size - processed, 0)]:
+        manuscript = extract(submission.final_file, submission.final_file_hash)
+        Submission.objects.filter(pk=submission.pk).update(final_manuscript=manuscript)
+        processed += 1
+        logger.info(f"Текст итогового PDF заявки {submission.pk}: страниц: {manuscript.page_count}")
+
+    # Подписи для поиска похожих работ: новые тексты и тексты, извлеченные до появления индекса
+    for manuscript in pending_manuscripts().order_by('id')[:max(batch_size - processed, 0)]:
+        index_manuscript(manuscript)
+        processed += 1
+    return processed
@@ -0,0 +1,364 @@
+"""
+Автоматическая проверка оформления рукописей (DOCX) по требованиям конференции
+(FormatRules): число страниц и слов, объем аннотации, поля, шрифт и кегль
+основного текста, обязательные разделы.
+
+document.xml читается потоково (iterparse по абзацам), разобранные элементы
+сразу освобождаются, поэтому расход памяти не зависит от объема рукописи.
+Результат сохраняется в FormatReport версии и показывается оргкомитету.
+"""
+import os
+import re
+import logging
+import zipfile
+from collections import Counter
+
+from lxml import etree
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .extraction import docx_pages
+from .models import FormatReport, SubmissionVersion
+
+logger = logging.getLogger(__name__)
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+
+# Распакованный document.xml больше этого размера не разбирается (защита от zip-бомб)
+MAX_DOCUMENT_SIZE = 200 * 1024 * 1024
+# Доля символов основного текста, которая должна быть набрана нужным шрифтом и кеглем
+FONT_SHARE = 0.9
+MARGIN_TOLERANCE_MM = 1
+# Короткие абзацы без стиля заголовка тоже считаются кандидатами в названия разделов
+HEADING_MAX_WORDS = 12
+
+SIDES = (
+    ('top', 'margin_top', 'верхнее'),
+    ('bottom', 'margin_bottom', 'нижнее'),
+    ('left', 'margin_left', 'левое'),
+    ('right', 'margin_right', 'правое'),
+)
+
+_WORD_RE = re.compile(r'\w+')
+_NUMBERING_RE = re.compile(r'^(?:\d+(?:\.\d+)*[.)]?|[IVXLC]+[.)])\s*')
+
+
+class FormatCheckError(Exception):
+    pass
+
+
+def _read_xml(archive, name):
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    with archive.open(name) as f:
+        return etree.parse(f, parser).getroot()
+
+
+def _twips_to_mm(value):
+    return round(abs(float(value)) * 25.4 / 1440, 1)
+
+
+def _heading_key(text):
+    text = ' '.join(text.lower().replace('ё', 'е').split())
+    return _NUMBERING_RE.sub('', text).rstrip(' :.')
+
+
+def _theme_fonts(archive):
+    """Шрифты темы (major — заголовки, minor — основной текст), на которые ссылаются стили."""
+    try:
+        root = _read_xml(archive, 'word/theme/theme1.xml')
+    except KeyError:
+        return {}
+    fonts = {}
+    for kind in ('major', 'minor'):
+        latin = root.find(f'.//{A}{kind}Font/{A}latin')
+        if latin is not None:
+            fonts[kind] = latin.get('typeface')
+    return fonts
+
+
+def _run_font(rpr, theme):
+    """Шрифт и кегль (в полупунктах) из w:rPr; None, если не заданы."""
+    if rpr is None:
+        return None, None
+    font = None
+    fonts = rpr.find(W + 'rFonts')
+    if fonts is not None:
+        theme_font = fonts.get(W + 'asciiTheme') or fonts.get(W + 'hAnsiTheme')
+        if theme_font:
+            font = theme.get('major' if theme_font.startswith('major') else 'minor')
+        font = font or fonts.get(W + 'ascii') or fonts.get(W + 'hAnsi')
+    size = rpr.find(W + 'sz')
+    try:
+        size = int(size.get(W + 'val')) if size is not None else None
+    except (TypeError, ValueError):
+        size = None
+    return font, size
+
+
+def _styles(archive, theme):
+    """
+    Стили документа с учетом наследования (basedOn): {id: (шрифт, кегль, заголовок)},
+    а также шрифт и кегль по умолчанию и id стиля абзаца по умолчанию.
+    """
+    try:
+        root = _read_xml(archive, 'word/styles.xml')
+    except KeyError:
+        return (None, None), {}, None
+
+    defaults = _run_font(root.find(f'{W}docDefaults/{W}rPrDefault/{W}rPr'), theme)
+    raw = {}
+    default_style = None
+    for style in root.iter(W + 'style'):
+        style_id = style.get(W + 'styleId')
+        name = style.find(W + 'name')
+        name = name.get(W + 'val', '').lower() if name is not None else ''
+        based_on = style.find(W + 'basedOn')
+        outline = style.find(f'{W}pPr/{W}outlineLvl')
+        raw[style_id] = (
+            _run_font(style.find(W + 'rPr'), theme),
+            based_on.get(W + 'val') if based_on is not None else None,
+            name.startswith('heading') or name == 'title' or (outline is not None and outline.get(W + 'val') != '9'),
+        )
+        if style.get(W + 'type') == 'paragraph' and style.get(W + 'default') in ('1', 'true'):
+            default_style = style_id
+
+    resolved = {}
+
+    def resolve(style_id, depth=0):
+        if style_id in resolved:
+            return resolved[style_id]
+        if style_id not in raw or depth > 20:
+            return None, None, False
+        (font, size), based_on, heading = raw[style_id]
+        if based_on:
+            parent_font, parent_size, parent_heading = resolve(based_on, depth + 1)
+            font, size, heading = font or parent_font, size or parent_size, heading or parent_heading
+        resolved[style_id] = (font, size, heading)
+        return resolved[style_id]
+
+    for style_id in raw:
+        resolve(style_id)
+    return defaults, resolved, default_style
+
+
+def scan_docx(fileobj):
+    """
+    Собирает характеристики документа: страницы, слова, распределение символов
+    основного текста по шрифтам и кеглям, кандидаты в заголовки, поля разделов.
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        try:
+            info = archive.getinfo('word/document.xml')
+        except KeyError:
+            raise FormatCheckError('в архиве нет word/document.xml')
+        if info.file_size > MAX_DOCUMENT_SIZE:
+            raise FormatCheckError('документ слишком большой для проверки')
+
+        theme = _theme_fonts(archive)
+        (default_font, default_size), styles, default_style = _styles(archive, theme)
+        stats = {
+            'pages': docx_pages(archive),
+            'words': 0,
+            'fonts': Counter(),
+            'sizes': Counter(),
+            'headings': set(),
+            'margins': [],
+        }
+
+        with archive.open(info) as stream:
+            events = etree.iterparse(
+                stream, events=('end',), tag=(W + 'p', W + 'sectPr'), resolve_entities=False, no_network=True
+            )
+            for _event, elem in events:
+                if elem.tag == W + 'sectPr':
+                    margins = elem.find(W + 'pgMar')
+                    if margins is not None:
+                        stats['margins'].append({
+                            side: _twips_to_mm(margins.get(W + side, 0)) for side, _field, _label in SIDES
+                        })
+                    continue
+
+                ppr = elem.find(W + 'pPr')
+                style_id = default_style
+                heading = False
+                if ppr is not None:
+                    pstyle = ppr.find(W + 'pStyle')
+                    if pstyle is not None:
+                        style_id = pstyle.get(W + 'val')
+                    outline = ppr.find(W + 'outlineLvl')
+                    heading = outline is not None and outline.get(W + 'val') != '9'
+                style_font, style_size, style_heading = styles.get(style_id, (None, None, False))
+                heading = heading or style_heading
+
+                parts = []
+                for run in elem.iter(W + 'r'):
+                    text = ''.join(t.text or '' for t in run.iter(W + 't'))
+                    if not text:
+                        continue
+                    parts.append(text)
+                    if heading:
+                        continue
+                    rpr = run.find(W + 'rPr')
+                    font, size = _run_font(rpr, theme)
+                    if rpr is not None and rpr.find(W + 'rStyle') is not None:
+                        char_font, char_size, _heading = styles.get(rpr.find(W + 'rStyle').get(W + 'val'), (None, None, False))
+                        font, size = font or char_font, size or char_size
+                    chars = sum(1 for char in text if not char.isspace())
+                    stats['fonts'][font or style_font or default_font] += chars
+                    stats['sizes'][size or style_size or default_size] += chars
+
+                text = ''.join(parts)
+                words = len(_WORD_RE.findall(text))
+                stats['words'] += words
+                if words and (heading or words <= HEADING_MAX_WORDS):
+                    stats['headings'].add(_heading_key(text))
+
+                # Абзац разобран: освобождаем его и уже обработанные соседние элементы
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    return stats
+
+
+def _range_text(minimum, maximum):
+    if minimum is not None and maximum is not None:
+        return f'от {minimum} до {maximum}'
+    if maximum is not None:
+        return f'не более {maximum}'
+    return f'не менее {minimum}'
+
+
+def _limit_check(code, label, value, minimum, maximum):
+    if value is None:
+        return {'code': code, 'label': label, 'passed': None, 'detail': 'не удалось определить'}
+    passed = (minimum is None or value >= minimum) and (maximum is None or value <= maximum)
+    return {'code': code, 'label': label, 'passed': passed, 'detail': f'{value} (требуется {_range_text(minimum, maximum)})'}
+
+
+def _share_check(code, label, counter, matches, expected):
+    known = {key: count for key, count in counter.items() if key is not None}
+    total = sum(known.values())
+    if not total:
+        return {'code': code, 'label': label, 'passed': None, 'detail': 'не удалось определить'}
+    share = sum(count for key, count in known.items() if matches(key)) / total
+    used = ', '.join(
+        f'{name} — {count * 100 // total}%' for name, count in Counter(known).most_common(3)
+    )
+    return {
+        'code': code,
+        'label': label,
+        'passed': share >= FONT_SHARE,
+        'detail': f'требуется {expected}; в тексте: {used}',
+    }
+
+
+def check_format(rules, stats, abstract_text=''):
+    """Сравнивает характеристики документа с требованиями; возвращает список проверок."""
+    checks = []
+    if rules.max_pages is not None:
+        checks.append(_limit_check('pages', 'Число страниц', stats['pages'], None, rules.max_pages))
+    if rules.min_words is not None or rules.max_words is not None:
+        checks.append(_limit_check('words', 'Объем текста, слов', stats['words'], rules.min_words, rules.max_words))
+    if rules.abstract_min_words is not None or rules.abstract_max_words is not None:
+        checks.append(_limit_check(
+            'abstract', 'Объем аннотации, слов', len(_WORD_RE.findall(abstract_text or '')),
+            rules.abstract_min_words, rules.abstract_max_words,
+        ))
+
+    sides = [(side, getattr(rules, field), label) for side, field, label in SIDES if getattr(rules, field) is not None]
+    if sides:
+        if not stats['margins']:
+            checks.append({'code': 'margins', 'label': 'Поля', 'passed': None, 'detail': 'поля не заданы в документе'})
+        else:
+            wrong = sorted({
+                f'{label} {section[side]:g} мм вместо {expected}'
+                for section in stats['margins']
+                for side, expected, label in sides
+                if abs(section[side] - expected) > MARGIN_TOLERANCE_MM
+            })
+            expected = ', '.join(f'{label} {value}' for side, value, label in sides)
+            checks.append({
+                'code': 'margins',
+                'label': 'Поля',
+                'passed': not wrong,
+                'detail': '; '.join(wrong) if wrong else f'{expected} мм',
+            })
+
+    if rules.font_name:
+        expected = rules.font_name.strip().lower()
+        checks.append(_share_check(
+            'font', 'Шрифт основного текста', stats['fonts'],
+            lambda font: font.strip().lower() == expected, rules.font_name,
+        ))
+    if rules.font_size is not None:
+        half_points = round(float(rules.font_size) * 2)
+        sizes = Counter({f'{size / 2:g} пт' if size else None: count for size, count in stats['sizes'].items()})
+        checks.append(_share_check(
+            'font_size', 'Кегль основного текста', sizes,
+            lambda size: size == f'{half_points / 2:g} пт', f'{half_points / 2:g} пт',
+        ))
+
+    headings = rules.headings_list
+    if headings:
+        missing = []
+        for heading in headings:
+            variants = [_heading_key(variant) for variant in heading.split('|') if variant.strip()]
+            if not any(found.startswith(variant) for variant in variants for found in stats['headings']):
+                missing.append(heading.split('|')[0].strip())
+        checks.append({
+            'code': 'headings',
+            'label': 'Обязательные разделы',
+            'passed': not missing,
+            'detail': 'нет разделов: ' + ', '.join(missing) if missing else 'все разделы на месте',
+        })
+    return checks
+
+
+def check_version(version, rules):
+    """Проверяет файл версии и сохраняет FormatReport."""
+    checks, error = [], ''
+    ext = os.path.splitext(version.file.name)[1].lower()
+    if ext != '.docx':
+        error = 'автоматическая проверка доступна только для DOCX'
+    else:
+        try:
+            with version.file.open('rb') as f:
+                stats = scan_docx(f)
+            checks = check_format(rules, stats, version.submission.abstract_text)
+        except (FormatCheckError, zipfile.BadZipFile, etree.XMLSyntaxError, OSError) as e:
+            error = str(e)[:255] or type(e).__name__
+            logger.warning(f"Не удалось проверить оформление версии {version.pk}: {error}")
+
+    report, _created = FormatReport.objects.update_or_create(
+        version=version,
+        defaults={
+            'passed': None if error else not any(check['passed'] is False for check in checks),
+            'checks': checks,
+            'error': error,
+            'checked_at': timezone.now(),
+        },
+    )
+    return report
+
+
+def pending_checks():
+    """Версии без отчета или с отчетом, составленным до последнего изменения требований."""
+    return SubmissionVersion.objects.filter(submission__conference__format_rules__isnull=False).exclude(file='').filter(
+        Q(format_report__isnull=True)
+        | Q(format_report__checked_at__lt=F('submission__conference__format_rules__updated_at'))
+    )
+
+
+def process_pending(batch_size=20):
+    """Обрабатывает очередь проверки оформления; возвращает число проверенных версий."""
+    versions = pending_checks().select_related('submission__conference__format_rules').order_by('id')[:batch_size]
+    processed = 0
+    for version in versions:
+        report = check_version(version, version.submission.conference.format_rules)
+        processed += 1
+        logger.info(
+            f"Оформление версии {version.pk} заявки {version.submission_id}: "
+            f"{'ошибка' if report.passed is None else 'соответствует' if report.passed else 'есть замечания'}"
+        )
+    return processed
@@ -0,0 +1,166 @@
+"""
+Обработка HTML из полей CKEditor при сохранении: очистка от опасной разметки,
+ленивые изображения с размерами и облегченные заглушки вместо встроенного видео.
+Результат хранится в полях <поле>_html и выводится в шаблонах без обработки.
+"""
+import re
+import logging
+from urllib.parse import urlsplit, unquote
+
+from bs4 import BeautifulSoup
+from PIL import Image
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .storage import dimensions_from_name
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'code', 'col', 'colgroup', 'del', 'div', 'em',
+    'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'mark', 'ol',
+    'p', 'pre', 's', 'small', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th',
+    'thead', 'tr', 'u', 'ul',
+}
+# Удаляются вместе с содержимым
+DROP_TAGS = {
+    'script', 'style', 'object', 'embed', 'applet', 'form', 'input', 'button', 'textarea', 'select',
+    'option', 'link', 'meta', 'base', 'noscript', 'svg', 'math', 'template', 'frame', 'frameset',
+}
+ALLOWED_ATTRS = {
+    'class', 'style', 'title', 'alt', 'href', 'src', 'target', 'rel', 'width', 'height',
+    'colspan', 'rowspan', 'scope', 'start', 'reversed', 'lang', 'dir',
+}
+URL_ATTRS = {'href', 'src'}
+SAFE_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+_UNSAFE_STYLE_RE = re.compile(r'expression\s*\(|javascript:|behavior\s*:|-moz-binding|url\s*\(', re.I)
+
+_YOUTUBE_RE = re.compile(
+    r'(?:youtube(?:-nocookie)?\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/)|youtu\.be/)([\w-]{11})'
+)
+
+
+def _safe_url(value):
+    value = (value or '').strip()
+    scheme = urlsplit(value).scheme.lower()
+    # Управляющие символы позволяют обойти проверку схемы в браузере ("java\tscript:")
+    if scheme not in SAFE_SCHEMES or re.search(r'[\x00-\x20]', value.split(':', 1)[0]):
+        return None
+    return value
+
+
+def image_dimensions(src):
+    """Размеры изображения из MEDIA_ROOT (по имени, по EditorImage или по заголовку файла) или None."""
+    path = urlsplit(src).path
+    if not path.startswith(settings.MEDIA_URL):
+        return None
+    name = unquote(path[len(settings.MEDIA_URL):])
+    dimensions = dimensions_from_name(name)
+    if dimensions:
+        return dimensions
+    from .models import EditorImage
+    image = EditorImage.objects.filter(name=name, width__isnull=False).values_list('width', 'height').first()
+    if image:
+        return image
+    try:
+        with default_storage.open(name) as f:
+            with Image.open(f) as img:
+                return img.size
+    except Exception as e:
+        logger.warning(f"Не удалось определить размер изображения {name}: {e}")
+        return None
+
+
+def _video_facade(soup, url):
+    match = _YOUTUBE_RE.search(url or '')
+    if not match:
+        if not _safe_url(url):
+            return None
+        link = soup.new_tag('a', href=url, target='_blank', rel='noopener noreferrer')
+        link.string = url
+        return link
+
+    video_id = match.group(1)
+    facade = soup.new_tag(
+        'a',
+        href=f'https://www.youtube.com/watch?v={video_id}',
+        target='_blank',
+        rel='noopener noreferrer',
+        attrs={
+            'class': 'video-facade',
+            'data-embed': f'https://www.youtube-nocookie.com/embed/{video_id}?autoplay=1',
+        },
+    )
+    facade.append(soup.new_tag(
+        'img',
+        src=f'https://i.ytimg.com/vi/{video_id}/hqdefault.jpg',
+        alt='',
+        width='480',
+        height='360',
+        loading='lazy',
+        decoding='async',
+    ))
+    facade.append(soup.new_tag('span', attrs={'class': 'video-facade__play', 'aria-hidden': 'true'}))
+    return facade
+
+
+def _clean_attrs(tag):
+    for name in list(tag.attrs):
+        value = tag.attrs[name]
+        if name not in ALLOWED_ATTRS:
+            del tag.attrs[name]
+        elif name in URL_ATTRS and _safe_url(value) is None:
+            del tag.attrs[name]
+        elif name == 'style' and _UNSAFE_STYLE_RE.search(value):
+            del tag.attrs[name]
+    if tag.name == 'a' and tag.get('target') == '_blank':
+        tag['rel'] = 'noopener noreferrer'
+
+
+def compile_html(raw):
+    """Возвращает очищенный и подготовленный к выводу HTML."""
+    if not raw or not raw.strip():
+        return ''
+
+    soup = BeautifulSoup(raw, 'lxml')
+    root = soup.body or soup
+
+    # Встроенное видео: <oembed url> из mediaEmbed CKEditor и вставленные вручную iframe.
+    # Атрибуты заглушек формируются здесь и повторной очистки не требуют
+    generated = set()
+    for embed in root.find_all(['oembed', 'iframe']):
+        facade = _video_facade(soup, embed.get('url') or embed.get('src'))
+        if facade is None:
+            embed.decompose()
+        else:
+            embed.replace_with(facade)
+            generated.add(id(facade))
+            generated.update(id(child) for child in facade.find_all(True))
+
+    for tag in root.find_all(DROP_TAGS):
+        tag.decompose()
+
+    dimensions = {}
+    for tag in root.find_all(True):
+        if tag.decomposed:
+            continue
+        if tag.name not in ALLOWED_TAGS:
+            tag.unwrap()
+            continue
+        if id(tag) not in generated:
+            _clean_attrs(tag)
+
+        if tag.name == 'img':
+            if not tag.get('src'):
+                tag.decompose()
+                continue
+            tag['loading'] = 'lazy'
+            tag['decoding'] = 'async'
+            if not (tag.get('width') and tag.get('height')):
+                src = tag['src']
+                if src not in dimensions:
+                    dimensions[src] = image_dimensions(src)
+                if dimensions[src]:
+                    tag['width'], tag['height'] = (str(value) for value in dimensions[src])
+
+    return ''.join(str(child) for child in root.contents)
@@ -0,0 +1,112 @@
+import os
+import copy
+import json
+import queue
+import atexit
+import logging
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+_request_id = contextvars.ContextVar('conferences_request_id', default=None)
+
+# Стандартные атрибуты LogRecord; все остальное попало в запись через extra=
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def set_request_id(value):
+    return _request_id.set(value)
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'request_id': getattr(record, 'request_id', None),
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Ротация по времени (when/interval) и дополнительно при превышении max_bytes."""
+
+    def __init__(self, filename, max_bytes=0, **kwargs):
+        self.max_bytes = max_bytes
+        super().__init__(filename, **kwargs)
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes and self.stream is not None:
+            self.stream.seek(0, os.SEEK_END)
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def rotation_filename(self, default_name):
+        # Несколько ротаций по размеру в одном интервале не должны затирать друг друга
+        name = super().rotation_filename(default_name)
+        counter = 1
+        candidate = name
+        while os.path.exists(candidate):
+            candidate = f'{name}.{counter}'
+            counter += 1
+        return candidate
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Потоки запросов только кладут записи в очередь. Вывод в консоль и запись в
+    JSON-файл с ротацией выполняет отдельный поток QueueListener.
+    """
+
+    def __init__(self, filename, max_bytes=20 * 1024 * 1024, backup_count=14, when='midnight',
+                 console_level='DEBUG', file_level='INFO', console_format=None):
+        super().__init__(queue.SimpleQueue())
+
+        console = logging.StreamHandler()
+        console.setLevel(console_level)
+        console.setFormatter(logging.Formatter(
+            console_format or '{levelname} {asctime} [{request_id}] {module}: {message}', style='{'
+        ))
+
+        file_handler = SizedTimedRotatingFileHandler(
+            filename, max_bytes=max_bytes, when=when, backupCount=backup_count, encoding='utf-8', delay=True,
+        )
+        file_handler.setLevel(file_level)
+        file_handler.setFormatter(JsonFormatter())
+
+        self.listener = QueueListener(self.queue, console, file_handler, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def prepare(self, record):
+        # Выполняется в потоке запроса: фиксируем request_id и текст исключения,
+        # чтобы запись можно было безопасно передать в другой поток
+        record = copy.copy(record)
+        record.request_id = get_request_id() or '-'
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
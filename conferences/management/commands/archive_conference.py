@@ -0,0 +1,52 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from conferences.archive import archive_conference, conference_files
+from conferences.models import Conference
+
+# Через сколько дней после начала конференции ее файлы можно переносить в архив
+MIN_AGE_DAYS = 30
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит медиафайлы прошедшей конференции (итоговые PDF, версии работ, галерею, '
+        'документы, сборник) в холодный архив ARCHIVE_ROOT и освобождает место в MEDIA_ROOT'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', help='slug конференции')
+        parser.add_argument('--force', action='store_true', help=f'Архивировать раньше, чем через {MIN_AGE_DAYS} дней')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, что будет перенесено')
+
+    def handle(self, *args, **options):
+        conference = Conference.objects.filter(slug=options['slug']).first()
+        if conference is None:
+            raise CommandError(f"Конференция со slug «{options['slug']}» не найдена")
+        if conference.is_active and not options['force']:
+            raise CommandError(f"Конференция «{conference.slug}» активна; снимите отметку или используйте --force")
+        if conference.start_date > timezone.localdate() - datetime.timedelta(days=MIN_AGE_DAYS) and not options['force']:
+            raise CommandError(
+                f"Конференция «{conference.slug}» началась менее {MIN_AGE_DAYS} дней назад; используйте --force"
+            )
+
+        files = conference_files(conference)
+        total = sum(storage.size(name) for name, storage in files)
+        if options['dry_run']:
+            for name, _storage in files:
+                self.stdout.write(name)
+            self.stdout.write(f"Будет перенесено файлов: {len(files)}, {filesizeformat(total)}")
+            return
+        if not files:
+            self.stdout.write("Нечего переносить: все файлы конференции уже в архиве")
+            return
+
+        for pack in archive_conference(conference):
+            share = pack.size / pack.original_bytes * 100 if pack.original_bytes else 100
+            self.stdout.write(
+                f"{pack.path}: файлов {pack.file_count}, {filesizeformat(pack.original_bytes)} -> "
+                f"{filesizeformat(pack.size)} ({share:.0f} %)"
+            )
@@ -0,0 +1,23 @@
+from django.core.management.base import CommandError
+
+from conferences.assignment import process_pending
+from conferences.management.worker import WorkerCommand
+from conferences.models import Conference
+
+
+class Command(WorkerCommand):
+    help = 'Распределяет работы между рецензентами и перераспределяет работы выбывших рецензентов'
+    default_batch_size = 10
+    default_interval = 60
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--conference', help='slug конференции: пересчитать только ее, даже без пробелов')
+
+    def run_batch(self, batch_size, options):
+        conference = None
+        if options['conference']:
+            conference = Conference.objects.filter(slug=options['conference']).first()
+            if conference is None:
+                raise CommandError(f"Конференция со slug «{options['conference']}» не найдена")
+        return process_pending(batch_size, conference=conference)
@@ -0,0 +1,117 @@
+import time
+import asyncio
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест: N параллельных клиентов с keep-alive запрашивают URL '
+        'в течение заданного времени; выводит запросы в секунду и перцентили задержки. '
+        'Пример сравнения WSGI и ASGI: см. readme.md'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URL-адреса, запрашиваются по кругу')
+        parser.add_argument('--concurrency', type=int, default=500)
+        parser.add_argument('--duration', type=float, default=30, help='Длительность теста, секунд')
+        parser.add_argument('--timeout', type=float, default=30, help='Таймаут одного запроса, секунд')
+
+    def handle(self, *args, **options):
+        targets = []
+        for url in options['urls']:
+            parts = urlsplit(url)
+            if parts.scheme != 'http' or not parts.hostname:
+                raise CommandError(f'Поддерживаются только http:// URL: {url}')
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+            targets.append((parts.hostname, parts.port or 80, path))
+
+        latencies, errors, elapsed = asyncio.run(self.run(targets, options))
+        self.report(latencies, errors, elapsed, options['concurrency'])
+
+    async def run(self, targets, options):
+        latencies = []
+        errors = []
+        deadline = time.perf_counter() + options['duration']
+
+        async def client(index):
+            reader = writer = None
+            n = index
+            while time.perf_counter() < deadline:
+                host, port, path = targets[n % len(targets)]
+                n += 1
+                started = time.perf_counter()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(host, port)
+                    await asyncio.wait_for(self.request(reader, writer, host, path), options['timeout'])
+                    latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    errors.append(type(e).__name__)
+                    if writer is not None:
+                        writer.close()
+                    reader = writer = None
+            if writer is not None:
+                writer.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(options['concurrency'])))
+        return latencies, errors, time.perf_counter() - started
+
+    async def request(self, reader, writer, host, path):
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n'
+            f'Accept-Encoding: identity\r\n\r\n'.encode()
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('соединение закрыто сервером')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            while True:
+                size = int((await reader.readline()).strip(), 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await reader.read()
+            raise ConnectionError('ответ без Content-Length')
+
+        if headers.get('connection', '').lower() == 'close':
+            raise ConnectionResetError('сервер закрыл keep-alive соединение')
+        if status >= 400:
+            raise RuntimeError(f'HTTP {status}')
+
+    def report(self, latencies, errors, elapsed, concurrency):
+        if not latencies:
+            raise CommandError(f'Нет успешных ответов, ошибок: {len(errors)}')
+        latencies.sort()
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+        self.stdout.write(f'Клиентов: {concurrency}, время: {elapsed:.1f} с')
+        self.stdout.write(f'Успешных запросов: {len(latencies)}, ошибок: {len(errors)}')
+        if errors:
+            kinds = {name: errors.count(name) for name in set(errors)}
+            self.stdout.write(f'Ошибки: {kinds}')
+        self.stdout.write(self.style.SUCCESS(f'RPS: {len(latencies) / elapsed:.1f}'))
+        self.stdout.write(
+            f'Задержка, мс: p50={percentile(50):.1f} p95={percentile(95):.1f} '
+            f'p99={percentile(99):.1f} max={latencies[-1] * 1000:.1f}'
+        )
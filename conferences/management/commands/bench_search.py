@@ -0,0 +1,116 @@
+import time
+import random
+import statistics
+
+from django.db import connection, transaction
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from conferences.models import Conference, Submission
+from conferences.search import rank_submissions, search_snippets
+from conferences.views_organizer import SEARCH_RESULTS_LIMIT
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'bench_search_'
+SYLLABLES = ('ка', 'ли', 'мо', 'ра', 'те', 'ну', 'зо', 'ве', 'ши', 'да', 'ро', 'ма', 'би', 'лу', 'не', 'са')
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))))
+    return sorted(words)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер полнотекстового поиска заявок (FTS5 на SQLite, tsvector на PostgreSQL): '
+        'создает заданное число заявок со случайным текстом и измеряет запрос страницы '
+        'оргкомитета (первые результаты по релевантности и фрагменты). Созданные данные '
+        'откатываются, если не указан --keep'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conference', help='slug конференции (по умолчанию — последняя)')
+        parser.add_argument('--documents', type=int, default=50000)
+        parser.add_argument('--words', type=int, default=150, help='Слов в поисковом тексте заявки')
+        parser.add_argument('--repeat', type=int, default=20, help='Повторов каждого запроса')
+        parser.add_argument('--keep', action='store_true', help='Не удалять созданные заявки')
+
+    def handle(self, *args, **options):
+        conference = (
+            Conference.objects.filter(slug=options['conference']) if options['conference']
+            else Conference.objects.order_by('-id')
+        ).first()
+        if conference is None:
+            raise CommandError('Конференция не найдена.')
+
+        with transaction.atomic():
+            queries = self.seed(conference, options)
+            self.stdout.write(
+                f"СУБД: {connection.vendor}; заявок в конференции: "
+                f"{Submission.objects.filter(conference=conference).count()}"
+            )
+            self.stdout.write(f"{'запрос':<28}{'найдено':>9}{'p50, мс':>10}{'p95, мс':>10}")
+            for query in queries:
+                found, durations = self.measure(conference, query, options['repeat'])
+                self.stdout.write(
+                    f'{query:<28}{found:>9}{statistics.median(durations):>10.1f}{percentile(durations, 0.95):>10.1f}'
+                )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def seed(self, conference, options):
+        """Создает авторов и заявки пачками; возвращает запросы для замера по частоте слов."""
+        rng = random.Random(42)
+        words = vocabulary(rng, 5000)
+        # Частоты слов по закону Ципфа, как в естественном тексте
+        weights = [1 / rank for rank in range(1, len(words) + 1)]
+        started = time.perf_counter()
+        batch_size = 1000
+        for offset in range(0, options['documents'], batch_size):
+            count = min(batch_size, options['documents'] - offset)
+            users = User.objects.bulk_create([
+                User(username=f'{USERNAME_PREFIX}{offset + n}', email=f'{USERNAME_PREFIX}{offset + n}@example.com')
+                for n in range(count)
+            ])
+            # bulk_create не вызывает save(): поисковый текст задается сразу, индекс обновляет СУБД
+            Submission.objects.bulk_create([
+                Submission(
+                    user=user, conference=conference, title=' '.join(rng.choices(words, weights, k=8)),
+                    search_document=' '.join(rng.choices(words, weights, k=options['words'])),
+                )
+                for user in users
+            ])
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE conferences_submission')
+        self.stdout.write(f"Создано заявок: {options['documents']} за {time.perf_counter() - started:.1f} с")
+        return [
+            words[0],                          # в большинстве документов
+            words[50],
+            words[2000],                       # редкое
+            words[2000][:3],                   # префикс
+            f'{words[10]} {words[300]}',       # оба слова
+            f'{words[100]} {words[1000]} {words[3000]}',
+            'несуществующееслово',
+        ]
+
+    def measure(self, conference, query, repeat):
+        """Число найденных (до SEARCH_RESULTS_LIMIT) и длительности, мс, как в submission_management_list."""
+        durations = []
+        found = 0
+        submissions = Submission.objects.filter(conference=conference).select_related('user', 'final_preview')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            page = rank_submissions(submissions.defer('search_document'), query, SEARCH_RESULTS_LIMIT)
+            search_snippets([submission.id for submission in page], query)
+            durations.append((time.perf_counter() - started) * 1000)
+            found = len(page)
+        return found, durations
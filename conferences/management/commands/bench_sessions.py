@@ -0,0 +1,74 @@
+import time
+import statistics
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+from django.core.management.base import BaseCommand
+
+ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+}
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает затраты на сессию за запрос для движков сессий: чтение (как в '
+        'AuthenticationMiddleware) и чтение с записью (вход, сообщения)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', default=','.join(ENGINES), help=f"Через запятую из: {', '.join(ENGINES)}")
+        parser.add_argument('--sessions', type=int, default=200, help='Сколько сессий создать для каждого движка')
+        parser.add_argument('--requests', type=int, default=2000, help='Сколько запросов имитировать')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Текущий SESSION_ENGINE: {settings.SESSION_ENGINE}; кэш сессий: "
+            f"{type(caches[settings.SESSION_CACHE_ALIAS]).__name__}"
+        )
+        self.stdout.write(
+            f"{'движок':<12}{'чтение p50':>12}{'p95':>9}{'запросов':>10}"
+            f"{'запись p50':>12}{'p95':>9}{'запросов':>10}   (мкс, запросов к БД на запрос)"
+        )
+        for engine in options['engines'].split(','):
+            store_class = import_string(ENGINES[engine.strip()] + '.SessionStore')
+            keys = []
+            for number in range(options['sessions']):
+                session = store_class()
+                session['_auth_user_id'] = str(number)
+                session.create()
+                keys.append(session.session_key)
+            try:
+                reads = self.measure(store_class, keys, options['requests'], write=False)
+                writes = self.measure(store_class, keys, options['requests'], write=True)
+            finally:
+                for key in keys:
+                    store_class(key).delete()
+            self.stdout.write(
+                f"{engine:<12}{reads[0]:>12.0f}{reads[1]:>9.0f}{reads[2]:>10.2f}"
+                f"{writes[0]:>12.0f}{writes[1]:>9.0f}{writes[2]:>10.2f}"
+            )
+
+    def measure(self, store_class, keys, requests, write):
+        """(p50 мкс, p95 мкс, запросов к БД на запрос) для имитации запросов с сессией."""
+        durations = []
+        with CaptureQueriesContext(connection) as queries:
+            for number in range(requests):
+                started = time.perf_counter()
+                session = store_class(keys[number % len(keys)])
+                session.get('_auth_user_id')
+                if write:
+                    session['last_seen'] = number
+                    session.save()
+                durations.append((time.perf_counter() - started) * 1e6)
+        return statistics.median(durations), percentile(durations, 0.95), len(queries) / requests
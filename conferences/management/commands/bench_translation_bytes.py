@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db.models import Model
+from django.utils import translation
+from django.core.management.base import BaseCommand, CommandError
+
+from conferences import routing
+from conferences.models import Conference
+
+
+def fetched_bytes(instance):
+    """Объем загруженных из БД значений полей экземпляра (отложенные поля не учитываются)."""
+    total = 0
+    for field in instance._meta.concrete_fields:
+        if field.attname not in instance.__dict__:
+            continue
+        value = instance.__dict__[field.attname]
+        if value is None or isinstance(value, Model):
+            continue
+        total += len(str(value).encode('utf-8'))
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает объем данных конференций, читаемых из БД, целиком и так, как их '
+        'загружает для страниц conferences.routing (for_language)'
+    )
+
+    def handle(self, *args, **options):
+        if not Conference.objects.exists():
+            raise CommandError('В системе нет ни одной конференции.')
+
+        self.stdout.write(f"{'язык':<6}{'все колонки':>14}{'for_language':>14}{'экономия':>10}")
+        for language, _name in settings.LANGUAGES:
+            with translation.override(language):
+                routing.invalidate()
+                full = sum(fetched_bytes(conference) for conference in Conference.objects.all())
+                partial = sum(fetched_bytes(conference) for conference in routing.all_conferences())
+                saved = 100 - partial * 100 / full if full else 0
+                self.stdout.write(f'{language:<6}{full:>14}{partial:>14}{saved:>9.0f}%')
@@ -0,0 +1,11 @@
+from conferences.management.worker import WorkerCommand
+from conferences.formatcheck import process_pending
+
+
+class Command(WorkerCommand):
+    help = 'Проверяет оформление новых версий работ (DOCX) по требованиям конференции'
+    default_batch_size = 20
+    default_interval = 30
+
+    def run_batch(self, batch_size, options):
+        return process_pending(batch_size)
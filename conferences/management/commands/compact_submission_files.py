@@ -0,0 +1,36 @@
+from django.template.defaultfilters import filesizeformat
+
+from conferences.blobs import process_pending, report
+from conferences.management.worker import WorkerCommand
+
+
+class Command(WorkerCommand):
+    help = (
+        'Переносит файлы версий в хранилище по содержимому, сжимает замененные версии '
+        'и удаляет содержимое без версий; --report — сколько места сэкономлено'
+    )
+    default_batch_size = 20
+    default_interval = 300
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--report', action='store_true', help='Только показать отчет об экономии места')
+
+    def run_batch(self, batch_size, options):
+        return process_pending(batch_size)
+
+    def handle(self, *args, **options):
+        if not options['report']:
+            super().handle(*args, **options)
+        stats = report()
+        saved = stats['dedup_saved'] + stats['compression_saved']
+        share = saved / stats['logical_bytes'] * 100 if stats['logical_bytes'] else 0
+        self.stdout.write(
+            f"Версий: {stats['versions']} (еще не перенесено: {stats['legacy_versions']}), "
+            f"уникальных файлов: {stats['blobs']}, из них сжато: {stats['packed_blobs']}\n"
+            f"Без дедупликации и сжатия: {filesizeformat(stats['logical_bytes'])}, "
+            f"занято: {filesizeformat(stats['stored_bytes'])}\n"
+            f"Сэкономлено: {filesizeformat(saved)} ({share:.1f} %), "
+            f"из них дедупликацией: {filesizeformat(stats['dedup_saved'])}, "
+            f"сжатием: {filesizeformat(stats['compression_saved'])}"
+        )
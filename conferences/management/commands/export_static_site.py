@@ -0,0 +1,27 @@
+from django.conf import settings
+
+from conferences.db_router import replica_reads
+from conferences.management.worker import WorkerCommand
+from conferences.static_export import export
+
+
+class Command(WorkerCommand):
+    help = (
+        'Записывает статическую копию публичных страниц всех конференций на всех языках и sitemap.xml; '
+        'перерисовывает только страницы с измененными данными'
+    )
+    default_batch_size = 200
+    default_interval = 60
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--output', default=settings.STATIC_EXPORT_ROOT, help='Каталог для страниц')
+        parser.add_argument('--full', action='store_true', help='Перерисовать все страницы')
+
+    def run_batch(self, batch_size, options):
+        # Экспорт только читает: отпечатки и страницы — с реплики, если она настроена
+        with replica_reads():
+            rendered = export(options['output'], limit=batch_size, full=options['full'])
+        # --full относится только к первому проходу, дальше сборка по отпечаткам
+        options['full'] = False
+        return rendered
@@ -0,0 +1,11 @@
+from conferences.management.worker import WorkerCommand
+from conferences.extraction import process_pending
+
+
+class Command(WorkerCommand):
+    help = 'Извлекает текст, число слов и страниц из новых версий работ и итоговых PDF'
+    default_batch_size = 20
+    default_interval = 30
+
+    def run_batch(self, batch_size, options):
+        return process_pending(batch_size)
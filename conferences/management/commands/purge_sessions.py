@@ -0,0 +1,21 @@
+import time
+
+from conferences.management.worker import WorkerCommand
+from conferences.sessions import purge_expired
+
+
+class Command(WorkerCommand):
+    help = 'Удаляет истекшие сессии из django_session пачками, не блокируя таблицу надолго'
+    default_batch_size = 1000
+    default_interval = 3600
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--pause', type=float, default=0.1,
+                            help='Пауза в секундах между пачками, чтобы не нагружать БД подряд')
+
+    def run_batch(self, batch_size, options):
+        deleted = purge_expired(batch_size)
+        if deleted >= batch_size and options['pause']:
+            time.sleep(options['pause'])
+        return deleted
@@ -0,0 +1,11 @@
+from conferences.management.worker import WorkerCommand
+from conferences.previews import process_pending
+
+
+class Command(WorkerCommand):
+    help = 'Создает миниатюры и листы страниц для итоговых PDF работ и сборников'
+    default_batch_size = 10
+    default_interval = 30
+
+    def run_batch(self, batch_size, options):
+        return process_pending(batch_size)
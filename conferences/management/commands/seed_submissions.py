@@ -9,19 +9,22 @@ from conferences.models import Conference, Submission, SubmissionVersion
 User = get_user_model()
 
 class Command(BaseCommand):
-    help = 'Создает 5 тестовых заявок для единственной конференции в системе'
+    help = 'Создает 5 тестовых заявок для конференции (по умолчанию — последней созданной)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--conference', help='slug конференции')
 
     def handle(self, *args, **kwargs):
-        # 1. Проверка количества конференций
-        conf_count = Conference.objects.count()
-        
-        if conf_count == 0:
-            raise CommandError("Ошибка: В системе нет ни одной конференции. Сначала создайте конференцию через админку.")
-        
-        if conf_count > 1:
-            raise CommandError(f"Ошибка: В системе найдено {conf_count} конф. Скрипт рассчитан на работу только с ОДНОЙ конференцией.")
+        # 1. Выбор конференции
+        if kwargs['conference']:
+            conf = Conference.objects.filter(slug=kwargs['conference']).first()
+            if conf is None:
+                raise CommandError(f"Ошибка: конференция со slug «{kwargs['conference']}» не найдена.")
+        else:
+            conf = Conference.objects.order_by('-id').first()
+            if conf is None:
+                raise CommandError("Ошибка: В системе нет ни одной конференции. Сначала создайте конференцию через админку.")
 
-        conf = Conference.objects.first()
         self.stdout.write(self.style.SUCCESS(f"Работаем с конференцией: {conf.title} (ID: {conf.id})"))
 
         for i in range(1, 6):
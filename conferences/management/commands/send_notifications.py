@@ -0,0 +1,10 @@
+from conferences.management.worker import WorkerCommand
+from conferences.notifications import send_pending
+
+
+class Command(WorkerCommand):
+    help = 'Отправляет письма-уведомления из очереди (outbox)'
+    default_interval = 5
+
+    def run_batch(self, batch_size, options):
+        return send_pending(batch_size)
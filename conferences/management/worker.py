@@ -0,0 +1,69 @@
+import time
+import signal
+import logging
+
+from django.db import close_old_connections
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+# Наибольшая пауза между попытками, пока run_batch() падает (сбой SMTP, БД)
+MAX_BACKOFF = 300
+
+
+class WorkerCommand(BaseCommand):
+    """
+    Основа для фоновых воркеров: обрабатывает пачку задач через run_batch()
+    один раз или в цикле (--loop) с паузой, когда очередь пуста. В цикле ошибка
+    пачки пишется в лог, и воркер продолжает после паузы, растущей с каждой
+    ошибкой подряд.
+    """
+    default_batch_size = 50
+    default_interval = 10
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--batch-size', type=int, default=self.default_batch_size)
+        parser.add_argument('--interval', type=float, default=self.default_interval,
+                            help='Пауза в секундах, когда очередь пуста')
+
+    def run_batch(self, batch_size, options):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        self._stopping = False
+        if options['loop']:
+            signal.signal(signal.SIGTERM, self._stop)
+            signal.signal(signal.SIGINT, self._stop)
+
+        total = 0
+        failures = 0
+        while True:
+            try:
+                processed = self.run_batch(options['batch_size'], options)
+            except Exception as e:
+                if not options['loop']:
+                    raise
+                failures += 1
+                backoff = min(options['interval'] * 2 ** failures, MAX_BACKOFF)
+                logger.exception(f"{self.__module__.rsplit('.', 1)[-1]}: ошибка пачки ({failures} подряд), пауза {backoff:.0f} с: {e}")
+                # Разорванное соединение с БД не должно ломать следующие пачки
+                close_old_connections()
+                if self._stopping:
+                    break
+                time.sleep(backoff)
+                continue
+            failures = 0
+            total += processed
+            if not options['loop']:
+                if processed < options['batch_size']:
+                    break
+                continue
+            if self._stopping:
+                break
+            if not processed:
+                time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Обработано задач: {total}'))
+
+    def _stop(self, signum, frame):
+        self._stopping = True
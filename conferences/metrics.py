@@ -0,0 +1,203 @@
+import os
+import hmac
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from .remote import client_ip
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    'conference_http_request_duration_seconds',
+    'Длительность обработки запроса',
+    ['view', 'language', 'method'],
+)
+REQUEST_DB_QUERIES = Histogram(
+    'conference_http_request_db_queries',
+    'Количество SQL-запросов на один HTTP-запрос',
+    ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+PDF_CONVERSION_DURATION = Histogram(
+    'conference_pdf_conversion_duration_seconds',
+    'Длительность конвертации DOCX в PDF через LibreOffice',
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+PDF_CONVERSION_FAILURES = Counter(
+    'conference_pdf_conversion_failures_total',
+    'Ошибки конвертации DOCX в PDF',
+    ['reason'],
+)
+PROCEEDINGS_BUILD_DURATION = Histogram(
+    'conference_proceedings_build_duration_seconds',
+    'Длительность сборки сборника трудов',
+    buckets=(1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+PROCEEDINGS_BUILD_FAILURES = Counter(
+    'conference_proceedings_build_failures_total',
+    'Ошибки сборки сборника трудов',
+)
+UPLOAD_BYTES = Counter(
+    'conference_upload_bytes_total',
+    'Объем загруженных файлов',
+    ['kind'],
+)
+NOTIFICATIONS_SENT = Counter(
+    'conference_notifications_sent_total',
+    'Отправленные письма-уведомления',
+    ['kind'],
+)
+NOTIFICATION_FAILURES = Counter(
+    'conference_notification_failures_total',
+    'Ошибки отправки писем-уведомлений',
+)
+CACHE_REQUESTS = Counter(
+    'conference_cache_requests_total',
+    'Обращения к кэшам (hit/miss)',
+    ['cache', 'result'],
+)
+
+# Очереди, глубина которых считается в момент опроса /metrics: имя -> функция без аргументов
+_queues = {}
+
+
+def register_queue(name, depth_func):
+    _queues[name] = depth_func
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+@contextmanager
+def observe(histogram, failures=None):
+    """Замеряет длительность блока; при исключении увеличивает счетчик ошибок."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if failures is not None:
+            failures.inc()
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+class QueueDepthCollector:
+    """
+    Глубина очередей — по COUNT на очередь. Prometheus опрашивает /metrics раз в
+    несколько секунд, поэтому значения кэшируются на METRICS_QUEUE_CACHE_SECONDS.
+    """
+    _cached = None
+    _cached_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def depths(cls):
+        timeout = getattr(settings, 'METRICS_QUEUE_CACHE_SECONDS', 15)
+        with cls._lock:
+            if cls._cached is None or time.monotonic() - cls._cached_at >= timeout:
+                depths = {}
+                for name, depth_func in _queues.items():
+                    try:
+                        depths[name] = depth_func()
+                    except Exception as e:
+                        logger.warning(f"Не удалось получить глубину очереди {name}: {e}")
+                cls._cached, cls._cached_at = depths, time.monotonic()
+            return cls._cached
+
+    def collect(self):
+        family = GaugeMetricFamily('conference_queue_depth', 'Количество задач в очереди', labels=['queue'])
+        for name, depth in self.depths().items():
+            family.add_metric([name], depth)
+        yield family
+
+
+def _pending_pdf_conversions():
+    from .models import Submission
+    return Submission.objects.filter(status='ready_for_print').filter(
+        Q(final_file='') | Q(final_file__isnull=True)
+    ).count()
+
+
+def _pending_notifications():
+    from .models import OutboxEmail
+    return OutboxEmail.objects.filter(status='pending').count()
+
+
+def _pending_text_extractions():
+    from .extraction import pending_versions, pending_final_files, pending_manuscripts
+    return pending_versions().count() + pending_final_files().count() + pending_manuscripts().count()
+
+
+def _pending_pdf_previews():
+    from .previews import pending_final_files, pending_proceedings, pending_page_sets
+    return pending_final_files().count() + pending_proceedings().count() + pending_page_sets().count()
+
+
+def _pending_format_checks():
+    from .formatcheck import pending_checks
+    return pending_checks().count()
+
+
+def _pending_review_assignments():
+    from .assignment import understaffed_submissions
+    return understaffed_submissions().count()
+
+
+def _pending_blob_compaction():
+    from .blobs import legacy_versions, pending_packing
+    return legacy_versions().count() + pending_packing().count()
+
+
+def _pending_expired_sessions():
+    from .sessions import expired_sessions
+    return expired_sessions().count()
+
+
+register_queue('pdf_conversion', _pending_pdf_conversions)
+register_queue('notifications', _pending_notifications)
+register_queue('text_extraction', _pending_text_extractions)
+register_queue('format_check', _pending_format_checks)
+register_queue('pdf_preview', _pending_pdf_previews)
+register_queue('review_assignment', _pending_review_assignments)
+register_queue('blob_compaction', _pending_blob_compaction)
+register_queue('expired_sessions', _pending_expired_sessions)
+
+
+def metrics_view(request):
+    """
+    Метрики в формате Prometheus. При нескольких воркерах gunicorn значения
+    собираются из общего каталога PROMETHEUS_MULTIPROC_DIR. Доступ — с адресов
+    METRICS_ALLOWED_IPS (адрес клиента за прокси) и, если задан METRICS_TOKEN,
+    с заголовком Authorization: Bearer <токен>.
+    """
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+    if allowed and client_ip(request) not in allowed:
+        return HttpResponseForbidden()
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    queues = CollectorRegistry()
+    queues.register(QueueDepthCollector())
+
+    return HttpResponse(generate_latest(registry) + generate_latest(queues), content_type=CONTENT_TYPE_LATEST)
+
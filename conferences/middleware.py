@@ -0,0 +1,346 @@
+import os
+import time
+import random
+import logging
+import uuid
+import cProfile
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import db_router, log, page_cache, profiling, remote, routing
+from .context_processors import LANGUAGE_LINKS_KEY
+from .metrics import REQUEST_DB_QUERIES, REQUEST_LATENCY, record_cache
+
+logger = logging.getLogger('conferences.profiling')
+
+
+class WrappingMiddleware:
+    """
+    Middleware, оборачивающий вызов следующего обработчика. Работает и под WSGI,
+    и под ASGI без переключения между потоками: подклассы реализуют before(),
+    finish() и after(), а синхронный или асинхронный вызов выбирается здесь.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def before(self, request):
+        return None
+
+    def finish(self, request, state):
+        pass
+
+    def after(self, request, response, state):
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.before(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(request, state)
+        return self.after(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.before(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(request, state)
+        return self.after(request, response, state)
+
+
+class RequestIdMiddleware(WrappingMiddleware):
+    """Присваивает запросу идентификатор (или берет X-Request-ID от прокси) для логов."""
+
+    def before(self, request):
+        request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        request.request_id = request_id[:64]
+        return log.set_request_id(request.request_id)
+
+    def finish(self, request, token):
+        log.reset_request_id(token)
+
+    def after(self, request, response, token):
+        response['X-Request-ID'] = request.request_id
+        return response
+
+
+class ReplicaRoutingMiddleware(WrappingMiddleware):
+    """
+    Разрешает чтение с реплики БД безопасным запросам (GET/HEAD) к публичным страницам
+    и API (DB_REPLICA_URL_NAMES). Админка, профиль и страницы оргкомитета читают с
+    основной БД: отставание реплики показало бы сотрудникам устаревшие данные.
+    После записи браузер получает куку, и в течение DB_REPLICA_PIN_SECONDS запросы
+    этой сессии читают с основной БД, чтобы пользователь сразу видел свои изменения.
+    """
+    cookie_name = 'db_pin'
+
+    def __init__(self, get_response):
+        if db_router.REPLICA not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.pin_seconds = getattr(settings, 'DB_REPLICA_PIN_SECONDS', 15)
+        self.url_names = set(getattr(settings, 'DB_REPLICA_URL_NAMES', db_router.REPLICA_URL_NAMES))
+
+    def before(self, request):
+        # Страница еще не известна: реплика разрешается в process_view
+        return db_router.start(False)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (request.method in ('GET', 'HEAD') and self.cookie_name not in request.COOKIES
+                and match.namespace == 'conferences' and match.url_name in self.url_names):
+            db_router.allow_replica()
+        return None
+
+    def finish(self, request, state):
+        routing, token = state
+        db_router.stop(token)
+
+    def after(self, request, response, state):
+        routing, token = state
+        if routing.wrote:
+            response.set_cookie(self.cookie_name, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax')
+        return response
+
+
+class ProfilingMiddleware(WrappingMiddleware):
+    """
+    Замеряет SQL, рендеринг шаблонов и общее время запроса.
+    Результат пишется строкой JSON в лог для всех запросов, а в заголовке Server-Timing
+    отдается только сотрудникам и запросам из INTERNAL_IPS: посторонним незачем знать
+    число SQL-запросов и время ответа. Медленные запросы из выборки дополнительно
+    профилируются через cProfile.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.slow_threshold = getattr(settings, 'PROFILING_SLOW_THRESHOLD_MS', 500) / 1000
+        self.dump_dir = getattr(settings, 'PROFILING_DUMP_DIR', None)
+        profiling.install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = super().__call__(request)
+        return self.expose(request, response, getattr(request, 'user', None))
+
+    async def __acall__(self, request):
+        response = await super().__acall__(request)
+        # Под ASGI пользователь загружается только асинхронно
+        auser = getattr(request, 'auser', None)
+        return self.expose(request, response, await auser() if auser is not None else None)
+
+    def expose(self, request, response, user):
+        server_timing = getattr(request, '_server_timing', None)
+        if server_timing and (remote.is_internal(request) or (user is not None and user.is_staff)):
+            response['Server-Timing'] = server_timing
+        return response
+
+    def before(self, request):
+        timings, token = profiling.start()
+        profiler = None
+        # Под ASGI в цикле событий идут чужие запросы, поэтому профилируем только синхронный режим
+        if self.dump_dir and self.sample_rate and not iscoroutinefunction(self) \
+                and random.random() < self.sample_rate:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # В потоке уже работает другой профилировщик
+                profiler = None
+        return timings, token, profiler
+
+    def finish(self, request, state):
+        timings, token, profiler = state
+        if profiler is not None:
+            profiler.disable()
+        profiling.stop(token)
+
+    def after(self, request, response, state):
+        timings, token, profiler = state
+        total = timings.total_time
+        # Заголовок добавляет expose(), когда известен пользователь
+        request._server_timing = self.server_timing(timings, total)
+        self.log(request, response, timings, total)
+
+        if profiler is not None and total >= self.slow_threshold:
+            self.dump(request, profiler, total)
+        return response
+
+    def server_timing(self, timings, total):
+        metrics = [
+            f'sql;dur={timings.sql_time * 1000:.1f};desc="{timings.sql_count} queries"',
+            f'tpl;dur={timings.template_time * 1000:.1f}',
+        ]
+        for name, duration in timings.spans.items():
+            metrics.append(f'{name};dur={duration * 1000:.1f}')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    def log(self, request, response, timings, total):
+        match = getattr(request, 'resolver_match', None)
+        profile = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'sql_count': timings.sql_count,
+            'sql_ms': round(timings.sql_time * 1000, 1),
+            'template_ms': round(timings.template_time * 1000, 1),
+            'spans_ms': {name: round(duration * 1000, 1) for name, duration in timings.spans.items()},
+            'total_ms': round(total * 1000, 1),
+        }
+        logger.info(
+            f"{request.method} {request.path} {response.status_code} "
+            f"{profile['total_ms']}ms sql={timings.sql_count}/{profile['sql_ms']}ms tpl={profile['template_ms']}ms",
+            extra={'profile': profile},
+        )
+
+    def dump(self, request, profiler, total):
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name if match else 'unknown').replace(':', '-')
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{view_name}-{int(total * 1000)}ms-{os.getpid()}.prof"
+        try:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.dump_dir, filename))
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить профиль {filename}: {e}")
+
+
+class MetricsMiddleware(WrappingMiddleware):
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        profiling.install()
+
+    def before(self, request):
+        # Если ProfilingMiddleware уже собирает данные, используем его счетчики
+        timings = profiling.current()
+        if timings is not None:
+            return timings, None
+        return profiling.start()
+
+    def finish(self, request, state):
+        timings, token = state
+        if token is not None:
+            profiling.stop(token)
+
+    def after(self, request, response, state):
+        timings, token = state
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unmatched'
+        language = getattr(request, 'LANGUAGE_CODE', '')
+        REQUEST_LATENCY.labels(view, language, request.method).observe(timings.total_time)
+        REQUEST_DB_QUERIES.labels(view).observe(timings.sql_count)
+        return response
+
+
+class ConferenceMiddleware(MiddlewareMixin):
+    """
+    Подставляет конференцию из URL (<conference_slug>/...) в request.conference;
+    представления получают ее вместо параметра slug. Поиск — по словарю в памяти
+    процесса (conferences.routing), без запроса к БД.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slug = view_kwargs.pop('conference_slug', None)
+        if slug is None:
+            request.conference = None
+            return None
+        request.conference = routing.get_conference(slug)
+        if request.conference is None:
+            raise Http404("Конференция не найдена")
+        return None
+
+
+class AnonymousPageCacheMiddleware(MiddlewareMixin):
+    """
+    Кэширует готовые публичные страницы для анонимных посетителей по пути и языку.
+    Не используется для авторизованных пользователей, запросов с сообщениями
+    (django.contrib.messages) и ответов, которые меняют сессию или куки. Токен CSRF
+    в формах подставляется заново для каждого посетителя.
+    Страницы сбрасываются сигналами при изменении контента (см. page_cache.PAGE_DEPENDENCIES).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.url_names = set(getattr(settings, 'PAGE_CACHE_URL_NAMES', page_cache.PUBLIC_PAGES))
+        self.timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+
+    def _bypass(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return True
+        if LANGUAGE_LINKS_KEY in request.META:
+            # Страница для статической копии отличается переключателем языка
+            return True
+        if request.user.is_authenticated:
+            return True
+        if settings.SESSION_COOKIE_NAME in request.COOKIES and '_messages' in request.session:
+            return True
+        return 'messages' in request.COOKIES
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None or match.namespace != 'conferences' or match.url_name not in self.url_names:
+            return None
+        if self._bypass(request):
+            return None
+
+        key = page_cache.page_key(request, match.url_name)
+        cached = page_cache.get_cache().get(key)
+        record_cache('page', cached is not None)
+        if cached is None:
+            request._page_cache_key = key
+            return None
+
+        content, headers = cached
+        # Валидаторы сохранены вместе со страницей (conferences/conditional.py)
+        last_modified = parse_http_date_safe(headers.get('Last-Modified', ''))
+        response = get_conditional_response(request, etag=headers.get('ETag'), last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(page_cache.insert_csrf(content, get_token(request)))
+        for name, value in headers.items():
+            response[name] = value
+        response['X-Page-Cache'] = 'HIT'
+        return response
+
+    def process_response(self, request, response):
+        key = getattr(request, '_page_cache_key', None)
+        if key is None or request.method != 'GET':
+            return response
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return response
+        if 'private' in response.get('Cache-Control', '') or 'no-store' in response.get('Cache-Control', ''):
+            return response
+        session = getattr(request, 'session', None)
+        if session is not None and session.modified:
+            return response
+        storage = getattr(request, '_messages', None)
+        if storage is not None and storage.added_new:
+            return response
+
+        headers = {name: response[name] for name in page_cache.CACHED_HEADERS if response.has_header(name)}
+        page_cache.get_cache().set(key, (page_cache.strip_csrf(response.content), headers), self.timeout)
+        response['X-Page-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,150 @@
+# Generated by Django 5.2.11 on 2026-10-19 16:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+from conferences.html import compile_html
+
+RICH_TEXT_FIELDS = (
+    'description', 'location_description', 'program', 'committee', 'participation_fee', 'submission_format',
+)
+
+
+def compile_existing(apps, schema_editor):
+    Conference = apps.get_model('conferences', 'Conference')
+    for conference in Conference.objects.all():
+        for name in RICH_TEXT_FIELDS:
+            for lang, _name in settings.LANGUAGES:
+                setattr(conference, f'{name}_html_{lang}', compile_html(getattr(conference, f'{name}_{lang}')))
+        conference.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0011_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conference',
+            name='committee_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='committee_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='committee_html_kk',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='committee_html_ru',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='description_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='description_html_kk',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='description_html_ru',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='location_description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='location_description_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='location_description_html_kk',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='location_description_html_ru',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='participation_fee_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='participation_fee_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='participation_fee_html_kk',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='participation_fee_html_ru',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='program_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='program_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='program_html_kk',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='program_html_ru',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='submission_format_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='submission_format_html_en',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='submission_format_html_kk',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='submission_format_html_ru',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(compile_existing, migrations.RunPython.noop),
+    ]
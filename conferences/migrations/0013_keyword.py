@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-19 16:50
+
+from django.db import migrations, models
+
+from conferences.models import parse_keywords
+
+
+def backfill_keywords(apps, schema_editor):
+    Keyword = apps.get_model('conferences', 'Keyword')
+    Submission = apps.get_model('conferences', 'Submission')
+    for submission in Submission.objects.exclude(keywords='').iterator():
+        names = parse_keywords(submission.keywords)
+        Keyword.objects.bulk_create([Keyword(name=name) for name in names], ignore_conflicts=True)
+        submission.keyword_set.set(Keyword.objects.filter(name__in=names))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0012_conference_rich_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Keyword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Ключевое слово')),
+            ],
+            options={
+                'verbose_name': 'Ключевое слово',
+                'verbose_name_plural': 'Ключевые слова',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='keyword_set',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='submissions', to='conferences.keyword'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['conference', 'status'], name='submission_conf_status_idx'),
+        ),
+        migrations.RunPython(backfill_keywords, migrations.RunPython.noop),
+    ]
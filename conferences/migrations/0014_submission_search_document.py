@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-19 16:52
+
+from django.db import migrations, models
+
+from conferences import search
+
+
+def backfill_documents(apps, schema_editor):
+    Submission = apps.get_model('conferences', 'Submission')
+    for submission in Submission.objects.select_related('user').iterator():
+        Submission.objects.filter(pk=submission.pk).update(search_document=search.build_document(submission))
+
+
+def create_index(apps, schema_editor):
+    search.create_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0013_keyword'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from conferences.models import file_sha256
+
+
+def backfill_hashes(apps, schema_editor):
+    """Хэши уже загруженных файлов: с ними файлы попадают в очередь extract_manuscripts."""
+    SubmissionVersion = apps.get_model('conferences', 'SubmissionVersion')
+    Submission = apps.get_model('conferences', 'Submission')
+    for model, field, hash_field in (
+        (SubmissionVersion, 'file', 'file_hash'),
+        (Submission, 'final_file', 'final_file_hash'),
+    ):
+        for obj in model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).iterator():
+            try:
+                digest = file_sha256(getattr(obj, field))
+            except OSError:
+                continue
+            model.objects.filter(pk=obj.pk).update(**{hash_field: digest})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0014_submission_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ManuscriptText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256 файла')),
+                ('text', models.TextField(blank=True, verbose_name='Текст')),
+                ('word_count', models.PositiveIntegerField(default=0, verbose_name='Слов')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True, verbose_name='Страниц')),
+                ('error', models.CharField(blank=True, max_length=255, verbose_name='Ошибка извлечения')),
+                ('extracted_at', models.DateTimeField(auto_now_add=True, verbose_name='Извлечено')),
+            ],
+            options={
+                'verbose_name': 'Текст рукописи',
+                'verbose_name_plural': 'Тексты рукописей',
+            },
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='final_file_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='submissionversion',
+            name='file_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='final_manuscript',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='final_submissions', to='conferences.manuscripttext'),
+        ),
+        migrations.AddField(
+            model_name='submissionversion',
+            name='manuscript',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='versions', to='conferences.manuscripttext'),
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
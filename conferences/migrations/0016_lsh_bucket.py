@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0015_manuscript_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='manuscripttext',
+            name='minhash',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.CreateModel(
+            name='LshBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('manuscript', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='conferences.manuscripttext')),
+            ],
+            options={
+                'unique_together': {('key', 'manuscript')},
+            },
+        ),
+    ]
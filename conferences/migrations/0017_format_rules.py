@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0016_lsh_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FormatReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('passed', models.BooleanField(null=True, verbose_name='Соответствует требованиям')),
+                ('checks', models.JSONField(default=list, verbose_name='Проверки')),
+                ('error', models.CharField(blank=True, max_length=255, verbose_name='Ошибка проверки')),
+                ('checked_at', models.DateTimeField(verbose_name='Проверено')),
+                ('version', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='format_report', to='conferences.submissionversion')),
+            ],
+            options={
+                'verbose_name': 'Проверка оформления',
+                'verbose_name_plural': 'Проверки оформления',
+            },
+        ),
+        migrations.CreateModel(
+            name='FormatRules',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_pages', models.PositiveIntegerField(blank=True, null=True, verbose_name='Максимум страниц')),
+                ('min_words', models.PositiveIntegerField(blank=True, null=True, verbose_name='Минимум слов')),
+                ('max_words', models.PositiveIntegerField(blank=True, null=True, verbose_name='Максимум слов')),
+                ('abstract_min_words', models.PositiveIntegerField(blank=True, null=True, verbose_name='Аннотация: минимум слов')),
+                ('abstract_max_words', models.PositiveIntegerField(blank=True, null=True, verbose_name='Аннотация: максимум слов')),
+                ('margin_top', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Верхнее поле, мм')),
+                ('margin_bottom', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Нижнее поле, мм')),
+                ('margin_left', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Левое поле, мм')),
+                ('margin_right', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Правое поле, мм')),
+                ('font_name', models.CharField(blank=True, help_text='Например, Times New Roman', max_length=100, verbose_name='Шрифт основного текста')),
+                ('font_size', models.DecimalField(blank=True, decimal_places=1, max_digits=4, null=True, verbose_name='Кегль основного текста, пт')),
+                ('required_headings', models.TextField(blank=True, help_text='Каждый раздел с новой строки; варианты названия через | (например, Список литературы|References)', verbose_name='Обязательные разделы')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('conference', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='format_rules', to='conferences.conference')),
+            ],
+            options={
+                'verbose_name': 'Требования к оформлению',
+                'verbose_name_plural': 'Требования к оформлению',
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:22
+
+import conferences.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+from conferences.models import file_sha256
+
+
+def backfill_hashes(apps, schema_editor):
+    """Хэши уже созданных сборников: с ними файлы попадают в очередь render_pdf_previews."""
+    Proceedings = apps.get_model('conferences', 'Proceedings')
+    for proceedings in Proceedings.objects.exclude(file='').iterator():
+        try:
+            digest = file_sha256(proceedings.file)
+        except OSError:
+            continue
+        Proceedings.objects.filter(pk=proceedings.pk).update(file_hash=digest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0017_format_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PdfPreview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256 файла')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True, verbose_name='Страниц')),
+                ('thumbnail', models.ImageField(blank=True, height_field='thumbnail_height', upload_to=conferences.models.get_preview_path, verbose_name='Первая страница', width_field='thumbnail_width')),
+                ('thumbnail_width', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('thumbnail_height', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('strip', models.ImageField(blank=True, height_field='strip_height', upload_to=conferences.models.get_preview_path, verbose_name='Страницы', width_field='strip_width')),
+                ('strip_width', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('strip_height', models.PositiveIntegerField(blank=True, editable=False, null=True)),
+                ('error', models.CharField(blank=True, max_length=255, verbose_name='Ошибка')),
+                ('rendered_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+            ],
+            options={
+                'verbose_name': 'Превью PDF',
+                'verbose_name_plural': 'Превью PDF',
+            },
+        ),
+        migrations.AddField(
+            model_name='proceedings',
+            name='file_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='proceedings',
+            name='preview',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='proceedings', to='conferences.pdfpreview'),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='final_preview',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='conferences.pdfpreview'),
+        ),
+        migrations.RunPython(backfill_hashes, migrations.RunPython.noop),
+    ]
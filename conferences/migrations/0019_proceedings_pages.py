@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0018_pdf_preview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proceedings',
+            name='page_index',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proceedings',
+            name='pages_error',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='proceedings',
+            name='pages_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
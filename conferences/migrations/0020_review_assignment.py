@@ -0,0 +1,50 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0019_proceedings_pages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conference',
+            name='reviews_per_submission',
+            field=models.PositiveSmallIntegerField(default=2, verbose_name='Рецензентов на работу'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='expertise',
+            field=models.ManyToManyField(blank=True, related_name='experts', to='conferences.keyword', verbose_name='Области экспертизы'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='review_capacity',
+            field=models.PositiveSmallIntegerField(default=10, help_text='Одновременно рецензируемых работ во всех конференциях', verbose_name='Макс. работ на рецензии'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('author', 'Автор (Участник)'), ('organizer', 'Организатор (Админ/Редактор)'), ('reviewer', 'Рецензент')], default='author', max_length=20, verbose_name='Роль'),
+        ),
+        migrations.CreateModel(
+            name='ReviewAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0, verbose_name='Совпадение экспертизы')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_assignments', to=settings.AUTH_USER_MODEL)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_assignments', to='conferences.submission')),
+            ],
+            options={
+                'verbose_name': 'Назначение рецензента',
+                'verbose_name_plural': 'Назначения рецензентов',
+                'unique_together': {('submission', 'reviewer')},
+            },
+        ),
+    ]
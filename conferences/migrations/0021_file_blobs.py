@@ -0,0 +1,38 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:45
+
+import conferences.models
+import conferences.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0020_review_assignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('name', models.CharField(max_length=255, verbose_name='Файл в хранилище')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('stored_size', models.PositiveBigIntegerField(verbose_name='Занимает, байт')),
+                ('packed', models.BooleanField(default=False, verbose_name='Сжат')),
+                ('packed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Содержимое файла',
+                'verbose_name_plural': 'Содержимое файлов',
+            },
+        ),
+        migrations.AlterField(
+            model_name='submissionversion',
+            name='file',
+            field=models.FileField(storage=conferences.storage.DedupStorage(), upload_to=conferences.models.get_submission_file_path, validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['doc', 'docx'])], verbose_name='Файл версии (DOC/DOCX)'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0021_file_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivePack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255, unique=True, verbose_name='Файл архива')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('file_count', models.PositiveIntegerField(verbose_name='Файлов')),
+                ('original_bytes', models.PositiveBigIntegerField(verbose_name='Исходный объем, байт')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conference', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archive_packs', to='conferences.conference')),
+            ],
+            options={
+                'verbose_name': 'Архив медиафайлов',
+                'verbose_name_plural': 'Архивы медиафайлов',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Имя в хранилище')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('sha256', models.CharField(max_length=64, verbose_name='SHA-256')),
+                ('block_size', models.PositiveIntegerField()),
+                ('blocks', models.JSONField(default=list)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('pack', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='files', to='conferences.archivepack')),
+            ],
+            options={
+                'verbose_name': 'Файл в архиве',
+                'verbose_name_plural': 'Файлы в архиве',
+            },
+        ),
+    ]
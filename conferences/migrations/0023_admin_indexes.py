@@ -0,0 +1,54 @@
+# Generated by Django 5.2.11 on 2026-10-19 17:55
+
+from django.db import migrations, models
+
+# Поиск пользователей в админке: email по точному совпадению, остальное по началу строки.
+# PostgreSQL сравнивает UPPER(колонка::text), поэтому нужны индексы по выражению с
+# text_pattern_ops (иначе LIKE 'ABC%' их не использует при нелокали C). MySQL ищет
+# по самим колонкам (username и email уже уникальны). В SQLite (разработка) Django
+# добавляет ESCAPE к LIKE, и индекс все равно не используется.
+USER_SEARCH_INDEXES = {
+    'postgresql': [
+        ('user_email_upper_idx', 'UPPER("email"::text) text_pattern_ops'),
+        ('user_username_upper_idx', 'UPPER("username"::text) text_pattern_ops'),
+        ('user_last_name_upper_idx', 'UPPER("last_name"::text) text_pattern_ops'),
+        ('user_first_name_upper_idx', 'UPPER("first_name"::text) text_pattern_ops'),
+    ],
+    'mysql': [
+        ('user_last_name_idx', '`last_name`'),
+        ('user_first_name_idx', '`first_name`'),
+    ],
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    table = schema_editor.quote_name(apps.get_model('conferences', 'User')._meta.db_table)
+    for name, expression in USER_SEARCH_INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f'CREATE INDEX {name} ON {table} ({expression})')
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    table = schema_editor.quote_name(apps.get_model('conferences', 'User')._meta.db_table)
+    for name, _expression in USER_SEARCH_INDEXES.get(vendor, []):
+        schema_editor.execute(f'DROP INDEX {name} ON {table}' if vendor == 'mysql' else f'DROP INDEX {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('conferences', '0022_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['status', 'id'], name='submission_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'is_active'], name='user_role_active_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-19 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conferences', '0024_content_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EditorImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256 исходного файла')),
+                ('name', models.CharField(db_index=True, max_length=255, verbose_name='Файл в хранилище')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер, байт')),
+                ('original_size', models.PositiveBigIntegerField(verbose_name='Исходный размер, байт')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Изображение редактора',
+                'verbose_name_plural': 'Изображения редактора',
+            },
+        ),
+    ]
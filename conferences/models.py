@@ -1,18 +1,28 @@
 import re
 import os
+import hashlib
 import logging
 import subprocess
 
 from PIL import Image
 from io import BytesIO
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 from django.forms import ValidationError
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.contrib.auth.models import AbstractUser
 from django_ckeditor_5.fields import CKEditor5Field
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import gettext_lazy as _, get_language
+from modeltranslation import settings as mt_settings
+from modeltranslation.translator import translator
+from modeltranslation.utils import resolution_order
 from django.core.validators import FileExtensionValidator
+from .html import compile_html
+from .storage import DedupStorage
+from .profiling import timed
+from .metrics import PDF_CONVERSION_DURATION, PDF_CONVERSION_FAILURES
 logger = logging.getLogger(__name__)
 
 
@@ -20,21 +30,83 @@ class User(AbstractUser):
     ROLE_CHOICES = [
         ('author', _('Автор (Участник)')),
         ('organizer', _('Организатор (Админ/Редактор)')),
+        ('reviewer', _('Рецензент')),
     ]
     
     role = models.CharField(_("Роль"), max_length=20, choices=ROLE_CHOICES, default='author')
     organization = models.CharField(_("Организация"), max_length=255, blank=True)
     email = models.EmailField(_("Электронная почта"), unique=True)
+    language = models.CharField(_("Язык уведомлений"), max_length=10, choices=settings.LANGUAGES, default=settings.LANGUAGE_CODE)
+    # Для рецензентов: по ним распределяются работы (manage.py assign_reviewers)
+    expertise = models.ManyToManyField('Keyword', verbose_name=_("Области экспертизы"), related_name='experts', blank=True)
+    review_capacity = models.PositiveSmallIntegerField(
+        _("Макс. работ на рецензии"), default=10, help_text=_("Одновременно рецензируемых работ во всех конференциях")
+    )
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Рецензенты для распределения работ, фильтр по роли в админке
+            models.Index(fields=['role', 'is_active'], name='user_role_active_idx'),
+        ]
 
     @property
     def is_organizer(self):
         return self.role == 'organizer' or self.is_staff
+
+    @property
+    def is_reviewer(self):
+        return self.role == 'reviewer'
     
     def __str__(self):
         full_name = f"{self.last_name} {self.first_name}".strip()
         return full_name if full_name else self.username
 
 
+def loaded_languages(language=None):
+    """
+    Языки, колонки которых нужны для вывода: активный язык и запасные языки из
+    MODELTRANSLATION_FALLBACK_LANGUAGES до языка по умолчанию включительно
+    (он обязателен к заполнению, дальше по цепочке дело не доходит).
+    """
+    languages = []
+    for lang in resolution_order(language or get_language() or settings.LANGUAGE_CODE):
+        languages.append(lang)
+        if lang == mt_settings.DEFAULT_LANGUAGE:
+            break
+    return languages
+
+
+# Поля CKEditor, для которых при сохранении готовится очищенная копия <поле>_html
+RICH_TEXT_FIELDS = (
+    'description', 'location_description', 'program', 'committee', 'participation_fee', 'submission_format',
+)
+
+
+class ConferenceQuerySet(models.QuerySet):
+    def for_language(self, *rich_fields, language=None):
+        """
+        Загружает переводимые колонки только нужных языков (см. loaded_languages).
+        Исходный HTML CKEditor не загружается вовсе, готовый <поле>_html — только
+        для полей, перечисленных в rich_fields.
+        """
+        languages = loaded_languages(language)
+        translated = translator.get_options_for_model(self.model).get_field_names()
+        fields = []
+        for field in self.model._meta.concrete_fields:
+            if field.name in translated:
+                continue
+            original = getattr(field, 'translated_field', None)
+            if original is not None:
+                if field.language not in languages:
+                    continue
+                if isinstance(original, CKEditor5Field):
+                    continue
+                if original.name.endswith('_html') and original.name[:-len('_html')] not in rich_fields:
+                    continue
+            fields.append(field.name)
+        return self.only(*fields)
+
+
 class Conference(models.Model):
     title = models.CharField("Название конференции", max_length=500)
     short_title = models.CharField("Краткое название", max_length=100)
@@ -55,20 +127,30 @@ class Conference(models.Model):
     participation_fee = CKEditor5Field("Плата за участие", config_name='default', blank=True)
     submission_format = CKEditor5Field("Формат работы", config_name='default', blank=True)
 
+    # Заполняются в save() из полей CKEditor, выводятся в шаблонах как есть
+    description_html = models.TextField(blank=True, editable=False)
+    location_description_html = models.TextField(blank=True, editable=False)
+    program_html = models.TextField(blank=True, editable=False)
+    committee_html = models.TextField(blank=True, editable=False)
+    participation_fee_html = models.TextField(blank=True, editable=False)
+    submission_format_html = models.TextField(blank=True, editable=False)
+
     poster = models.ImageField("Постер (широкоугольный)", upload_to='conf/posters/')
     is_active = models.BooleanField("Активна", default=True)
+    reviews_per_submission = models.PositiveSmallIntegerField("Рецензентов на работу", default=2)
+    # Время последнего изменения контента конференции (и удаления ее материалов, см. conferences/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ConferenceQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Kонференция"
         verbose_name_plural = "Kонференции"
 
-    @classmethod
-    def get_current(cls):
-        return cls.objects.order_by('-id').first()
-    
     def clean(self):
-        if Conference.objects.exists() and not self.pk:
-            raise ValidationError(("Вы не можете создать более одной конференции. Пожалуйста, отредактируйте существующую."))
+        from .routing import RESERVED_SLUGS
+        if self.slug in RESERVED_SLUGS:
+            raise ValidationError({'slug': f"Адрес «{self.slug}» занят страницами сайта, выберите другой."})
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -91,11 +173,111 @@ class Conference(models.Model):
             except Exception as e:
                 print(f"Ошибка обработки изображения: {e}")
 
+        self.compile_rich_text()
         super().save(*args, **kwargs)
 
+    def compile_rich_text(self):
+        """Готовит очищенный HTML всех полей CKEditor на всех языках."""
+        for name in RICH_TEXT_FIELDS:
+            for lang, _name in settings.LANGUAGES:
+                setattr(self, f'{name}_html_{lang}', compile_html(getattr(self, f'{name}_{lang}')))
+
     def __str__(self):
         return self.title
 
+def parse_keywords(text):
+    """Ключевые слова из строки через запятую: нижний регистр, без повторов, в исходном порядке."""
+    keywords = []
+    for part in re.split(r'[,;\n]', text or ''):
+        keyword = ' '.join(part.split()).lower()[:Keyword.NAME_MAX_LENGTH]
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+class Keyword(models.Model):
+    NAME_MAX_LENGTH = 100
+
+    name = models.CharField("Ключевое слово", max_length=NAME_MAX_LENGTH, unique=True)
+
+    class Meta:
+        verbose_name = "Ключевое слово"
+        verbose_name_plural = "Ключевые слова"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class ManuscriptText(models.Model):
+    """Текст, извлеченный из файла работы. Один на содержимое файла: одинаковые файлы не разбираются повторно."""
+    sha256 = models.CharField("SHA-256 файла", max_length=64, unique=True)
+    text = models.TextField("Текст", blank=True)
+    word_count = models.PositiveIntegerField("Слов", default=0)
+    page_count = models.PositiveIntegerField("Страниц", null=True, blank=True)
+    error = models.CharField("Ошибка извлечения", max_length=255, blank=True)
+    extracted_at = models.DateTimeField("Извлечено", auto_now_add=True)
+    # Подпись MinHash для поиска похожих работ (см. conferences/similarity.py)
+    minhash = models.BinaryField(null=True, editable=False)
+
+    class Meta:
+        verbose_name = "Текст рукописи"
+        verbose_name_plural = "Тексты рукописей"
+
+    def __str__(self):
+        return self.sha256[:12]
+
+
+class LshBucket(models.Model):
+    """Корзина LSH: тексты с одинаковым ключом — кандидаты в похожие."""
+    key = models.BigIntegerField()
+    manuscript = models.ForeignKey(ManuscriptText, on_delete=models.CASCADE, related_name='lsh_buckets')
+
+    class Meta:
+        unique_together = ('key', 'manuscript')
+
+
+def get_preview_path(instance, filename):
+    return f'previews/{instance.sha256[:2]}/{filename}'
+
+
+class PdfPreview(models.Model):
+    """
+    Миниатюра первой страницы и лист с уменьшенными страницами PDF. Одна на
+    содержимое файла, строится фоновым воркером (manage.py render_pdf_previews).
+    """
+    sha256 = models.CharField("SHA-256 файла", max_length=64, unique=True)
+    page_count = models.PositiveIntegerField("Страниц", null=True, blank=True)
+    thumbnail = models.ImageField(
+        "Первая страница", upload_to=get_preview_path, blank=True,
+        width_field='thumbnail_width', height_field='thumbnail_height'
+    )
+    thumbnail_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    thumbnail_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    strip = models.ImageField(
+        "Страницы", upload_to=get_preview_path, blank=True,
+        width_field='strip_width', height_field='strip_height'
+    )
+    strip_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    strip_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    error = models.CharField("Ошибка", max_length=255, blank=True)
+    rendered_at = models.DateTimeField("Создано", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Превью PDF"
+        verbose_name_plural = "Превью PDF"
+
+    def __str__(self):
+        return self.sha256[:12]
+
+
+def file_sha256(field_file):
+    digest = hashlib.sha256()
+    for chunk in field_file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
 def get_conference_pdf_path(instance, filename):
     return f'submissions/{instance.id}/{filename}'
 
@@ -120,7 +302,11 @@ class Submission(models.Model):
     authors_list = models.TextField("Список соавторов", help_text="ФИО, ученая степень, организация (каждый соавтор с новой строки или через запятую)", blank=True)
     abstract_text = models.TextField("Аннотация", help_text="Краткое описание работы (200-500 слов)", blank=True)
     keywords = models.CharField("Ключевые слова", max_length=255, help_text="Введите 3-5 слов через запятую", blank=True)
-    
+    # Нормализованная копия keywords для фасетов и фильтрации, обновляется в save()
+    keyword_set = models.ManyToManyField(Keyword, related_name='submissions', blank=True, editable=False)
+    # Текст для полнотекстового поиска (см. conferences/search.py), обновляется в save()
+    search_document = models.TextField(blank=True, editable=False)
+
     status = models.CharField("Статус", max_length=20, choices=STATUS_CHOICES, default='under_review')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -132,18 +318,74 @@ class Submission(models.Model):
         null=True, 
         validators=[FileExtensionValidator(allowed_extensions=['pdf'])]
     )
+    final_file_hash = models.CharField(max_length=64, blank=True, editable=False)
+    final_manuscript = models.ForeignKey(
+        ManuscriptText, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='final_submissions'
+    )
+    # Заполняется фоновым воркером (manage.py render_pdf_previews)
+    final_preview = models.ForeignKey(
+        PdfPreview, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='submissions'
+    )
     
     class Meta:
         unique_together = ('user', 'conference')
         verbose_name = "Заявка"
         verbose_name_plural = "Заявки"
+        indexes = [
+            models.Index(fields=['conference', 'status'], name='submission_conf_status_idx'),
+            # Фильтр по статусу в админке при сортировке по умолчанию (-pk)
+            models.Index(fields=['status', 'id'], name='submission_status_id_idx'),
+            # Last-Modified страницы материалов конференции (conferences/conditional.py)
+            models.Index(fields=['conference', 'updated_at'], name='submission_conf_updated_idx'),
+        ]
+
+    @property
+    def keywords_list(self):
+        return parse_keywords(self.keywords)
 
     def save(self, *args, **kwargs):
+        old_status = None
+        old_final_file = None
+        keywords_changed = True
+        convert = False
         if self.pk:
             old_instance = Submission.objects.get(pk=self.pk)
-            if old_instance.status != 'ready_for_print' and self.status == 'ready_for_print':
-                self.convert_to_pdf()
-        super().save(*args, **kwargs)
+            old_status = old_instance.status
+            old_final_file = old_instance.final_file.name
+            keywords_changed = old_instance.keywords != self.keywords
+            self._previous_status = old_status
+            convert = old_instance.status != 'ready_for_print' and self.status == 'ready_for_print'
+        if self.final_file.name != old_final_file:
+            # Новый PDF попадет в очередь извлечения текста
+            self.final_file_hash = file_sha256(self.final_file) if self.final_file else ''
+            self.final_manuscript = None
+            self.final_preview = None
+        from .search import build_document, submission_body
+        self.search_document = build_document(self, submission_body(self))
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if keywords_changed:
+                self.sync_keywords()
+            if old_status is not None and old_status != self.status:
+                from .notifications import queue_status_change
+                queue_status_change(self, old_status)
+            if convert:
+                # LibreOffice работает долго: конвертация — после коммита, без открытой транзакции
+                # и блокировок строк; ее ошибка не откатывает смену статуса и письма в очереди
+                transaction.on_commit(self._convert_after_commit)
+
+    def _convert_after_commit(self):
+        old_final_file = self.final_file.name
+        self.convert_to_pdf()
+        if self.final_file.name != old_final_file:
+            self.save(update_fields=[
+                'final_file', 'final_file_hash', 'final_manuscript', 'final_preview', 'search_document', 'updated_at',
+            ])
+
+    def sync_keywords(self):
+        names = self.keywords_list
+        Keyword.objects.bulk_create([Keyword(name=name) for name in names], ignore_conflicts=True)
+        self.keyword_set.set(Keyword.objects.filter(name__in=names))
     
     def convert_to_pdf(self):
         """Конвертирует последний docx в pdf и сохраняет в папку заявки"""
@@ -151,24 +393,28 @@ class Submission(models.Model):
         if not last_version or not last_version.file:
             return
 
-        input_path = last_version.file.path
         output_dir = os.path.join(settings.MEDIA_ROOT, 'submissions', str(self.id))
         
         if not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
 
         try:
-            # Вызов LibreOffice
-            subprocess.run([
-                'soffice',
-                '--headless',
-                '--convert-to', 'pdf',
-                '--outdir', output_dir,
-                input_path
-            ], check=True, capture_output=True)
-
-            filename_docx = os.path.basename(input_path)
-            filename_pdf = os.path.splitext(filename_docx)[0] + '.pdf'
+            # Вызов LibreOffice; сжатая старая версия распаковывается во временный файл
+            with timed('convert'), PDF_CONVERSION_DURATION.time(), \
+                    last_version.file.storage.local_path(last_version.file.name) as input_path:
+                subprocess.run([
+                    'soffice',
+                    '--headless',
+                    '--convert-to', 'pdf',
+                    '--outdir', output_dir,
+                    input_path
+                ], check=True, capture_output=True)
+
+            # LibreOffice называет PDF по входному файлу (blob или временный файл);
+            # как и до хранения по содержимому, PDF называется по номеру версии
+            converted = os.path.splitext(os.path.basename(input_path))[0] + '.pdf'
+            filename_pdf = f'{last_version.version_number}.pdf'
+            os.replace(os.path.join(output_dir, converted), os.path.join(output_dir, filename_pdf))
             
             relative_path = os.path.join('submissions', str(self.id), filename_pdf)
             self.final_file = relative_path.replace('\\', '/')
@@ -176,8 +422,10 @@ class Submission(models.Model):
             logger.info(f"Успешная конвертация: {filename_pdf} для ID {self.id}")
             
         except subprocess.CalledProcessError as e:
+            PDF_CONVERSION_FAILURES.labels('soffice').inc()
             logger.error(f"Ошибка LibreOffice (ID {self.id}): {e.stderr}")
         except Exception as e:
+            PDF_CONVERSION_FAILURES.labels('error').inc()
             logger.exception(f"Ошибка при конвертации заявки ID {self.id}: {e}")
         
     def __str__(self):
@@ -187,27 +435,221 @@ class Submission(models.Model):
         return self.versions.count()
 
 
+class ReviewAssignment(models.Model):
+    """Работа, назначенная рецензенту; распределяет conferences/assignment.py."""
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='review_assignments')
+    reviewer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='review_assignments')
+    # Доля ключевых слов работы, входящих в экспертизу рецензента
+    score = models.FloatField("Совпадение экспертизы", default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('submission', 'reviewer')
+        verbose_name = "Назначение рецензента"
+        verbose_name_plural = "Назначения рецензентов"
+
+    def __str__(self):
+        return f"{self.reviewer} → #{self.submission_id}"
+
+
+class FileBlob(models.Model):
+    """Содержимое файла версии, общее для всех одинаковых загрузок (см. conferences/blobs.py)."""
+    sha256 = models.CharField("SHA-256", max_length=64, unique=True)
+    name = models.CharField("Файл в хранилище", max_length=255)
+    size = models.PositiveBigIntegerField("Размер, байт")
+    stored_size = models.PositiveBigIntegerField("Занимает, байт")
+    packed = models.BooleanField("Сжат", default=False)
+    # Когда проверялась возможность сжатия; пусто — еще не проверялась
+    packed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Содержимое файла"
+        verbose_name_plural = "Содержимое файлов"
+
+    def __str__(self):
+        return self.name
+
+
+class EditorImage(models.Model):
+    """Изображение, загруженное через CKEditor (см. CKEditorImageStorage): поиск повторов по хэшу и размеры для <img>."""
+    sha256 = models.CharField("SHA-256 исходного файла", max_length=64, unique=True)
+    name = models.CharField("Файл в хранилище", max_length=255, db_index=True)
+    # Пусто, если размер файла определить не удалось
+    width = models.PositiveIntegerField("Ширина", null=True, blank=True)
+    height = models.PositiveIntegerField("Высота", null=True, blank=True)
+    size = models.PositiveBigIntegerField("Размер, байт")
+    original_size = models.PositiveBigIntegerField("Исходный размер, байт")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Изображение редактора"
+        verbose_name_plural = "Изображения редактора"
+
+    def __str__(self):
+        return self.name
+
+
+class ArchivePack(models.Model):
+    """Файл холодного архива с медиафайлами прошедшей конференции (см. conferences/archive.py)."""
+    conference = models.ForeignKey(Conference, on_delete=models.PROTECT, related_name='archive_packs')
+    file_name = models.CharField("Файл архива", max_length=255, unique=True)
+    size = models.PositiveBigIntegerField("Размер, байт")
+    file_count = models.PositiveIntegerField("Файлов")
+    original_bytes = models.PositiveBigIntegerField("Исходный объем, байт")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Архив медиафайлов"
+        verbose_name_plural = "Архивы медиафайлов"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.file_name
+
+    @property
+    def path(self):
+        return os.path.join(settings.ARCHIVE_ROOT, self.file_name)
+
+
+class ArchivedFile(models.Model):
+    """
+    Медиафайл, перенесенный в архив: name — прежнее имя в MEDIA_ROOT, blocks — таблица
+    смещений блоков в файле архива [[смещение, длина, сжат ли]], по ней читается любой
+    диапазон байт без распаковки остального.
+    """
+    name = models.CharField("Имя в хранилище", max_length=255, unique=True)
+    pack = models.ForeignKey(ArchivePack, on_delete=models.CASCADE, related_name='files')
+    size = models.PositiveBigIntegerField("Размер, байт")
+    sha256 = models.CharField("SHA-256", max_length=64)
+    block_size = models.PositiveIntegerField()
+    blocks = models.JSONField(default=list)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Файл в архиве"
+        verbose_name_plural = "Файлы в архиве"
+
+    def __str__(self):
+        return self.name
+
+
 class SubmissionVersion(models.Model):
     submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='versions')
+    # Хранится по содержимому (blobs/...), из upload_to берется только расширение
     file = models.FileField(
         "Файл версии (DOC/DOCX)",
         upload_to=get_submission_file_path,
+        storage=DedupStorage(),
         validators=[FileExtensionValidator(allowed_extensions=['doc', 'docx'])]
     )
     version_number = models.PositiveIntegerField("Номер версии", default=1)
     author_comment = models.TextField("Комментарий автора", blank=True)
     admin_comment = models.TextField("Ответ оргкомитета", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    file_hash = models.CharField(max_length=64, blank=True, editable=False)
+    # Заполняется фоновым извлечением текста (manage.py extract_manuscripts)
+    manuscript = models.ForeignKey(
+        ManuscriptText, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='versions'
+    )
 
     class Meta:
         verbose_name = "Версия работы"
         verbose_name_plural = "Версии работы"
         ordering = ['-created_at']
 
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        new_file = bool(self.file) and not self.file_hash
+        if new_file:
+            self.file_hash = file_sha256(self.file)
+        with transaction.atomic():
+            # Строка содержимого блокируется до коммита: сжатие и удаление содержимого
+            # (conferences/blobs.py) ждут, пока версия не сошлется на него, и наоборот
+            blob = FileBlob.objects.select_for_update().filter(sha256=self.file_hash).first() if new_file else None
+            super().save(*args, **kwargs)
+            if new_file:
+                if blob is None:
+                    FileBlob.objects.get_or_create(
+                        sha256=self.file_hash,
+                        defaults={'name': self.file.name, 'size': self.file.size, 'stored_size': self.file.size},
+                    )
+                elif blob.name != self.file.name:
+                    # Содержимое уже сжато, несжатый файл удаляется после сжатия
+                    SubmissionVersion.objects.filter(pk=self.pk).update(file=blob.name)
+                    self.file.name = blob.name
+            if is_new:
+                from .notifications import queue_new_version
+                queue_new_version(self)
+
+class FormatRules(models.Model):
+    """Требования к оформлению рукописи; проверяются фоновым воркером (manage.py check_manuscript_format)."""
+    conference = models.OneToOneField(Conference, on_delete=models.CASCADE, related_name='format_rules')
+    max_pages = models.PositiveIntegerField("Максимум страниц", null=True, blank=True)
+    min_words = models.PositiveIntegerField("Минимум слов", null=True, blank=True)
+    max_words = models.PositiveIntegerField("Максимум слов", null=True, blank=True)
+    abstract_min_words = models.PositiveIntegerField("Аннотация: минимум слов", null=True, blank=True)
+    abstract_max_words = models.PositiveIntegerField("Аннотация: максимум слов", null=True, blank=True)
+    margin_top = models.PositiveSmallIntegerField("Верхнее поле, мм", null=True, blank=True)
+    margin_bottom = models.PositiveSmallIntegerField("Нижнее поле, мм", null=True, blank=True)
+    margin_left = models.PositiveSmallIntegerField("Левое поле, мм", null=True, blank=True)
+    margin_right = models.PositiveSmallIntegerField("Правое поле, мм", null=True, blank=True)
+    font_name = models.CharField("Шрифт основного текста", max_length=100, blank=True, help_text="Например, Times New Roman")
+    font_size = models.DecimalField("Кегль основного текста, пт", max_digits=4, decimal_places=1, null=True, blank=True)
+    required_headings = models.TextField(
+        "Обязательные разделы", blank=True,
+        help_text="Каждый раздел с новой строки; варианты названия через | (например, Список литературы|References)"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Требования к оформлению"
+        verbose_name_plural = "Требования к оформлению"
+
+    def __str__(self):
+        return f"Требования к оформлению: {self.conference}"
+
+    @property
+    def headings_list(self):
+        return [line.strip() for line in self.required_headings.splitlines() if line.strip()]
+
+
+class FormatReport(models.Model):
+    """Результат автоматической проверки оформления версии работы."""
+    version = models.OneToOneField(SubmissionVersion, on_delete=models.CASCADE, related_name='format_report')
+    # None — проверить не удалось (формат файла, поврежденный архив)
+    passed = models.BooleanField("Соответствует требованиям", null=True)
+    # [{code, label, passed, detail}], passed = None — значение не удалось определить
+    checks = models.JSONField("Проверки", default=list)
+    error = models.CharField("Ошибка проверки", max_length=255, blank=True)
+    checked_at = models.DateTimeField("Проверено")
+
+    class Meta:
+        verbose_name = "Проверка оформления"
+        verbose_name_plural = "Проверки оформления"
+
+    def __str__(self):
+        return f"Проверка оформления версии {self.version_id}"
+
+    @property
+    def failed_checks(self):
+        return [check for check in self.checks if check['passed'] is False]
+
+
 class Proceedings(models.Model):
     conference = models.ForeignKey(Conference, on_delete=models.CASCADE, related_name='proceedings_archive', unique=True)
     file = models.FileField("Файл сборника", upload_to='conf/proceedings/')
+    file_hash = models.CharField(max_length=64, blank=True, editable=False)
+    preview = models.ForeignKey(
+        PdfPreview, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='proceedings'
+    )
+    # Страницы работ в сборнике, записываются при сборке: [{submission, title, authors, first_page, page_count}]
+    page_index = models.JSONField(default=list, blank=True, editable=False)
+    # Хэш файла, для которого отрисованы страницы веб-просмотра (см. conferences/previews.py)
+    pages_hash = models.CharField(max_length=64, blank=True, editable=False)
+    pages_error = models.CharField(max_length=255, blank=True, editable=False)
     created_at = models.DateTimeField("Дата создания", auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Сборник трудов"
@@ -216,21 +658,76 @@ class Proceedings(models.Model):
 
     def __str__(self):
         return f"Сборник {self.conference.short_title}"
+
+    @property
+    def pages_ready(self):
+        return bool(self.file_hash) and self.pages_hash == self.file_hash
+
+    @property
+    def pages_dir(self):
+        return f'conf/proceedings/pages/{self.file_hash}'
+
+    @property
+    def viewer_index_url(self):
+        return default_storage.url(f'{self.pages_dir}/index.json')
     
     def save(self, *args, **kwargs):
         if not self.pk:
             existing = Proceedings.objects.filter(conference=self.conference).exists()
             if existing:
                 raise ValidationError(f"Сборник для конференции {self.conference} уже существует.")
-        
+
+        old_file = Proceedings.objects.filter(pk=self.pk).values_list('file', flat=True).first() if self.pk else None
+        if self.file.name != old_file:
+            self.file_hash = file_sha256(self.file) if self.file else ''
+            self.preview = None
+            self.pages_error = ''
         super().save(*args, **kwargs)
 
 
+class OutboxEmail(models.Model):
+    """Письмо-уведомление, записанное в той же транзакции, что и событие; отправляется воркером."""
+    KIND_CHOICES = [
+        ('status_changed', 'Изменение статуса заявки'),
+        ('new_version', 'Новая версия работы'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('sent', 'Отправлено'),
+        ('failed', 'Ошибка'),
+    ]
+
+    kind = models.CharField("Тип", max_length=30, choices=KIND_CHOICES)
+    recipient = models.EmailField("Получатель")
+    language = models.CharField("Язык", max_length=10, choices=settings.LANGUAGES, default=settings.LANGUAGE_CODE)
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='outbox_emails', null=True, blank=True)
+    context = models.JSONField("Данные письма", default=dict, blank=True)
+
+    status = models.CharField("Статус", max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField("Попыток", default=0)
+    next_attempt_at = models.DateTimeField("Следующая попытка", default=timezone.now)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField("Создано", auto_now_add=True)
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} → {self.recipient}"
+
+
 class GalleryMedia(models.Model):
     conference = models.ForeignKey(Conference, on_delete=models.CASCADE, related_name='media')
     file = models.FileField("Файл (Фото или Видео)", upload_to='conf/gallery/')
     is_video = models.BooleanField("Это видео?", default=False)
     caption = models.CharField("Подпись", max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Медиа галереи"
@@ -243,6 +740,7 @@ class Document(models.Model):
     file = models.FileField("Файл документа", upload_to='conf/documents/')
     description = models.TextField("Описание", blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Документ"
@@ -261,6 +759,7 @@ class ContactPerson(models.Model):
     phone = models.CharField("Телефон", max_length=50, blank=True)
     photo = models.ImageField("Фотография", upload_to='conf/contacts/', blank=True)
     order = models.PositiveIntegerField("Порядок", default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Контактное лицо"
@@ -287,6 +786,7 @@ class CommitteeMember(models.Model):
     photo = models.ImageField("Фотография", upload_to='conf/committee/', blank=True)
     bio = models.TextField("Биография", blank=True)
     order = models.PositiveIntegerField("Порядок", default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Член комитета"
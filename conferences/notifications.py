@@ -0,0 +1,171 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone, translation
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.contrib.auth import get_user_model
+
+from . import routing
+from .models import OutboxEmail, Submission
+from .metrics import NOTIFICATIONS_SENT, NOTIFICATION_FAILURES
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+# На это время пачка писем закрепляется за воркером, чтобы ее не взял другой процесс
+LEASE = timedelta(minutes=5)
+
+
+def queue_status_change(submission, old_status):
+    """Ставит в очередь письмо автору о смене статуса (вызывается внутри транзакции сохранения)."""
+    user = submission.user
+    if not user.email:
+        return None
+
+    comment = ''
+    if submission.status == 'revision':
+        last_version = submission.versions.order_by('-created_at').first()
+        if last_version:
+            comment = last_version.admin_comment
+
+    return OutboxEmail.objects.create(
+        kind='status_changed',
+        recipient=user.email,
+        language=user.language,
+        submission=submission,
+        context={
+            'title': submission.title,
+            'old_status': old_status,
+            'status': submission.status,
+            'comment': comment,
+            'full_name': str(user),
+        },
+    )
+
+
+def queue_new_version(version):
+    """Ставит в очередь письма организаторам о новой версии работы."""
+    submission = version.submission
+    organizers = get_user_model().objects.filter(
+        Q(role='organizer') | Q(is_staff=True), is_active=True
+    ).exclude(email='').values_list('email', 'language')
+
+    emails = [
+        OutboxEmail(
+            kind='new_version',
+            recipient=email,
+            language=language,
+            submission=submission,
+            context={
+                'title': submission.title,
+                'version_number': version.version_number,
+                'author': str(submission.user),
+                'author_comment': version.author_comment,
+            },
+        )
+        for email, language in organizers
+    ]
+    return OutboxEmail.objects.bulk_create(emails)
+
+
+def _absolute_url(url_name, language, **kwargs):
+    with translation.override(language):
+        path = reverse(url_name, kwargs=kwargs or None)
+    return f"{(settings.BASE_SITE or '').rstrip('/')}{path}"
+
+
+def build_message(email, connection=None):
+    """Рендерит письмо на языке получателя; шаблон <kind>.<lang>.txt имеет приоритет над <kind>.txt."""
+    context = dict(email.context)
+    if email.kind == 'status_changed':
+        context['url'] = _absolute_url('conferences:profile', email.language)
+    elif email.submission_id:
+        conference = routing.get_conference_by_id(email.submission.conference_id)
+        context['url'] = _absolute_url(
+            'conferences:submission_management_detail', email.language,
+            conference_slug=conference.slug, submission_id=email.submission_id,
+        )
+
+    base = f'conferences/emails/{email.kind}'
+    with translation.override(email.language):
+        context['status_display'] = str(dict(Submission.STATUS_CHOICES).get(context.get('status'), ''))
+        subject = render_to_string([f'{base}_subject.{email.language}.txt', f'{base}_subject.txt'], context)
+        body = render_to_string([f'{base}.{email.language}.txt', f'{base}.txt'], context)
+
+    return EmailMessage(
+        subject=' '.join(subject.split()),
+        body=body,
+        to=[email.recipient],
+        connection=connection,
+    )
+
+
+def _claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        if batch:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in batch]).update(next_attempt_at=now + LEASE)
+    return batch
+
+
+def _record_failure(email, error):
+    """Неудачная попытка: повтор с экспоненциальной задержкой, после MAX_ATTEMPTS — failed."""
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.next_attempt_at = timezone.now() + timedelta(minutes=2 ** email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+    NOTIFICATION_FAILURES.inc()
+
+
+def send_pending(batch_size=50):
+    """
+    Отправляет одну пачку писем через одно SMTP-соединение.
+    Неудачные письма повторяются с экспоненциальной задержкой до MAX_ATTEMPTS раз.
+    Возвращает количество обработанных писем.
+    """
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return 0
+
+    connection = get_connection()
+    try:
+        try:
+            connection.open()
+        except Exception as e:
+            # SMTP недоступен: попытка засчитывается всем письмам пачки, а не ждет конца аренды
+            logger.warning(f"Не удалось подключиться к SMTP: {e}")
+            for email in batch:
+                _record_failure(email, e)
+            return len(batch)
+
+        for email in batch:
+            try:
+                build_message(email, connection).send()
+            except Exception as e:
+                _record_failure(email, e)
+                logger.warning(f"Не удалось отправить письмо #{email.pk} ({email.recipient}): {e}")
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                email.save(update_fields=['status', 'sent_at', 'attempts'])
+                NOTIFICATIONS_SENT.labels(email.kind).inc()
+    finally:
+        connection.close()
+
+    logger.info(f"Обработано писем: {len(batch)}")
+    return len(batch)
+
@@ -0,0 +1,172 @@
+import re
+import hashlib
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_PAGES = (
+    'detail', 'program', 'committee', 'gallery', 'proceedings', 'venue', 'documentation',
+    'contacts', 'participation_fee', 'submission_format', 'privacy', 'terms',
+)
+
+# Какие страницы зависят от какой модели. Изменение Conference сбрасывает все страницы сайта:
+# конференции выводятся в шапке и подвале, а общие страницы показывают конференцию по умолчанию.
+PAGE_DEPENDENCIES = {
+    'conferences.Conference': PUBLIC_PAGES,
+    'conferences.CommitteeMember': ('committee',),
+    'conferences.GalleryMedia': ('gallery',),
+    'conferences.Document': ('documentation',),
+    'conferences.ContactPerson': ('contacts',),
+    'conferences.Proceedings': ('proceedings',),
+    'conferences.Submission': ('proceedings',),
+}
+
+# Модели без ссылки на конференцию: страница материалов показывает превью PDF и имена авторов
+# опубликованных работ, затронутые конференции находятся через эти работы и сборники
+INDIRECT_DEPENDENCIES = {
+    'conferences.PdfPreview': ('proceedings',),
+    'conferences.User': ('proceedings',),
+}
+AUTHOR_NAME_FIELDS = {'first_name', 'last_name'}
+
+CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF_TOKEN__'
+_CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CACHED_HEADERS = ('Content-Type', 'Content-Language', 'ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+SITE_VERSION_KEY = 'pagecache:v:site'
+
+
+def _version_key(url_name, conference_id=None):
+    return f'pagecache:v:{url_name}:{conference_id or "site"}'
+
+
+def _bump(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def time_state(url_name, conference, now=None):
+    """Состояние страницы, меняющееся со временем без записи в БД: закончился ли прием заявок, опубликованы ли материалы."""
+    if conference is None:
+        return ()
+    now = now or timezone.now()
+    if url_name == 'detail':
+        return (conference.registration_deadline < now,)
+    if url_name == 'proceedings':
+        # Как в conference_proceedings: дата по UTC, а не по TIME_ZONE
+        return (now.date() >= conference.notification_date,)
+    return ()
+
+
+def page_key(request, url_name):
+    """
+    Ключ страницы: имя URL + поколения (всего сайта и страницы этой конференции) + язык
+    + дата и состояние по времени (time_state) + полный путь с параметрами.
+    """
+    cache = get_cache()
+    conference = getattr(request, 'conference', None)
+    page_version_key = _version_key(url_name, conference.pk if conference else None)
+    versions = cache.get_many([SITE_VERSION_KEY, page_version_key])
+    for key in (SITE_VERSION_KEY, page_version_key):
+        if key not in versions:
+            versions[key] = 1
+            cache.add(key, 1, None)
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    # Дата выводится в шапке; после дедлайна страница другая, хотя в БД ничего не менялось
+    state = ''.join('1' if value else '0' for value in time_state(url_name, conference))
+    return (
+        f'pagecache:{url_name}:{versions[SITE_VERSION_KEY]}.{versions[page_version_key]}'
+        f':{request.LANGUAGE_CODE}:{timezone.localdate():%Y%m%d}{state}:{path_hash}'
+    )
+
+
+def invalidate(*url_names, conference_id=None):
+    """
+    Сбрасывает все языковые версии страниц конференции (без conference_id — страниц всего сайта):
+    старые ключи становятся недостижимыми и истекают сами.
+    """
+    cache = get_cache()
+    if conference_id is None:
+        _bump(cache, SITE_VERSION_KEY)
+        logger.info("Кэш страниц сброшен для всего сайта")
+        return
+    for url_name in url_names:
+        _bump(cache, _version_key(url_name, conference_id))
+    logger.info(f"Кэш страниц конференции {conference_id} сброшен: {', '.join(url_names)}")
+
+
+def strip_csrf(content):
+    return _CSRF_INPUT_RE.sub(rb'\g<1>' + CSRF_PLACEHOLDER.encode() + rb'\g<2>', content)
+
+
+def insert_csrf(content, token):
+    return content.replace(CSRF_PLACEHOLDER.encode(), token.encode())
+
+
+def _on_change(sender, instance, **kwargs):
+    url_names = PAGE_DEPENDENCIES.get(sender._meta.label)
+    if not url_names:
+        return
+    if sender._meta.label == 'conferences.Submission':
+        # Страница материалов показывает только работы, готовые к печати
+        if 'ready_for_print' not in {instance.status, getattr(instance, '_previous_status', None)}:
+            return
+    if sender._meta.label == 'conferences.Conference':
+        invalidate()
+    else:
+        invalidate(*url_names, conference_id=instance.conference_id)
+
+
+def shows_change(sender, update_fields):
+    """Видно ли сохранение модели из INDIRECT_DEPENDENCIES на страницах (вход пользователя обновляет только last_login)."""
+    if sender._meta.label != 'conferences.User' or update_fields is None:
+        return True
+    return bool(AUTHOR_NAME_FIELDS & set(update_fields))
+
+
+def published_rows(label, instance):
+    """Запросы строк страницы материалов, которые показывают instance (превью PDF или автора)."""
+    Submission = apps.get_model('conferences', 'Submission')
+    published = Submission.objects.filter(status='ready_for_print')
+    if label == 'conferences.User':
+        return [published.filter(user=instance)]
+    Proceedings = apps.get_model('conferences', 'Proceedings')
+    return [published.filter(final_preview=instance), Proceedings.objects.filter(preview=instance)]
+
+
+def _on_indirect_change(sender, instance, update_fields=None, **kwargs):
+    if not shows_change(sender, update_fields):
+        return
+    label = sender._meta.label
+    conference_ids = set()
+    for rows in published_rows(label, instance):
+        conference_ids.update(rows.values_list('conference_id', flat=True))
+    for conference_id in conference_ids:
+        invalidate(*INDIRECT_DEPENDENCIES[label], conference_id=conference_id)
+
+
+def connect_signals():
+    for label in PAGE_DEPENDENCIES:
+        model = apps.get_model(label)
+        post_save.connect(_on_change, sender=model, dispatch_uid=f'page_cache_save_{label}')
+        post_delete.connect(_on_change, sender=model, dispatch_uid=f'page_cache_delete_{label}')
+    for label in INDIRECT_DEPENDENCIES:
+        model = apps.get_model(label)
+        post_save.connect(_on_indirect_change, sender=model, dispatch_uid=f'page_cache_save_{label}')
+    # После удаления превью ссылки на него уже обнулены, поэтому страницы ищутся до
+    pre_delete.connect(
+        _on_indirect_change, sender=apps.get_model('conferences.PdfPreview'), dispatch_uid='page_cache_delete_preview',
+    )
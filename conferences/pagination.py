@@ -0,0 +1,58 @@
+"""
+Пагинатор для больших таблиц в админке. Точный COUNT(*) по всей таблице на
+PostgreSQL читает ее целиком при каждом открытии списка; для списка без
+фильтров и поиска достаточно оценки из статистики СУБД. С фильтром или поиском
+считается точно — обычно это уже небольшая выборка по индексу.
+"""
+import logging
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+# Ниже этого числа строк точный подсчет дешев, а оценка после массовых изменений бывает неточной
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(model, using='default'):
+    """Оценка числа строк таблицы из статистики СУБД или None, если ее нет."""
+    connection = connections[using]
+    table = model._meta.db_table
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        sql, params = 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table]
+    elif vendor == 'mysql':
+        sql = 'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s'
+        params = [table]
+    elif vendor == 'sqlite':
+        # Заполняется командой ANALYZE; первое число в stat любой строки таблицы — число строк
+        sql, params = 'SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table]
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError as e:
+        # sqlite_stat1 нет, пока ANALYZE ни разу не выполнялся
+        logger.debug(f"Нет статистики для {table}: {e}")
+        return None
+    # reltuples = -1: таблица еще не анализировалась
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, который для нефильтрованного queryset большой таблицы берет оценку числа строк."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimated_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
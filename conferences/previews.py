@@ -0,0 +1,226 @@
+"""
+Превью PDF (итоговые файлы работ и сборники): миниатюра первой страницы
+и лист с уменьшенными страницами. Строятся один раз на содержимое файла
+фоновым воркером через pdftoppm (poppler-utils), число страниц — через pypdf.
+Оргкомитет и посетители видят небольшие изображения вместо загрузки PDF.
+
+Для сборника дополнительно отрисовываются все страницы и index.json
+(размеры страниц и оглавление) — их по мере прокрутки загружает веб-просмотр.
+"""
+import os
+import json
+import shutil
+import logging
+import tempfile
+import subprocess
+from io import BytesIO
+
+from PIL import Image
+from pypdf import PdfReader
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PdfPreview, Proceedings, Submission
+from .page_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 480
+STRIP_PAGE_WIDTH = 120
+STRIP_COLUMNS = 10
+STRIP_GAP = 4
+# Лист со всеми страницами сборника был бы огромным; остальные страницы видны в самом PDF
+STRIP_MAX_PAGES = 200
+RENDER_TIMEOUT = 300
+WEBP_QUALITY = 70
+# Страницы сборника для веб-просмотра
+PAGE_WIDTH = 1000
+# Страниц за один вызов pdftoppm: временный каталог не разрастается на больших сборниках
+PAGES_CHUNK = 25
+
+
+class PreviewError(Exception):
+    pass
+
+
+def _pdftoppm(args):
+    try:
+        subprocess.run(['pdftoppm', *args], check=True, capture_output=True, timeout=RENDER_TIMEOUT)
+    except subprocess.CalledProcessError as e:
+        raise PreviewError(f'pdftoppm: {e.stderr.decode(errors="replace").strip()[:200]}')
+    except (subprocess.SubprocessError, OSError) as e:
+        raise PreviewError(f'pdftoppm: {e}')
+
+
+def _webp(img):
+    output = BytesIO()
+    img.save(output, format='WebP', quality=WEBP_QUALITY, method=4)
+    return ContentFile(output.getvalue())
+
+
+def render_thumbnail(path, workdir):
+    _pdftoppm(['-f', '1', '-l', '1', '-singlefile', '-scale-to-x', str(THUMBNAIL_WIDTH), '-scale-to-y', '-1',
+               '-jpeg', path, os.path.join(workdir, 'thumb')])
+    with Image.open(os.path.join(workdir, 'thumb.jpg')) as img:
+        return _webp(img.convert('RGB'))
+
+
+def render_strip(path, workdir, page_count):
+    """Страницы в уменьшенном виде, собранные в одно изображение по STRIP_COLUMNS в ряд."""
+    pages_dir = os.path.join(workdir, 'pages')
+    os.mkdir(pages_dir)
+    last = min(page_count or STRIP_MAX_PAGES, STRIP_MAX_PAGES)
+    _pdftoppm(['-f', '1', '-l', str(last), '-scale-to-x', str(STRIP_PAGE_WIDTH), '-scale-to-y', '-1',
+               '-jpeg', path, os.path.join(pages_dir, 'p')])
+    # pdftoppm дополняет номера нулями до одной длины, поэтому сортировка по имени верна
+    names = sorted(os.listdir(pages_dir))
+    if not names:
+        raise PreviewError('pdftoppm не создал ни одной страницы')
+
+    tiles = [Image.open(os.path.join(pages_dir, name)) for name in names]
+    try:
+        tile_height = max(tile.height for tile in tiles)
+        columns = min(STRIP_COLUMNS, len(tiles))
+        rows = (len(tiles) + columns - 1) // columns
+        sheet = Image.new(
+            'RGB',
+            (columns * (STRIP_PAGE_WIDTH + STRIP_GAP) - STRIP_GAP, rows * (tile_height + STRIP_GAP) - STRIP_GAP),
+            'white',
+        )
+        for index, tile in enumerate(tiles):
+            row, column = divmod(index, columns)
+            sheet.paste(tile.convert('RGB'), (column * (STRIP_PAGE_WIDTH + STRIP_GAP), row * (tile_height + STRIP_GAP)))
+    finally:
+        for tile in tiles:
+            tile.close()
+    return _webp(sheet)
+
+
+def render_preview(field_file, sha256):
+    """Возвращает PdfPreview для файла; рендерит страницы, только если превью еще не строилось."""
+    existing = PdfPreview.objects.filter(sha256=sha256).first()
+    if existing:
+        return existing
+
+    preview = PdfPreview(sha256=sha256)
+    workdir = tempfile.mkdtemp(prefix='preview_')
+    try:
+        with field_file.storage.local_path(field_file.name) as path:
+            preview.page_count = len(PdfReader(path).pages)
+            preview.thumbnail.save(f'{sha256}_thumb.webp', render_thumbnail(path, workdir), save=False)
+            preview.strip.save(f'{sha256}_strip.webp', render_strip(path, workdir, preview.page_count), save=False)
+    except Exception as e:
+        preview.error = str(e)[:255] or type(e).__name__
+        logger.warning(f"Не удалось построить превью {field_file.name}: {preview.error}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    try:
+        with transaction.atomic():
+            preview.save()
+            return preview
+    except IntegrityError:
+        # Тот же файл параллельно обработал другой воркер
+        return PdfPreview.objects.get(sha256=sha256)
+
+
+def render_pages(proceedings):
+    """
+    Отрисовывает страницы сборника в <pages_dir>/<номер>.webp и записывает index.json:
+    {"pages": [[ширина, высота], ...], "papers": [{submission, title, authors, first_page, page_count, pdf}]}.
+    """
+    storage = proceedings.file.storage
+    sizes = []
+    workdir = tempfile.mkdtemp(prefix='pages_')
+    try:
+        with storage.local_path(proceedings.file.name) as path:
+            page_count = len(PdfReader(path).pages)
+            for first in range(1, page_count + 1, PAGES_CHUNK):
+                last = min(first + PAGES_CHUNK - 1, page_count)
+                chunk_dir = os.path.join(workdir, str(first))
+                os.mkdir(chunk_dir)
+                _pdftoppm(['-f', str(first), '-l', str(last), '-scale-to-x', str(PAGE_WIDTH), '-scale-to-y', '-1',
+                           '-jpeg', path, os.path.join(chunk_dir, 'p')])
+                names = sorted(os.listdir(chunk_dir))
+                if len(names) != last - first + 1:
+                    raise PreviewError(f'pdftoppm отрисовал {len(names)} страниц из {last - first + 1}')
+                for number, filename in enumerate(names, start=first):
+                    with Image.open(os.path.join(chunk_dir, filename)) as img:
+                        sizes.append([img.width, img.height])
+                        name = f'{proceedings.pages_dir}/{number}.webp'
+                        if storage.exists(name):
+                            storage.delete(name)
+                        storage.save(name, _webp(img.convert('RGB')))
+                shutil.rmtree(chunk_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    pdf_names = dict(
+        Submission.objects.filter(pk__in=[paper['submission'] for paper in proceedings.page_index])
+        .values_list('id', 'final_file')
+    )
+    papers = [
+        {**paper, 'pdf': storage.url(pdf_names[paper['submission']]) if pdf_names.get(paper['submission']) else None}
+        for paper in proceedings.page_index
+    ]
+    index_name = f'{proceedings.pages_dir}/index.json'
+    if storage.exists(index_name):
+        storage.delete(index_name)
+    storage.save(index_name, ContentFile(json.dumps({'pages': sizes, 'papers': papers}, ensure_ascii=False).encode()))
+    return page_count
+
+
+def pending_final_files():
+    return Submission.objects.filter(final_preview__isnull=True).exclude(final_file_hash='')
+
+
+def pending_proceedings():
+    return Proceedings.objects.filter(preview__isnull=True).exclude(file_hash='')
+
+
+def pending_page_sets():
+    """Сборники, страницы которых для веб-просмотра еще не отрисованы (или отрисованы для прежнего файла)."""
+    return Proceedings.objects.exclude(file_hash='').exclude(pages_hash=F('file_hash')).filter(pages_error='')
+
+
+def process_pending(batch_size=10):
+    """Обрабатывает очередь превью; возвращает число обработанных файлов."""
+    processed = 0
+    changed_conferences = set()
+    for proceedings in pending_proceedings().order_by('id')[:batch_size]:
+        preview = render_preview(proceedings.file, proceedings.file_hash)
+        Proceedings.objects.filter(pk=proceedings.pk).update(preview=preview, updated_at=timezone.now())
+        processed += 1
+        changed_conferences.add(proceedings.conference_id)
+        logger.info(f"Превью сборника {proceedings.pk}: страниц: {preview.page_count}")
+
+    for submission in pending_final_files().order_by('id')[:max(batch_size - processed, 0)]:
+        preview = render_preview(submission.final_file, submission.final_file_hash)
+        Submission.objects.filter(pk=submission.pk).update(final_preview=preview, updated_at=timezone.now())
+        processed += 1
+        if submission.status == 'ready_for_print':
+            changed_conferences.add(submission.conference_id)
+        logger.info(f"Превью итогового PDF заявки {submission.pk}: страниц: {preview.page_count}")
+
+    # Страницы сборника — самая долгая задача, по одному сборнику за пачку
+    if processed < batch_size:
+        proceedings = pending_page_sets().order_by('id').first()
+        if proceedings:
+            try:
+                page_count = render_pages(proceedings)
+            except Exception as e:
+                error = str(e)[:255] or type(e).__name__
+                Proceedings.objects.filter(pk=proceedings.pk).update(pages_error=error)
+                logger.warning(f"Не удалось отрисовать страницы сборника {proceedings.pk}: {error}")
+            else:
+                Proceedings.objects.filter(pk=proceedings.pk).update(pages_hash=proceedings.file_hash, updated_at=timezone.now())
+                changed_conferences.add(proceedings.conference_id)
+                logger.info(f"Страницы сборника {proceedings.pk} для веб-просмотра: {page_count}")
+            processed += 1
+
+    # Обновления через update() не вызывают сигналы, поэтому кэш страницы материалов сбрасывается здесь
+    for conference_id in changed_conferences:
+        invalidate('proceedings', conference_id=conference_id)
+    return processed
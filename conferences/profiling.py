@@ -0,0 +1,104 @@
+import time
+import contextvars
+from contextlib import contextmanager
+
+from django.db.backends.signals import connection_created
+from django.template.backends import django as django_backend
+
+_current = contextvars.ContextVar('conferences_request_timings', default=None)
+_installed = False
+
+
+class RequestTimings:
+    """Счетчики времени одного запроса: SQL, шаблоны и именованные участки."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.spans = {}
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def add_span(self, name, duration):
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+
+def start():
+    timings = RequestTimings()
+    token = _current.set(timings)
+    return timings, token
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """Замеряет участок кода и добавляет его в Server-Timing текущего запроса."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_span(name, time.perf_counter() - started)
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql_count += 1
+        timings.sql_time += time.perf_counter() - started
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install():
+    """
+    Подключает сбор SQL и времени рендеринга шаблонов.
+    Обертка ставится на каждое новое соединение, поэтому учитываются и запросы
+    из потоков sync_to_async.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    connection_created.connect(_on_connection_created, dispatch_uid='conferences_profiling')
+
+    from django.db import connections
+    for conn in connections.all(initialized_only=True):
+        _on_connection_created(None, conn)
+
+    original_render = django_backend.Template.render
+
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return original_render(self, context, request)
+        started = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            timings.template_time += time.perf_counter() - started
+
+    django_backend.Template.render = render
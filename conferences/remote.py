@@ -0,0 +1,24 @@
+"""
+Адрес клиента с учетом обратного прокси. За nginx REMOTE_ADDR — адрес самого
+прокси, поэтому адрес клиента берется из X-Forwarded-For, но только если запрос
+пришел от прокси из TRUSTED_PROXIES: иначе заголовок может подставить кто угодно.
+"""
+from django.conf import settings
+
+
+def client_ip(request):
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    trusted = set(getattr(settings, 'TRUSTED_PROXIES', ()))
+    if remote_addr not in trusted:
+        return remote_addr
+    # Справа налево: последний адрес, добавленный не нашим прокси, — адрес клиента
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    for ip in reversed(forwarded):
+        if ip not in trusted:
+            return ip
+    return remote_addr
+
+
+def is_internal(request):
+    """Запрос из INTERNAL_IPS (адрес клиента, а не прокси)."""
+    return client_ip(request) in getattr(settings, 'INTERNAL_IPS', ())
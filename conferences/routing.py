@@ -0,0 +1,129 @@
+"""
+Выбор конференции по URL-префиксу (<slug>/...) без запросов к БД на каждый запрос.
+
+Словарь slug → Conference хранится в памяти процесса, отдельно для каждого языка:
+загружаются только колонки активного языка (и запасных) и готовый HTML
+(Conference.objects.for_language), без исходного HTML CKEditor.
+
+Не чаще раза в CHECK_INTERVAL секунд процесс сверяет отпечаток таблицы
+конференций в БД — наибольший updated_at и число строк — и перечитывает
+конференции, если он изменился. Так правка в админке доходит до всех воркеров
+gunicorn/uvicorn, а не только до сохранившего ее (локальный кэш Django у каждого
+процесса свой). Изменения в обход save() (queryset.update) должны обновлять
+updated_at. Экземпляры общие для всех запросов процесса — их нельзя изменять
+в представлениях.
+"""
+import time
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_save, post_delete
+from django.utils.translation import get_language
+
+CHECK_INTERVAL = 1.0
+
+# Первые сегменты пути, занятые общими страницами сайта; конференции с таким slug были бы недоступны
+RESERVED_SLUGS = {
+    'admin', 'api', 'register', 'login', 'logout', 'profile', 'submission', 'submit', 'management',
+    'program', 'committee', 'gallery', 'proceedings', 'venue', 'documentation', 'contacts',
+    'participation-fee', 'submission-format', 'privacy', 'terms', 'media', 'static', 'version',
+}
+
+
+class _Conferences:
+    def __init__(self, conferences):
+        self.by_slug = {conference.slug: conference for conference in conferences}
+        self.by_id = {conference.pk: conference for conference in conferences}
+        # Конференция по умолчанию — последняя активная (или просто последняя)
+        active = [conference for conference in conferences if conference.is_active]
+        self.default = (active or conferences or [None])[0]
+
+
+class _Routes:
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.checked_at = time.monotonic()
+        self.languages = {}
+
+    def get(self, language):
+        conferences = self.languages.get(language)
+        if conferences is None:
+            from .models import Conference, RICH_TEXT_FIELDS
+            conferences = _Conferences(list(
+                Conference.objects.for_language(*RICH_TEXT_FIELDS, language=language).order_by('-id')
+            ))
+            self.languages[language] = conferences
+        return conferences
+
+
+_routes = None
+_lock = threading.Lock()
+
+
+def _fingerprint():
+    from .models import Conference
+    state = Conference.objects.aggregate(latest=Max('updated_at'), count=Count('pk'))
+    return state['latest'], state['count']
+
+
+def _get_routes():
+    global _routes
+    routes = _routes
+    if routes is not None and time.monotonic() - routes.checked_at < CHECK_INTERVAL:
+        return routes
+    fingerprint = _fingerprint()
+    if routes is not None and routes.fingerprint == fingerprint:
+        routes.checked_at = time.monotonic()
+        return routes
+    with _lock:
+        if _routes is None or _routes.fingerprint != fingerprint:
+            _routes = _Routes(fingerprint)
+        return _routes
+
+
+def _conferences():
+    language = get_language() or settings.LANGUAGE_CODE
+    routes = _get_routes()
+    conferences = routes.languages.get(language)
+    if conferences is None:
+        with _lock:
+            conferences = routes.get(language)
+    return conferences
+
+
+def get_conference(slug):
+    """Конференция по slug или None."""
+    return _conferences().by_slug.get(slug)
+
+
+def get_conference_by_id(conference_id):
+    return _conferences().by_id.get(conference_id)
+
+
+def default_conference():
+    """Конференция для корня сайта и общих страниц (вход, профиль, правила)."""
+    return _conferences().default
+
+
+def all_conferences():
+    """Все конференции, новые первыми."""
+    return list(_conferences().by_id.values())
+
+
+def invalidate():
+    """Сбрасывает словарь этого процесса сразу; остальные процессы заметят новый отпечаток сами."""
+    global _routes
+    _routes = None
+
+
+def _on_change(sender, **kwargs):
+    # После фиксации транзакции: иначе другой запрос успел бы перечитать старые данные
+    transaction.on_commit(invalidate)
+
+
+def connect_signals():
+    from .models import Conference
+    post_save.connect(_on_change, sender=Conference, dispatch_uid='routing_conference_save')
+    post_delete.connect(_on_change, sender=Conference, dispatch_uid='routing_conference_delete')
@@ -0,0 +1,337 @@
+"""
+Полнотекстовый поиск по заявкам для оргкомитета.
+
+Поисковый текст заявки (название, аннотация, ключевые слова, соавторы,
+автор и его организация) хранится в Submission.search_document. Индекс по нему
+создается миграцией под конкретную СУБД:
+
+* PostgreSQL — генерируемая колонка search_vector (tsvector) с GIN-индексом,
+  ранжирование ts_rank;
+* SQLite — внешняя таблица FTS5, которую поддерживают триггеры, ранжирование bm25;
+* остальные СУБД — поиск подстрок без индекса.
+
+Используется конфигурация 'simple' без стемминга: тексты на трех языках,
+а поиск по префиксам слов ("машин" находит "машинное") покрывает словоформы.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_save, post_migrate
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'conferences_submission_fts'
+MAX_TERMS = 8
+SNIPPET_RADIUS = 100
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_document(submission, body=''):
+    """Поисковый текст заявки; body — извлеченный текст рукописи (см. conferences/extraction.py)."""
+    user = submission.user
+    parts = [
+        submission.title,
+        submission.abstract_text,
+        submission.keywords,
+        submission.authors_list,
+        f'{user.first_name} {user.last_name}'.strip(),
+        user.organization,
+        body,
+    ]
+    return '\n'.join(part for part in parts if part)
+
+
+def submission_body(submission):
+    """Текст последней версии рукописи, уже извлеченный фоновым воркером."""
+    if not submission.pk:
+        return ''
+    from .models import ManuscriptText
+    body = (
+        ManuscriptText.objects.filter(versions__submission_id=submission.pk)
+        .order_by('-versions__created_at')
+        .values_list('text', flat=True)
+        .first()
+    )
+    return body or ''
+
+
+def index_submission(submission):
+    """Пересчитывает поисковый текст без вызова save() (и без его побочных эффектов)."""
+    from .models import Submission
+    document = build_document(submission, submission_body(submission))
+    if document != submission.search_document:
+        Submission.objects.filter(pk=submission.pk).update(search_document=document)
+        submission.search_document = document
+
+
+def parse_query(query):
+    """Слова запроса в нижнем регистре; операторы и кавычки отбрасываются."""
+    terms = []
+    for term in _TERM_RE.findall((query or '').lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def _tsquery(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _fts_match(terms):
+    return ' AND '.join(f'"{term}"*' for term in terms)
+
+
+def search_submissions(queryset, query):
+    """Фильтрует заявки по запросу, без ранжирования (админка сортирует список сама)."""
+    terms = parse_query(query)
+    if not terms:
+        return queryset.none()
+
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        return queryset.filter(RawSQL(
+            "conferences_submission.search_vector @@ to_tsquery('simple', %s)", [_tsquery(terms)],
+            output_field=BooleanField(),
+        ))
+    if vendor == 'sqlite':
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts_match(terms)])
+        )
+    condition = Q()
+    for term in terms:
+        condition &= Q(search_document__icontains=term)
+    return queryset.filter(condition)
+
+
+def rank_submissions(queryset, query, limit):
+    """
+    Не более limit самых релевантных заявок из queryset списком; у каждой — атрибут
+    search_rank (больше — релевантнее), при равенстве первыми недавно измененные.
+    """
+    terms = parse_query(query)
+    if not terms:
+        return []
+
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        return list(search_submissions(queryset, query).annotate(search_rank=RawSQL(
+            "ts_rank(conferences_submission.search_vector, to_tsquery('simple', %s))", [_tsquery(terms)],
+            output_field=FloatField(),
+        )).order_by('-search_rank', '-updated_at')[:limit])
+    if vendor != 'sqlite':
+        queryset = search_submissions(queryset, query).annotate(search_rank=Value(0.0))
+        return list(queryset.order_by('-updated_at')[:limit])
+
+    # bm25 считается один раз на найденную строку только при проходе по самой таблице FTS5.
+    # Соединение или коррелированный подзапрос планировщик выполняет от таблицы заявок,
+    # повторяя MATCH для каждой строки, — это секунды вместо миллисекунд (manage.py bench_search).
+    # Поэтому найденные строки материализуются с рангом, фильтр queryset — подзапросом по id.
+    # Ранг FTS5 — bm25, он отрицателен: чем меньше, тем релевантнее.
+    filter_sql, filter_params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH hits AS MATERIALIZED (SELECT rowid AS id, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s) "
+            f"SELECT id, -rank FROM hits WHERE id IN ({filter_sql}) ORDER BY rank LIMIT %s",
+            [_fts_match(terms), *filter_params, limit],
+        )
+        ranks = dict(cursor.fetchall())
+    submissions = queryset.in_bulk(ranks)
+    result = []
+    for pk, rank in ranks.items():
+        submission = submissions[pk]
+        submission.search_rank = rank
+        result.append(submission)
+    result.sort(key=lambda submission: (-submission.search_rank, -submission.updated_at.timestamp()))
+    return result
+
+
+def search_snippets(submission_ids, query):
+    """
+    Фрагменты поискового текста с выделенными совпадениями для уже найденных заявок
+    ({id: html}). Считаются в БД, чтобы не загружать полный текст рукописей.
+    """
+    terms = parse_query(query)
+    if not terms or not submission_ids:
+        return {}
+
+    ids = list(submission_ids)
+    placeholders = ', '.join(['%s'] * len(ids))
+    vendor = connection.vendor
+    if vendor == 'postgresql':
+        tsquery = _tsquery(terms)
+        sql = (
+            "SELECT id, ts_headline('simple', search_document, to_tsquery('simple', %s), "
+            "'StartSel=\x02, StopSel=\x03, MaxWords=35, MinWords=15, MaxFragments=1') "
+            f"FROM conferences_submission WHERE id IN ({placeholders})"
+        )
+        params = [tsquery, *ids]
+    elif vendor == 'sqlite':
+        return _sqlite_snippets(ids, query, terms)
+    else:
+        return {}
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return {
+        pk: mark_safe(escape(fragment or '').replace('\x02', '<mark>').replace('\x03', '</mark>'))
+        for pk, fragment in rows
+    }
+
+
+def _sqlite_snippets(ids, query, terms):
+    # snippet() FTS5 требует MATCH, а с ним SQLite заново перебирает список документов
+    # каждого слова (для частых префиксов — секунды на 50 тыс. заявок, manage.py bench_search).
+    # Поэтому окно вокруг первого вхождения вырезается в БД по instr — он учитывает
+    # регистр, отсюда варианты написания, — а слова выделяются уже в Python.
+    variants = []
+    for term in terms:
+        for variant in (term, term.capitalize(), term.upper()):
+            if variant not in variants:
+                variants.append(variant)
+    # Последний аргумент — «не найдено»: с ним min() скалярная, даже если вариант один
+    not_found = 1 << 30
+    found = ', '.join(['coalesce(nullif(instr(search_document, %s), 0), %s)'] * len(variants))
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id, start, substr(search_document, start, %s), length(search_document) FROM ("
+            "SELECT id, search_document, CASE WHEN position = %s THEN 1 ELSE max(1, position - %s) END AS start "
+            f"FROM (SELECT id, search_document, min({found}, %s) AS position "
+            f"FROM conferences_submission WHERE id IN ({placeholders})))",
+            [
+                SNIPPET_RADIUS * 2, not_found, SNIPPET_RADIUS,
+                *[value for variant in variants for value in (variant, not_found)], not_found,
+                *ids,
+            ],
+        )
+        rows = cursor.fetchall()
+    return {
+        pk: mark_safe(
+            ('…' if start > 1 else '') + highlight(fragment, query)
+            + ('…' if start + len(fragment) <= length else '')
+        )
+        for pk, start, fragment, length in rows
+    }
+
+
+def highlight(text, query, snippet=False):
+    """
+    Экранирует текст и выделяет найденные слова тегом <mark>.
+    С snippet=True возвращает фрагмент вокруг первого совпадения.
+    """
+    text = text or ''
+    terms = parse_query(query)
+    if not terms:
+        return escape(text[:SNIPPET_RADIUS * 2] if snippet else text)
+
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.IGNORECASE)
+    if snippet:
+        found = pattern.search(text)
+        start = max(0, found.start() - SNIPPET_RADIUS) if found else 0
+        end = start + SNIPPET_RADIUS * 2
+        prefix = '…' if start > 0 else ''
+        suffix = '…' if end < len(text) else ''
+        text = text[start:end]
+    else:
+        prefix = suffix = ''
+
+    result = []
+    position = 0
+    for found in pattern.finditer(text):
+        result.append(escape(text[position:found.start()]))
+        result.append(f'<mark>{escape(found.group())}</mark>')
+        position = found.end()
+    result.append(escape(text[position:]))
+    return mark_safe(prefix + ''.join(result) + suffix)
+
+
+def _on_user_save(sender, instance, created, **kwargs):
+    # Имя и организация автора входят в поисковый текст его заявок
+    if created:
+        return
+    from .models import Submission
+    for submission in Submission.objects.filter(user=instance).select_related('user'):
+        index_submission(submission)
+
+
+def connect_signals(app_config):
+    from django.contrib.auth import get_user_model
+    post_save.connect(_on_user_save, sender=get_user_model(), dispatch_uid='search_user_save')
+    post_migrate.connect(_on_post_migrate, sender=app_config, dispatch_uid='search_post_migrate')
+
+
+def _ensure_sqlite_index(cursor):
+    """
+    Создает таблицу FTS5 и триггеры, если их нет. SQLite пересоздает таблицу при
+    изменении ее схемы в миграциях и теряет триггеры, поэтому вызывается и после migrate.
+    """
+    cursor.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+        [f'{FTS_TABLE}_%'],
+    )
+    if cursor.fetchone()[0] == 3:
+        return
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(search_document, "
+        f"content='conferences_submission', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON conferences_submission BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON conferences_submission BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) "
+        f"VALUES ('delete', old.id, old.search_document); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_document ON conferences_submission "
+        f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) "
+        f"VALUES ('delete', old.id, old.search_document); "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END"
+    )
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _on_post_migrate(sender, using, **kwargs):
+    from django.db import connections
+    from django.db.migrations.recorder import MigrationRecorder
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    applied = MigrationRecorder(conn).applied_migrations()
+    if ('conferences', '0014_submission_search_document') not in applied:
+        return
+    with conn.cursor() as cursor:
+        _ensure_sqlite_index(cursor)
+
+
+def create_index(schema_editor):
+    """Создает поисковый индекс под текущую СУБД (вызывается из миграции)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE conferences_submission ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', search_document)) STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX submission_search_vector_idx ON conferences_submission USING gin (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            _ensure_sqlite_index(cursor)
+
+
+def drop_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS submission_search_vector_idx")
+        schema_editor.execute("ALTER TABLE conferences_submission DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -3,6 +3,8 @@ import logging
 from pypdf import PdfWriter
 from django.core.files.base import ContentFile
 from .models import Conference, Submission, Proceedings
+from .profiling import timed
+from .metrics import PROCEEDINGS_BUILD_DURATION, PROCEEDINGS_BUILD_FAILURES, observe
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +13,11 @@ def create_conference_proceedings(conference_id):
     Собирает все PDF-файлы заявок со статусом 'ready_for_print' 
     в один файл и сохраняет в модель Proceedings.
     """
+    with observe(PROCEEDINGS_BUILD_DURATION, PROCEEDINGS_BUILD_FAILURES):
+        return _build_proceedings(conference_id)
+
+
+def _build_proceedings(conference_id):
     conference = Conference.objects.get(id=conference_id)
     merger = PdfWriter()
     
@@ -18,24 +25,37 @@ def create_conference_proceedings(conference_id):
         conference=conference, 
         status='ready_for_print', 
         final_file__isnull=False
-    ).order_by('id')
+    ).select_related('user').defer('search_document').order_by('id')
 
     if not submissions.exists():
         return None
 
-    for sub in submissions:
-        if sub.final_file and sub.final_file.storage.exists(sub.final_file.name):
-            merger.append(sub.final_file.path)
+    # Диапазоны страниц работ в сборнике — для оглавления и ссылок в веб-просмотре
+    page_index = []
+    with timed('storage'):
+        for sub in submissions:
+            if sub.final_file and sub.final_file.storage.exists(sub.final_file.name):
+                first_page = len(merger.pages)
+                with sub.final_file.storage.local_path(sub.final_file.name) as path:
+                    merger.append(path)
+                page_index.append({
+                    'submission': sub.id,
+                    'title': sub.title,
+                    'authors': sub.authors_list or sub.user.get_full_name(),
+                    'first_page': first_page + 1,
+                    'page_count': len(merger.pages) - first_page,
+                })
 
     buffer = io.BytesIO()
     merger.write(buffer)
     buffer.seek(0)
 
-    proceedings = Proceedings(conference=conference)
+    proceedings = Proceedings(conference=conference, page_index=page_index)
     
     filename = f"proceedings_{conference.slug}_{conference.id}.pdf"
     
-    proceedings.file.save(filename, ContentFile(buffer.getvalue()), save=True)
+    with timed('storage'):
+        proceedings.file.save(filename, ContentFile(buffer.getvalue()), save=True)
     
     merger.close()
     
@@ -0,0 +1,29 @@
+"""
+Очистка истекших сессий из django_session (manage.py purge_sessions).
+
+Стандартный clearsessions удаляет все истекшие сессии одним DELETE, который на
+большой таблице долго держит блокировки и раздувает журнал транзакций. Здесь
+удаление идет пачками по первичному ключу, каждая пачка — отдельная короткая
+транзакция. При SESSION_ENGINE = cache таблица не растет, но в ней могут
+остаться сессии, созданные до переключения.
+"""
+import logging
+
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def expired_sessions():
+    return Session.objects.filter(expire_date__lt=timezone.now())
+
+
+def purge_expired(batch_size=1000):
+    """Удаляет одну пачку истекших сессий; возвращает число удаленных."""
+    keys = list(expired_sessions().values_list('session_key', flat=True)[:batch_size])
+    if not keys:
+        return 0
+    deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+    logger.info(f"Удалено истекших сессий: {deleted}")
+    return deleted
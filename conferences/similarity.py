@@ -0,0 +1,136 @@
+"""
+Поиск почти одинаковых рукописей (повторная подача, самоплагиат) по MinHash/LSH.
+
+Для каждого извлеченного текста (ManuscriptText) один раз считается подпись
+MinHash по шинглам из SHINGLE_SIZE слов, и подпись раскладывается по BANDS
+корзинам LSH. Кандидаты для новой работы — тексты, совпавшие хотя бы в одной
+корзине (один индексированный запрос), оценка сходства — доля совпадающих
+значений подписи (оценка коэффициента Жаккара). Попарного сравнения со всеми
+работами нет.
+"""
+import re
+import zlib
+import random
+import hashlib
+import logging
+from array import array
+
+from django.db import transaction
+
+from .models import Conference, LshBucket, ManuscriptText, SubmissionVersion
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Порог заметного сходства; с 32 корзинами по 4 значения пары с таким сходством
+# попадают в кандидаты с вероятностью > 0.85
+MIN_SIMILARITY = 0.5
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240517)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def shingles(text):
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(' '.join(words).encode())} if words else set()
+    return {
+        zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode())
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(hashes):
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def bucket_keys(values):
+    """Ключ корзины = хэш (номер полосы, значения полосы), 63 бита для BigIntegerField."""
+    keys = []
+    for band in range(BANDS):
+        chunk = array('Q', [band, *values[band * ROWS:(band + 1) * ROWS]]).tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'big') >> 1)
+    return keys
+
+
+def load_signature(data):
+    return array('Q', bytes(data)).tolist()
+
+
+def similarity(first, second):
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+
+def pending_manuscripts():
+    return ManuscriptText.objects.filter(minhash__isnull=True, error='').exclude(text='')
+
+
+def index_manuscript(manuscript):
+    """Считает подпись текста и добавляет ее в корзины LSH (один раз на текст)."""
+    hashes = shingles(manuscript.text)
+    if not hashes:
+        # Пустая подпись: текст без слов сравнивать не с чем, но из очереди он уходит
+        ManuscriptText.objects.filter(pk=manuscript.pk).update(minhash=b'')
+        return
+    values = signature(hashes)
+    with transaction.atomic():
+        ManuscriptText.objects.filter(pk=manuscript.pk).update(minhash=array('Q', values).tobytes())
+        LshBucket.objects.bulk_create(
+            [LshBucket(key=key, manuscript_id=manuscript.pk) for key in bucket_keys(values)],
+            ignore_conflicts=True,
+        )
+    manuscript.minhash = array('Q', values).tobytes()
+
+
+def find_duplicates(submission, min_similarity=MIN_SIMILARITY):
+    """
+    Работы (из любых конференций), похожие на любую версию заявки:
+    список словарей {submission, similarity} по убыванию сходства.
+    """
+    own = {
+        manuscript.pk: load_signature(manuscript.minhash)
+        for manuscript in ManuscriptText.objects.filter(
+            versions__submission=submission, minhash__isnull=False
+        ).only('id', 'minhash').distinct()
+        if manuscript.minhash
+    }
+    if not own:
+        return []
+
+    keys = set()
+    for values in own.values():
+        keys.update(bucket_keys(values))
+    candidate_ids = set(
+        LshBucket.objects.filter(key__in=keys).values_list('manuscript_id', flat=True).distinct()
+    )
+
+    scores = {pk: 1.0 for pk in own}  # тот же файл в другой заявке
+    candidates = ManuscriptText.objects.filter(pk__in=candidate_ids - own.keys()).only('id', 'minhash')
+    for candidate in candidates:
+        values = load_signature(candidate.minhash)
+        score = max(similarity(values, mine) for mine in own.values())
+        if score >= min_similarity:
+            scores[candidate.pk] = score
+
+    best = {}
+    versions = (
+        SubmissionVersion.objects.filter(manuscript_id__in=scores)
+        .exclude(submission=submission)
+        .select_related('submission__user')
+    )
+    for version in versions:
+        score = scores[version.manuscript_id]
+        other = version.submission
+        if other.pk not in best or best[other.pk]['similarity'] < score:
+            best[other.pk] = {'submission': other, 'similarity': score}
+
+    # Конференции без тяжелых HTML-колонок, одним запросом
+    conference_ids = {item['submission'].conference_id for item in best.values()}
+    conferences = Conference.objects.for_language().in_bulk(conference_ids)
+    for item in best.values():
+        item['submission'].conference = conferences[item['submission'].conference_id]
+    return sorted(best.values(), key=lambda item: -item['similarity'])
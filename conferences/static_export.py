@@ -0,0 +1,245 @@
+"""
+Статическая копия публичных страниц (manage.py export_static_site) для отдачи
+веб-сервером или CDN без Django.
+
+Страницы рендерятся теми же представлениями через тестовый клиент Django, как
+для анонимного посетителя, на всех языках из LANGUAGES, и записываются в
+<каталог>/<язык>/<slug>/<страница>/index.html; рядом — sitemap.xml.
+
+Повторный запуск перерисовывает только страницы, у которых изменились исходные
+данные. Отпечаток страницы — хэш строк моделей, от которых она зависит (те же
+зависимости, что у кэша страниц, page_cache.PAGE_DEPENDENCIES), всех конференций
+(шапка и подвал), шаблонов и переводов, а также текущей даты и состояния,
+зависящего от времени (прием заявок, публикация материалов). Отпечатки прошлой
+сборки хранятся в manifest.json.
+"""
+import os
+import json
+import hashlib
+import logging
+from itertools import islice
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+from django.apps import apps
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from .context_processors import LANGUAGE_LINKS_KEY
+from .models import Conference, Submission
+from .page_cache import PAGE_DEPENDENCIES, PUBLIC_PAGES, time_state
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+SITEMAP_NAME = 'sitemap.xml'
+# Общие страницы сайта, без slug конференции
+SITE_PAGES = ('privacy', 'terms')
+CONFERENCE_PAGES = tuple(name for name in PUBLIC_PAGES if name not in SITE_PAGES)
+
+
+def _digest(*parts):
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def _rows(queryset):
+    return list(queryset.order_by('pk').values_list(*[field.attname for field in queryset.model._meta.concrete_fields]))
+
+
+def _code_fingerprint():
+    """Шаблоны и переводы: после выкладки новой версии перерисовывается все."""
+    digest = hashlib.sha256()
+    directories = [str(directory) for directory in settings.LOCALE_PATHS]
+    for engine in settings.TEMPLATES:
+        directories.extend(str(directory) for directory in engine.get('DIRS', []))
+    directories.append(os.path.join(apps.get_app_config('conferences').path, 'templates'))
+    for directory in directories:
+        for root, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith(('.html', '.mo', '.txt')):
+                    path = os.path.join(root, filename)
+                    digest.update(path.encode())
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+    return digest.hexdigest()
+
+
+class Fingerprints:
+    """Отпечатки страниц текущего состояния БД; строки каждой модели читаются один раз за сборку."""
+
+    def __init__(self):
+        self.now = timezone.now()
+        self.site = _digest(
+            _code_fingerprint(), timezone.localdate().isoformat(), settings.LANGUAGES,
+            _rows(Conference.objects.all()),
+        )
+        self._models = {}
+
+    def _model_rows(self, label, conference):
+        key = (label, conference.pk)
+        if key not in self._models:
+            if label == 'conferences.Submission':
+                # Материалы показывают только работы, готовые к печати, и их ключевые слова
+                published = Submission.objects.filter(conference=conference, status='ready_for_print')
+                rows = (
+                    list(published.order_by('pk').values_list(
+                        'pk', 'title', 'authors_list', 'abstract_text', 'final_file', 'final_preview_id',
+                        'user__first_name', 'user__last_name',
+                    )),
+                    list(published.order_by('pk', 'keyword_set__name').values_list('pk', 'keyword_set__name')),
+                )
+            else:
+                rows = _rows(apps.get_model(label).objects.filter(conference=conference))
+            self._models[key] = _digest(rows)
+        return self._models[key]
+
+    def page(self, url_name, conference=None):
+        parts = [self.site, url_name]
+        if conference is not None:
+            for label, url_names in PAGE_DEPENDENCIES.items():
+                if label != 'conferences.Conference' and url_name in url_names:
+                    parts.append(self._model_rows(label, conference))
+            parts.extend(time_state(url_name, conference, self.now))
+        return _digest(*parts)
+
+
+def site_pages():
+    """Все страницы для экспорта: [(имя URL, конференция или None)]."""
+    pages = [(url_name, None) for url_name in SITE_PAGES]
+    for conference in Conference.objects.order_by('pk'):
+        pages.extend((url_name, conference) for url_name in CONFERENCE_PAGES)
+    return pages
+
+
+def page_path(url_name, conference, language):
+    with translation.override(language):
+        args = [conference.slug] if conference is not None else []
+        return reverse(f'conferences:{url_name}', args=args)
+
+
+def _file_name(path):
+    return os.path.join(path.strip('/'), 'index.html')
+
+
+def _write(output_dir, name, content):
+    """Атомарная запись: веб-сервер никогда не видит наполовину записанный файл."""
+    path = os.path.join(output_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f'{path}.part'
+    with open(partial, 'wb') as f:
+        f.write(content)
+    os.replace(partial, path)
+
+
+def _remove(output_dir, name):
+    path = os.path.join(output_dir, name)
+    if os.path.exists(path):
+        os.remove(path)
+    directory = os.path.dirname(path)
+    while directory != os.path.normpath(output_dir):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def _site_url():
+    return (settings.BASE_SITE or 'http://localhost').rstrip('/')
+
+
+def _client():
+    site = urlsplit(_site_url())
+    return Client(HTTP_HOST=site.netloc), site.scheme == 'https'
+
+
+def sitemap(pages):
+    """sitemap.xml со всеми языковыми версиями каждой страницы (hreflang)."""
+    site = _site_url()
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:xhtml="http://www.w3.org/1999/xhtml">',
+    ]
+    for url_name, conference in pages:
+        paths = {language: page_path(url_name, conference, language) for language, _name in settings.LANGUAGES}
+        alternates = ''.join(
+            f'<xhtml:link rel="alternate" hreflang="{language}" href="{escape(site + path)}"/>'
+            for language, path in paths.items()
+        )
+        for path in paths.values():
+            lines.append(f'<url><loc>{escape(site + path)}</loc>{alternates}</url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines).encode()
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def export(output_dir, limit=None, full=False):
+    """
+    Перерисовывает не более limit страниц (все языковые версии — одна страница), у которых
+    изменились данные, удаляет страницы исчезнувших конференций, обновляет sitemap.xml.
+    Возвращает число перерисованных страниц.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if full else load_manifest(output_dir)
+    fingerprints = Fingerprints()
+    pages = site_pages()
+
+    files = {}
+    stale = []
+    for url_name, conference in pages:
+        fingerprint = fingerprints.page(url_name, conference)
+        names = [
+            _file_name(page_path(url_name, conference, language)) for language, _name in settings.LANGUAGES
+        ]
+        files.update((name, fingerprint) for name in names)
+        if any(manifest.get(name) != fingerprint for name in names):
+            stale.append((url_name, conference, fingerprint))
+
+    client, secure = _client()
+    rendered = 0
+    for url_name, conference, fingerprint in islice(stale, limit):
+        # Переключатель языка — ссылками: форме set_language нужен токен CSRF, а у копии его нет
+        paths = [(language, page_path(url_name, conference, language)) for language, _name in settings.LANGUAGES]
+        for language, path in paths:
+            name = _file_name(path)
+            response = client.get(path, secure=secure, **{LANGUAGE_LINKS_KEY: paths})
+            if response.status_code != 200:
+                logger.warning(f"Статическая копия {path}: ответ {response.status_code}, страница не записана")
+                _remove(output_dir, name)
+                manifest.pop(name, None)
+                continue
+            if b'csrfmiddlewaretoken' in response.content:
+                logger.warning(f"Статическая копия {path}: на странице форма с токеном CSRF, из копии она не сработает")
+            _write(output_dir, name, response.content)
+            manifest[name] = fingerprint
+        rendered += 1
+
+    for name in set(manifest) - set(files):
+        _remove(output_dir, name)
+        del manifest[name]
+        logger.info(f"Статическая копия {name} удалена: страницы больше нет")
+
+    # Без изменений sitemap.xml не перезаписывается, чтобы не менялась дата для поисковиков и CDN
+    sitemap_content = sitemap(pages)
+    try:
+        with open(os.path.join(output_dir, SITEMAP_NAME), 'rb') as f:
+            unchanged = f.read() == sitemap_content
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        _write(output_dir, SITEMAP_NAME, sitemap_content)
+    _write(output_dir, MANIFEST_NAME, json.dumps(manifest, indent=1, sort_keys=True).encode())
+
+    if rendered:
+        logger.info(f"Статические страницы перерисованы: {rendered} из {len(pages)}")
+    return rendered
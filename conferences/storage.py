@@ -0,0 +1,270 @@
+"""
+Хранилище изображений, загружаемых через CKEditor: ограничение размеров,
+перекодирование в WebP, дедупликация по содержимому. Хэш, ширина и высота
+хранятся в EditorImage (их читает conferences.html); размеры дублируются
+в имени файла (<хэш>_<Ш>x<В>.webp).
+
+DedupStorage — хранилище файлов версий работ по содержимому (см. conferences/blobs.py).
+ArchiveAwareStorage — MEDIA_ROOT с чтением файлов, перенесенных в холодный архив
+(см. conferences/archive.py).
+"""
+import os
+import re
+import time
+import lzma
+import shutil
+import hashlib
+import logging
+import tempfile
+from io import BytesIO
+from contextlib import contextmanager
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+
+from .metrics import UPLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS_RE = re.compile(r'_(\d+)x(\d+)\.\w+$')
+
+
+def dimensions_from_name(name):
+    """Ширина и высота из имени файла, сохраненного CKEditorImageStorage, или None."""
+    match = DIMENSIONS_RE.search(name)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _header_size(data):
+    """Размер изображения по заголовку, без декодирования; None, если формат не распознан."""
+    try:
+        with Image.open(BytesIO(data)) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+class CKEditorImageStorage(FileSystemStorage):
+    upload_dir = 'ckeditor'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_side = getattr(settings, 'CKEDITOR_IMAGE_MAX_SIDE', 1920)
+        self.quality = getattr(settings, 'CKEDITOR_IMAGE_QUALITY', 80)
+        self.time_budget = getattr(settings, 'CKEDITOR_IMAGE_TIME_BUDGET', 5.0)
+        self.max_pixels = getattr(settings, 'CKEDITOR_IMAGE_MAX_PIXELS', 50_000_000)
+
+    def save(self, name, content, max_length=None):
+        from .models import EditorImage
+
+        content.seek(0)
+        data = content.read()
+        UPLOAD_BYTES.labels('ckeditor').inc(len(data))
+
+        digest = hashlib.sha256(data).hexdigest()
+        existing = EditorImage.objects.filter(sha256=digest).values_list('name', flat=True).first()
+        if existing and self.exists(existing):
+            logger.info(f"Изображение уже загружено ранее: {existing}")
+            return existing
+
+        directory = f'{self.upload_dir}/{digest[:2]}'
+        prefix = digest[:32]
+        started = time.monotonic()
+        try:
+            encoded, size = self._encode(data, started)
+        except Exception as e:
+            # Файл сохраняется как есть, чтобы загрузка не срывалась из-за редкого формата или нехватки времени
+            logger.warning(f"Не удалось перекодировать изображение {name}: {e}")
+            ext = os.path.splitext(name)[1].lower() or '.bin'
+            return self._store(digest, f'{directory}/{prefix}{ext}', data, _header_size(data), len(data), max_length)
+
+        saved = self._store(
+            digest, f'{directory}/{prefix}_{size[0]}x{size[1]}.webp', encoded, size, len(data), max_length
+        )
+        logger.info(
+            f"Изображение {name} сохранено как {saved}: {len(data)} -> {len(encoded)} байт, "
+            f"{(time.monotonic() - started) * 1000:.0f} мс"
+        )
+        return saved
+
+    def _store(self, digest, name, data, size, original_size, max_length):
+        from .models import EditorImage
+
+        # Имя определяется содержимым: файл, загруженный до появления EditorImage, не копируется
+        if not self.exists(name):
+            name = super().save(name, ContentFile(data), max_length)
+        width, height = size or (None, None)
+        EditorImage.objects.update_or_create(sha256=digest, defaults={
+            'name': name, 'width': width, 'height': height, 'size': len(data), 'original_size': original_size,
+        })
+        return name
+
+    def _check_budget(self, started, step):
+        elapsed = time.monotonic() - started
+        if elapsed > self.time_budget:
+            raise TimeoutError(f'{step}: {elapsed:.1f} с при бюджете {self.time_budget} с')
+
+    def _encode(self, data, started):
+        img = Image.open(BytesIO(data))
+        source_format = img.format
+        if getattr(img, 'is_animated', False):
+            raise ValueError('анимированные изображения не перекодируются')
+
+        # JPEG декодируется сразу в уменьшенном масштабе (1/2, 1/4, 1/8) — главное ускорение для фото с камеры
+        img.draft('RGB', (self.max_side, self.max_side))
+        # Время декодирования растет с числом пикселей; прервать его нельзя, поэтому предел проверяется до
+        if img.width * img.height > self.max_pixels:
+            raise ValueError(f'{img.width}x{img.height}: больше {self.max_pixels} пикселей')
+        img.load()
+        self._check_budget(started, 'декодирование')
+
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((self.max_side, self.max_side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        self._check_budget(started, 'уменьшение')
+
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+
+        # Чем меньше осталось времени, тем быстрее (и хуже по сжатию) метод кодирования WebP
+        remaining = self.time_budget - (time.monotonic() - started)
+        method = 4 if remaining > self.time_budget / 2 else 0
+
+        output = BytesIO()
+        img.save(output, format='WebP', quality=self.quality, method=method)
+        best = output.getvalue()
+
+        # Графика (скриншоты, схемы, логотипы) без потерь обычно и меньше, и четче
+        if source_format != 'JPEG':
+            remaining = self.time_budget - (time.monotonic() - started)
+            if remaining > self.time_budget / 2:
+                output = BytesIO()
+                img.save(output, format='WebP', lossless=True, quality=50, method=method)
+                if len(output.getvalue()) < len(best):
+                    best = output.getvalue()
+
+        return best, img.size
+
+
+class ArchiveAwareStorage(FileSystemStorage):
+    """
+    MEDIA_ROOT, где файлы прошедших конференций могут быть перенесены в холодный архив.
+    Такие файлы читаются из архива, и код, открывающий FieldFile, разницы не замечает.
+    """
+
+    def _archived(self, name):
+        from .models import ArchivedFile
+        return ArchivedFile.objects.select_related('pack').filter(name=name).first()
+
+    def on_disk(self, name):
+        return os.path.exists(self.path(name))
+
+    def _open(self, name, mode='rb'):
+        if not self.on_disk(name):
+            archived = self._archived(name)
+            if archived is not None:
+                from .archive import open_archived
+                return open_archived(archived)
+        return super()._open(name, mode)
+
+    def exists(self, name):
+        return super().exists(name) or self._archived(name) is not None
+
+    def size(self, name):
+        if not self.on_disk(name):
+            archived = self._archived(name)
+            if archived is not None:
+                return archived.size
+        return super().size(name)
+
+    def _readable_on_disk(self, name):
+        return self.on_disk(name)
+
+    @contextmanager
+    def local_path(self, name):
+        """
+        Путь к файлу для внешних программ (LibreOffice, pdftoppm); перенесенный в архив
+        файл распаковывается во временный каталог.
+        """
+        if self._readable_on_disk(name):
+            yield self.path(name)
+            return
+        workdir = tempfile.mkdtemp(prefix='media_')
+        try:
+            path = os.path.join(workdir, os.path.basename(name))
+            with self.open(name, 'rb') as source, open(path, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            yield path
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+BLOB_DIR = 'blobs'
+PACKED_DIR = 'blobs/packed'
+# Распакованный файл держится в памяти до этого размера, больше — во временном файле
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+
+def blob_name(sha256, ext):
+    return f'{BLOB_DIR}/{sha256[:2]}/{sha256}{ext.lower()}'
+
+
+def packed_name(name):
+    return f'{PACKED_DIR}/{name[len(BLOB_DIR) + 1:]}'
+
+
+class DedupStorage(ArchiveAwareStorage):
+    """
+    Файлы версий работ по содержимому: blobs/<sha[:2]>/<sha><ext>, одинаковые
+    загрузки хранятся один раз. Сжатые (xz) копии лежат в blobs/packed/ под тем же
+    именем и при чтении прозрачно распаковываются, поэтому расширение в имени
+    остается настоящим и код, читающий файлы, о сжатии не знает.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        name = blob_name(digest.hexdigest(), os.path.splitext(name)[1])
+        for candidate in (name, packed_name(name)):
+            if self.exists(candidate):
+                logger.info(f"Файл версии уже хранится: {candidate}")
+                return candidate
+        return super().save(name, content, max_length)
+
+    def is_packed(self, name):
+        return name.startswith(PACKED_DIR + '/')
+
+    def _open(self, name, mode='rb'):
+        # В холодный архив сжатые файлы попадают уже распакованными
+        if not self.is_packed(name) or not self.on_disk(name):
+            return super()._open(name, mode)
+        # Читатели (zipfile) перемещаются по файлу; в потоке xz каждый шаг назад — распаковка заново
+        spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        with lzma.open(self.path(name), 'rb') as source:
+            shutil.copyfileobj(source, spooled)
+        spooled.seek(0)
+        return File(spooled, name=name)
+
+    def _readable_on_disk(self, name):
+        # Сжатый файл внешним программам не годится, он распаковывается как архивный
+        return not self.is_packed(name) and self.on_disk(name)
+
+    def pack(self, name, min_saving):
+        """
+        Сохраняет сжатую копию файла в blobs/packed/ и возвращает (ее имя, размер) или
+        (None, размер сжатых данных), если сжатие экономит меньше доли min_saving.
+        Исходный файл не удаляется.
+        """
+        with self.open(name, 'rb') as source:
+            compressed = lzma.compress(source.read(), preset=6)
+        if len(compressed) > self.size(name) * (1 - min_saving):
+            return None, len(compressed)
+        target = packed_name(name)
+        if self.exists(target):
+            self.delete(target)
+        return super().save(target, ContentFile(compressed)), len(compressed)
@@ -0,0 +1,187 @@
+import io
+import os
+import random
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, override_settings
+
+from conferences import archive
+from conferences.archive import ArchiveError, ArchivedFileIO, _parse_range, archive_conference, read_index
+from conferences.models import ArchivedFile, GalleryMedia
+
+from .utils import MediaTestCase, make_conference
+
+BLOCK = 64
+
+
+def sample(size, seed=0):
+    # Половина блоков сжимается, половина (случайные байты) хранится как есть
+    generator = random.Random(seed)
+    chunks = []
+    for number in range(0, size, BLOCK):
+        chunks.append(b'a' * BLOCK if number // BLOCK % 2 else generator.randbytes(BLOCK))
+    return b''.join(chunks)[:size]
+
+
+class PackFormatTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(archive, 'BLOCK_SIZE', BLOCK)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.directory = tempfile.mkdtemp(prefix='test_pack_')
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.storage = FileSystemStorage(location=self.directory)
+        self.files = {'first.bin': sample(BLOCK * 5 + 7), 'empty.txt': b'', 'second.bin': sample(BLOCK * 2, seed=1)}
+        for name, data in self.files.items():
+            self.storage.save(name, ContentFile(data))
+        self.path = os.path.join(self.directory, 'test.kzpack')
+        self.index = archive._write_pack(self.path, [(name, self.storage) for name in self.files])
+
+    def reader(self, name):
+        entry = next(entry for entry in self.index if entry['name'] == name)
+        return ArchivedFileIO(self.path, entry['size'], entry['block_size'], entry['blocks'])
+
+    def test_round_trip(self):
+        self.assertEqual(read_index(self.path), self.index)
+        self.assertEqual(
+            {entry['name']: entry['size'] for entry in self.index}, {name: len(data) for name, data in self.files.items()},
+        )
+        for name, data in self.files.items():
+            with io.BufferedReader(self.reader(name)) as f:
+                self.assertEqual(f.read(), data)
+        blocks = next(entry for entry in self.index if entry['name'] == 'first.bin')['blocks']
+        self.assertEqual({compressed for _, _, compressed in blocks}, {True, False})
+        archive._verify(self.path, self.index)
+        self.assertFalse(os.path.exists(self.path + '.part'))
+
+    def test_seek_and_read_across_blocks(self):
+        data = self.files['first.bin']
+        with io.BufferedReader(self.reader('first.bin'), buffer_size=16) as f:
+            f.seek(BLOCK - 10)
+            self.assertEqual(f.read(BLOCK + 20), data[BLOCK - 10:2 * BLOCK + 10])
+            f.seek(-3, io.SEEK_END)
+            self.assertEqual(f.read(), data[-3:])
+            f.seek(5)
+            f.seek(BLOCK * 3, io.SEEK_CUR)
+            self.assertEqual(f.read(4), data[BLOCK * 3 + 5:BLOCK * 3 + 9])
+            f.seek(len(data) + 100)
+            self.assertEqual(f.read(), b'')
+
+    def test_damaged_pack_rejected(self):
+        with open(self.path, 'r+b') as f:
+            f.seek(-1, io.SEEK_END)
+            f.write(b'!')
+        with self.assertRaises(ArchiveError):
+            read_index(self.path)
+
+    def test_changed_block_fails_verification(self):
+        for offset, length, _ in next(entry for entry in self.index if entry['name'] == 'second.bin')['blocks']:
+            with open(self.path, 'r+b') as f:
+                f.seek(offset)
+                f.write(b'\0' * length)
+            with self.assertRaises(ArchiveError):
+                archive._verify(self.path, self.index)
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(_parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(_parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(_parse_range('bytes=90-500', 100), (90, 99))
+        self.assertEqual(_parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(_parse_range('bytes=-500', 100), (0, 99))
+
+    def test_unsatisfiable(self):
+        self.assertIs(_parse_range('bytes=100-', 100), False)
+        self.assertIs(_parse_range('bytes=-0', 100), False)
+        self.assertIs(_parse_range('bytes=-10', 0), False)
+        self.assertIs(_parse_range('bytes=0-', 0), False)
+
+    def test_invalid_ignored(self):
+        self.assertIsNone(_parse_range('bytes=9-0', 100))
+        self.assertIsNone(_parse_range('bytes=-', 100))
+        self.assertIsNone(_parse_range('bytes=0-1,5-6', 100))
+        self.assertIsNone(_parse_range('items=0-1', 100))
+
+
+class MediaViewTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.archive_root = tempfile.mkdtemp(prefix='test_archive_')
+        self.addCleanup(shutil.rmtree, self.archive_root, ignore_errors=True)
+        override = override_settings(ARCHIVE_ROOT=self.archive_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.conference = make_conference()
+        self.data = sample(3000)
+        self.media = GalleryMedia.objects.create(conference=self.conference, file=ContentFile(self.data, name='clip.mp4'))
+        GalleryMedia.objects.create(conference=self.conference, file=ContentFile(b'', name='empty.txt'))
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_conference(self.conference)
+        self.url = f'/media/{self.media.file.name}'
+        self.etag = f'"{ArchivedFile.objects.get(name=self.media.file.name).sha256}"'
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_archived_file_served_from_pack(self):
+        self.assertFalse(self.media.file.storage.on_disk(self.media.file.name))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.body(response), self.data)
+        with self.media.file.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_partial_content(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=1000-1999'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 1000-1999/3000')
+        self.assertEqual(response['Content-Length'], '1000')
+        self.assertEqual(self.body(response), self.data[1000:2000])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=5000-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */3000')
+
+    def test_invalid_range_ignored(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=20-10'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.data)
+
+    def test_empty_file_suffix_range(self):
+        response = self.client.get('/media/conf/gallery/empty.txt', headers={'Range': 'bytes=-10'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */0')
+
+    def test_if_range(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': self.etag})
+        self.assertEqual(response.status_code, 206)
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': '"changed"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.data)
+
+    def test_if_none_match(self):
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': self.etag}).status_code, 304)
+
+    def test_head(self):
+        response = self.client.head(self.url, headers={'Range': 'bytes=-100'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(DEBUG=True)
+    def test_blobs_not_served_directly(self):
+        storage = FileSystemStorage()
+        name = storage.save('blobs/ab/abcdef.docx', ContentFile(b'manuscript'))
+        self.assertEqual(self.client.get(f'/media/{name}').status_code, 404)
+        # Остальные файлы с диска при DEBUG отдаются
+        storage.save('conf/documents/rules.txt', ContentFile(b'rules'))
+        self.assertEqual(self.client.get('/media/conf/documents/rules.txt').status_code, 200)
@@ -0,0 +1,139 @@
+from django.test import SimpleTestCase
+
+from conferences.assignment import rebalance, solve
+from conferences.models import Keyword, ReviewAssignment, User
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+class SolveTests(SimpleTestCase):
+    def test_capacity_limits_and_unfilled_count(self):
+        submissions = {sid: (100 + sid, '', set()) for sid in (1, 2, 3)}
+        reviewers = {10: ('', set(), 2, 0)}
+        new, unfilled = solve(submissions, reviewers, {}, 1)
+        self.assertEqual(len(new), 2)
+        self.assertEqual(unfilled, 1)
+
+    def test_used_capacity_counted(self):
+        submissions = {1: (100, '', set()), 2: (101, '', set())}
+        new, unfilled = solve(submissions, {10: ('', set(), 3, 2)}, {}, 1)
+        self.assertEqual(len(new), 1)
+        self.assertEqual(unfilled, 1)
+
+    def test_expertise_match_preferred(self):
+        submissions = {1: (100, '', {7, 8})}
+        reviewers = {10: ('', {5}, 5, 0), 11: ('', {7}, 5, 0), 12: ('', {7, 8}, 5, 0)}
+        new, unfilled = solve(submissions, reviewers, {}, 1)
+        self.assertEqual(new, {(1, 12): 1.0})
+        self.assertEqual(unfilled, 0)
+
+    def test_unmatched_submissions_leave_experts_free(self):
+        submissions = {1: (100, '', set()), 2: (101, '', {7})}
+        reviewers = {10: ('', {7}, 1, 0), 11: ('', set(), 1, 0)}
+        new, unfilled = solve(submissions, reviewers, {}, 1)
+        self.assertEqual(new, {(1, 11): 0.0, (2, 10): 1.0})
+        self.assertEqual(unfilled, 0)
+
+    def test_least_loaded_on_equal_match(self):
+        reviewers = {10: ('', set(), 4, 3), 11: ('', set(), 4, 1)}
+        new, _ = solve({1: (100, '', set())}, reviewers, {}, 1)
+        self.assertEqual(list(new), [(1, 11)])
+
+    def test_conflicts_excluded(self):
+        # Автор работы и рецензент из организации автора не назначаются
+        submissions = {1: (10, 'казну', set())}
+        reviewers = {10: ('', set(), 5, 0), 11: ('казну', set(), 5, 0), 12: ('кбту', set(), 5, 0)}
+        new, unfilled = solve(submissions, reviewers, {}, 3)
+        self.assertEqual(list(new), [(1, 12)])
+        self.assertEqual(unfilled, 2)
+
+    def test_existing_assignments_kept(self):
+        reviewers = {10: ('', set(), 5, 1), 11: ('', set(), 5, 0)}
+        new, unfilled = solve({1: (100, '', set())}, reviewers, {1: {10}}, 2)
+        self.assertEqual(list(new), [(1, 11)])
+        self.assertEqual(unfilled, 0)
+
+    def test_augmenting_path_moves_earlier_assignment(self):
+        # Жадно работа 1 заняла бы рецензента 10, единственного допустимого для работы 2
+        submissions = {1: (100, 'a', set()), 2: (101, 'b', set())}
+        reviewers = {10: ('x', set(), 1, 0), 11: ('b', set(), 1, 0)}
+        new, unfilled = solve(submissions, reviewers, {}, 1)
+        self.assertEqual(sorted(new), [(1, 11), (2, 10)])
+        self.assertEqual(unfilled, 0)
+
+
+class RebalanceTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference(reviews_per_submission=1)
+
+    def reviewer(self, username, capacity=2, organization='', expertise=()):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='x', role='reviewer',
+            review_capacity=capacity, organization=organization,
+        )
+        user.expertise.set([Keyword.objects.get_or_create(name=name)[0] for name in expertise])
+        return user
+
+    def test_assigns_by_expertise_within_capacity(self):
+        graphs = make_submission(self.conference, 'first', keywords='Graphs')
+        climate = make_submission(self.conference, 'second', keywords='Climate')
+        make_submission(self.conference, 'third', keywords='Climate')
+        expert = self.reviewer('expert', capacity=1, expertise=['graphs'])
+        other = self.reviewer('other', capacity=1)
+
+        released, created, unfilled = rebalance(self.conference)
+        self.assertEqual((released, created, unfilled), (0, 2, 1))
+        self.assertEqual(ReviewAssignment.objects.get(reviewer=expert).submission, graphs)
+        self.assertEqual(ReviewAssignment.objects.get(reviewer=other).submission.keywords, climate.keywords)
+
+    def test_conflicting_assignment_released(self):
+        submission = make_submission(self.conference)
+        submission.user.organization = 'КазНУ'
+        submission.user.save()
+        colleague = self.reviewer('colleague', organization=' казну ')
+        outsider = self.reviewer('outsider', organization='КБТУ')
+        ReviewAssignment.objects.create(submission=submission, reviewer=colleague)
+
+        released, created, unfilled = rebalance(self.conference)
+        self.assertEqual((released, created, unfilled), (1, 1, 0))
+        self.assertEqual(list(submission.review_assignments.values_list('reviewer', flat=True)), [outsider.pk])
+
+    def test_capacity_shared_between_conferences(self):
+        reviewer = self.reviewer('busy', capacity=1)
+        other = make_conference('other')
+        ReviewAssignment.objects.create(submission=make_submission(other, 'first'), reviewer=reviewer)
+        make_submission(self.conference, 'second')
+        self.assertEqual(rebalance(self.conference), (0, 0, 1))
+
+
+class ReviewerScopeTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.assigned = make_submission(self.conference, 'first', title='Назначенная работа')
+        self.other = make_submission(self.conference, 'second', title='Чужая работа')
+        self.reviewer = User.objects.create_user(
+            username='reviewer', email='reviewer@example.com', password='x', role='reviewer',
+        )
+        ReviewAssignment.objects.create(submission=self.assigned, reviewer=self.reviewer)
+        self.url = f'/ru/{self.conference.slug}/management/submissions/'
+
+    def test_reviewer_sees_only_assigned(self):
+        self.client.force_login(self.reviewer)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Назначенная работа')
+        self.assertNotContains(response, 'Чужая работа')
+        self.assertEqual(self.client.get(f'{self.url}{self.other.pk}/').status_code, 404)
+
+    def test_organizer_sees_all(self):
+        self.client.force_login(User.objects.create_user(
+            username='organizer', email='organizer@example.com', password='x', role='organizer',
+        ))
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Назначенная работа')
+        self.assertContains(response, 'Чужая работа')
+
+    def test_author_forbidden(self):
+        self.client.force_login(self.assigned.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
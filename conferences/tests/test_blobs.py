@@ -0,0 +1,107 @@
+import os
+import shutil
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from conferences import blobs
+from conferences.models import FileBlob, SubmissionVersion
+from conferences.storage import BLOB_DIR, PACKED_DIR
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+# Старые DOC сжимаются в разы, поэтому такое содержимое упаковывается
+MANUSCRIPT = b'Introduction. Graph colouring with greedy algorithms.\n' * 200
+
+
+class DedupStorageTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        # MEDIA_ROOT общий на класс, а содержимое, оставшееся от другого теста, DedupStorage нашел бы по хэшу
+        shutil.rmtree(os.path.join(settings.MEDIA_ROOT, BLOB_DIR), ignore_errors=True)
+        self.conference = make_conference()
+        self.first = make_submission(self.conference, 'first')
+        self.second = make_submission(self.conference, 'second')
+
+    def upload(self, submission, data, name='paper.doc', number=1):
+        with self.captureOnCommitCallbacks(execute=True):
+            return SubmissionVersion.objects.create(
+                submission=submission, version_number=number, file=ContentFile(data, name=name),
+            )
+
+    def read(self, version):
+        version.refresh_from_db()
+        with version.file.open('rb') as f:
+            return f.read()
+
+    def test_identical_uploads_share_blob(self):
+        first = self.upload(self.first, MANUSCRIPT)
+        second = self.upload(self.second, MANUSCRIPT, name='copy.doc')
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(FileBlob.objects.count(), 1)
+        blob = FileBlob.objects.get()
+        self.assertEqual((blob.sha256, blob.name, blob.size), (first.file_hash, first.file.name, len(MANUSCRIPT)))
+        self.upload(self.first, b'another', number=2)
+        self.assertEqual(FileBlob.objects.count(), 2)
+
+    def test_replaced_version_packed_and_read_back(self):
+        old = self.upload(self.first, MANUSCRIPT)
+        original = old.file.name
+        self.upload(self.first, b'revised', number=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(blobs.process_pending(), 1)
+
+        blob = FileBlob.objects.get(sha256=old.file_hash)
+        self.assertTrue(blob.packed)
+        self.assertLess(blob.stored_size, blob.size)
+        self.assertTrue(blob.name.startswith(f'{PACKED_DIR}/'))
+        self.assertEqual(self.read(old), MANUSCRIPT)
+        self.assertEqual(old.file.name, blob.name)
+        self.assertFalse(old.file.storage.exists(original))
+        # Новая загрузка того же содержимого ссылается на сжатую копию
+        again = self.upload(self.second, MANUSCRIPT)
+        self.assertEqual(again.file.name, blob.name)
+        self.assertEqual(self.read(again), MANUSCRIPT)
+        # Повторно уже проверенное содержимое не сжимается
+        self.assertEqual(blobs.process_pending(), 0)
+
+    def test_latest_version_not_packed(self):
+        self.upload(self.first, MANUSCRIPT)
+        self.assertEqual(blobs.process_pending(), 0)
+        self.assertFalse(FileBlob.objects.get().packed)
+
+    def test_orphan_deleted(self):
+        version = self.upload(self.first, MANUSCRIPT)
+        storage = version.file.storage
+        version.delete()
+        self.assertEqual(blobs.delete_orphans(10), 1)
+        self.assertFalse(FileBlob.objects.exists())
+        self.assertFalse(storage.exists(version.file.name))
+
+    def test_orphan_referenced_during_deletion_kept(self):
+        version = self.upload(self.first, MANUSCRIPT)
+        name = version.file.name
+        version.delete()
+        orphan_blobs = blobs.orphan_blobs
+        calls = []
+
+        def upload_between_checks():
+            # Пачка уже выбрана, до повторной проверки под блокировкой загружается то же содержимое
+            if calls:
+                self.upload(self.second, MANUSCRIPT)
+            calls.append(1)
+            return orphan_blobs()
+
+        with mock.patch.object(blobs, 'orphan_blobs', upload_between_checks):
+            self.assertEqual(blobs.delete_orphans(10), 1)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(FileBlob.objects.get().name, name)
+        self.assertEqual(self.read(self.second.versions.get()), MANUSCRIPT)
+
+    def test_report(self):
+        self.upload(self.first, MANUSCRIPT)
+        self.upload(self.second, MANUSCRIPT)
+        report = blobs.report()
+        self.assertEqual((report['versions'], report['blobs']), (2, 1))
+        self.assertEqual(report['dedup_saved'], len(MANUSCRIPT))
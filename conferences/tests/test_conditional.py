@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import Client, override_settings
+
+from conferences.models import CommitteeMember
+from conferences.page_cache import get_cache
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+class ConditionalPageTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.url = f'/ru/{self.conference.slug}/committee/'
+
+    def test_validators_on_anonymous_page(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('must-revalidate', response['Cache-Control'])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_within_same_second_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        CommitteeMember.objects.create(conference=self.conference, full_name='Иванов И. И.', position='Профессор')
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'Иванов И. И.')
+
+    def test_other_page_dependency_keeps_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        make_submission(self.conference)
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_author_rename_changes_proceedings_etag(self):
+        submission = make_submission(self.conference, final_file=ContentFile(b'%PDF-1.4\n', name='paper.pdf'))
+        submission.status = 'ready_for_print'
+        submission.save()
+        url = f'/ru/{self.conference.slug}/proceedings/'
+        etag = self.client.get(url)['ETag']
+        submission.user.first_name = 'Айгерим'
+        submission.user.save()
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_materials_published_changes_etag(self):
+        # В Алматы 04:59 и 05:01 — одна дата, а по UTC материалы открываются между ними
+        self.conference.notification_date = datetime(2026, 5, 11).date()
+        self.conference.save()
+        url = f'/ru/{self.conference.slug}/proceedings/'
+        before = datetime(2026, 5, 10, 23, 59, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=before):
+            etag = self.client.get(url)['ETag']
+        with mock.patch('django.utils.timezone.now', return_value=before + timedelta(minutes=2)):
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_authenticated_user_gets_private_page_without_validators(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(make_submission(self.conference).user)
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_page_cache_hit_answers_304(self):
+        get_cache().clear()
+        client = Client()
+        etag = client.get(self.url)['ETag']
+        response = client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
@@ -0,0 +1,102 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import warnings
+
+from django.conf import settings
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from conferences import db_router
+from conferences.models import CommitteeMember, Conference, User
+
+from .utils import MediaMixin, make_conference, make_submission
+
+ROUTERS = ['conferences.db_router.PrimaryReplicaRouter']
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = db_router.PrimaryReplicaRouter()
+
+    def test_primary_outside_requests(self):
+        self.assertEqual(self.router.db_for_read(Conference), db_router.PRIMARY)
+
+    def test_replica_until_first_write(self):
+        with db_router.replica_reads():
+            self.assertEqual(self.router.db_for_read(Conference), db_router.REPLICA)
+            self.assertEqual(self.router.db_for_write(Conference), db_router.PRIMARY)
+            self.assertEqual(self.router.db_for_read(Conference), db_router.PRIMARY)
+        self.assertEqual(self.router.db_for_read(Conference), db_router.PRIMARY)
+
+
+class ReplicaRoutingTests(MediaMixin, TransactionTestCase):
+    """Основная БД и реплика — два файла SQLite; реплика — копия основной на момент copy_to_replica()."""
+    # Реплика подключается в setUpClass, раньше ее имени нет в настройках; '__all__' раскрывается позже
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls._replica_dir = tempfile.mkdtemp(prefix='test_replica_')
+        replica = connections.configure_settings({'default': {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(cls._replica_dir, 'replica.sqlite3'),
+        }})['default']
+        connections.settings[db_router.REPLICA] = replica
+        cls._replica_override = override_settings(
+            DATABASES={**settings.DATABASES, db_router.REPLICA: replica}, DATABASE_ROUTERS=ROUTERS,
+        )
+        with warnings.catch_warnings():
+            # Подключение уже зарегистрировано выше; DATABASES нужен ReplicaRoutingMiddleware
+            warnings.simplefilter('ignore')
+            cls._replica_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._replica_override.disable()
+        connections[db_router.REPLICA].close()
+        del connections[db_router.REPLICA]
+        del connections.settings[db_router.REPLICA]
+        shutil.rmtree(cls._replica_dir, ignore_errors=True)
+
+    def copy_to_replica(self):
+        connections[db_router.REPLICA].close()
+        primary = connections[db_router.PRIMARY]
+        primary.ensure_connection()
+        target = sqlite3.connect(settings.DATABASES[db_router.REPLICA]['NAME'])
+        primary.connection.backup(target)
+        target.close()
+
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.organizer = User.objects.create_user(
+            username='organizer', email='organizer@example.com', password='secret', role='organizer',
+        )
+        self.copy_to_replica()
+        # Появилось на основной БД после копирования — на реплике этого еще нет
+        CommitteeMember.objects.create(conference=self.conference, full_name='Новый Член', position='Профессор')
+
+    def test_public_page_reads_replica(self):
+        response = self.client.get(f'/ru/{self.conference.slug}/committee/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Новый Член')
+
+    def test_api_reads_replica(self):
+        make_conference('fresh', title='Свежая конференция')
+        response = self.client.get('/ru/api/conferences/')
+        self.assertEqual([item['title'] for item in response.json()], [self.conference.title])
+
+    def test_organizer_pages_read_primary(self):
+        make_submission(self.conference, title='Новая работа')
+        self.client.force_login(self.organizer)
+        response = self.client.get(f'/ru/{self.conference.slug}/management/submissions/')
+        self.assertContains(response, 'Новая работа')
+
+    def test_write_pins_reads_to_primary(self):
+        response = self.client.post('/ru/login/', {'username': 'organizer', 'password': 'secret'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('db_pin', response.cookies)
+        self.assertContains(self.client.get(f'/ru/{self.conference.slug}/committee/'), 'Новый Член')
@@ -0,0 +1,86 @@
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image, ImageFile
+from django.core.files.base import ContentFile
+from django.test import override_settings
+
+from conferences.html import image_dimensions
+from conferences.models import EditorImage
+from conferences.storage import CKEditorImageStorage
+
+from .utils import MediaTestCase
+
+
+def image(size, format='JPEG', color='navy'):
+    output = BytesIO()
+    Image.new('RGB', size, color).save(output, format=format)
+    return ContentFile(output.getvalue(), name=f'upload.{format.lower()}')
+
+
+@override_settings(CKEDITOR_IMAGE_MAX_SIDE=400)
+class CKEditorImageStorageTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = CKEditorImageStorage()
+
+    def test_resized_to_webp_with_dimensions(self):
+        name = self.storage.save('photo.jpg', image((1200, 800)))
+        self.assertTrue(name.startswith('ckeditor/') and name.endswith('_400x267.webp'))
+        record = EditorImage.objects.get()
+        self.assertEqual((record.name, record.width, record.height), (name, 400, 267))
+        self.assertEqual(record.size, self.storage.size(name))
+        with self.storage.open(name) as f, Image.open(f) as saved:
+            self.assertEqual((saved.format, saved.size), ('WEBP', (400, 267)))
+        self.assertEqual(image_dimensions(f'/media/{name}'), (400, 267))
+
+    def test_duplicate_found_by_hash(self):
+        name = self.storage.save('photo.jpg', image((600, 300)))
+        with mock.patch.object(CKEditorImageStorage, 'listdir', side_effect=AssertionError('listdir')), \
+                mock.patch.object(CKEditorImageStorage, '_encode', side_effect=AssertionError('_encode')):
+            self.assertEqual(self.storage.save('copy.jpg', image((600, 300))), name)
+        self.assertEqual(EditorImage.objects.count(), 1)
+        self.assertNotEqual(self.storage.save('other.jpg', image((600, 300), color='red')), name)
+
+    def test_missing_file_saved_again(self):
+        name = self.storage.save('photo.jpg', image((600, 300)))
+        self.storage.delete(name)
+        self.assertEqual(self.storage.save('photo.jpg', image((600, 300))), name)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(EditorImage.objects.count(), 1)
+
+    def test_file_uploaded_before_records_reused(self):
+        name = self.storage.save('photo.jpg', image((600, 300)))
+        EditorImage.objects.all().delete()
+        self.assertEqual(self.storage.save('photo.jpg', image((600, 300))), name)
+        self.assertEqual(len(self.storage.listdir(name.rsplit('/', 1)[0])[1]), 1)
+        self.assertEqual(EditorImage.objects.get().name, name)
+
+    @override_settings(CKEDITOR_IMAGE_TIME_BUDGET=0)
+    def test_time_budget_exceeded_during_decode(self):
+        upload = image((1200, 800), format='PNG')
+        with mock.patch.object(Image.Image, 'thumbnail', side_effect=AssertionError('thumbnail')):
+            name = CKEditorImageStorage().save('scheme.png', upload)
+        self.assertTrue(name.endswith('.png'))
+        upload.seek(0)
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), upload.read())
+        # Размеры известны по заголовку, файл при выводе не открывается
+        record = EditorImage.objects.get()
+        self.assertEqual((record.width, record.height), (1200, 800))
+        with mock.patch('conferences.html.default_storage.open', side_effect=AssertionError('open')):
+            self.assertEqual(image_dimensions(f'/media/{name}'), (1200, 800))
+
+    @override_settings(CKEDITOR_IMAGE_MAX_PIXELS=10_000)
+    def test_too_many_pixels_not_decoded(self):
+        upload = image((200, 100), format='PNG')
+        with mock.patch.object(ImageFile.ImageFile, 'load', side_effect=AssertionError('load')):
+            name = CKEditorImageStorage().save('scheme.png', upload)
+        self.assertTrue(name.endswith('.png'))
+
+    def test_unreadable_file_stored_unchanged(self):
+        name = self.storage.save('file.bmp', ContentFile(b'not an image', name='file.bmp'))
+        self.assertTrue(name.endswith('.bmp'))
+        record = EditorImage.objects.get()
+        self.assertIsNone(record.width)
+        self.assertEqual(record.original_size, len(b'not an image'))
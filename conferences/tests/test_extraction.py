@@ -0,0 +1,59 @@
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+
+from conferences import extraction
+from conferences.models import ManuscriptText, SubmissionVersion
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+def docx(*paragraphs):
+    from docx import Document
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    output = BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+class ExtractionTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.data = docx('Раскраска графов', 'Жадные   алгоритмы\tна графах')
+
+    def upload(self, username, data, name='paper.docx'):
+        submission = make_submission(self.conference, username)
+        return SubmissionVersion.objects.create(submission=submission, file=ContentFile(data, name=name))
+
+    def test_text_extracted_once_per_content(self):
+        first = self.upload('first', self.data)
+        second = self.upload('second', self.data)
+        with mock.patch.dict(extraction.EXTRACTORS, {'.docx': mock.Mock(wraps=extraction.extract_docx)}) as extractors:
+            self.assertGreaterEqual(extraction.process_pending(), 2)
+            self.assertEqual(extractors['.docx'].call_count, 1)
+
+        manuscript = ManuscriptText.objects.get()
+        self.assertEqual(manuscript.sha256, first.file_hash)
+        self.assertEqual(manuscript.text, 'Раскраска графов\nЖадные алгоритмы на графах')
+        self.assertEqual(manuscript.word_count, 6)
+        for version in (first, second):
+            version.refresh_from_db()
+            self.assertEqual(version.manuscript, manuscript)
+        self.assertFalse(extraction.pending_versions().exists())
+
+    def test_known_hash_not_opened(self):
+        version = self.upload('first', self.data)
+        manuscript = extraction.extract(version.file, version.file_hash)
+        with mock.patch.object(type(version.file), 'open', side_effect=AssertionError('open')):
+            self.assertEqual(extraction.extract(version.file, version.file_hash), manuscript)
+
+    def test_failure_recorded_and_not_retried(self):
+        version = self.upload('first', b'not a zip')
+        manuscript = extraction.extract(version.file, version.file_hash)
+        self.assertTrue(manuscript.error)
+        self.assertEqual((manuscript.text, manuscript.word_count), ('', 0))
+        self.assertEqual(extraction.extract(version.file, version.file_hash), manuscript)
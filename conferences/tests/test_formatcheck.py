@@ -0,0 +1,79 @@
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+
+from conferences import formatcheck
+from conferences.models import FormatReport, FormatRules, SubmissionVersion
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+def manuscript(font='Times New Roman', size=14, margin=20, headings=('Введение', 'Список литературы')):
+    from docx import Document
+    from docx.shared import Mm, Pt
+    document = Document()
+    normal = document.styles['Normal'].font
+    normal.name, normal.size = font, Pt(size)
+    for section in document.sections:
+        section.top_margin = section.bottom_margin = section.left_margin = section.right_margin = Mm(margin)
+    for heading in headings:
+        document.add_heading(heading, level=1)
+        document.add_paragraph('Основной текст раздела о раскраске графов жадными алгоритмами. ' * 5)
+    output = BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+class FormatCheckTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.rules = FormatRules.objects.create(
+            conference=self.conference, min_words=40, margin_top=20, margin_left=20,
+            font_name='Times New Roman', font_size=14, required_headings='Введение\nСписок литературы|References',
+        )
+
+    def upload(self, data, username='author', name='paper.docx'):
+        submission = make_submission(self.conference, username)
+        return SubmissionVersion.objects.create(submission=submission, file=ContentFile(data, name=name))
+
+    def checks(self, version):
+        return {check['code']: check['passed'] for check in version.format_report.checks}
+
+    def test_matching_manuscript_passes(self):
+        version = self.upload(manuscript())
+        self.assertEqual(formatcheck.process_pending(), 1)
+        version.refresh_from_db()
+        self.assertTrue(version.format_report.passed)
+        self.assertEqual(
+            self.checks(version), {'words': True, 'margins': True, 'font': True, 'font_size': True, 'headings': True},
+        )
+        self.assertEqual(formatcheck.process_pending(), 0)
+
+    def test_report_lists_failures(self):
+        version = self.upload(manuscript(font='Arial', size=12, margin=30, headings=('Введение',)))
+        formatcheck.process_pending()
+        report = FormatReport.objects.get(version=version)
+        self.assertIs(report.passed, False)
+        self.assertEqual(
+            self.checks(version), {'words': True, 'margins': False, 'font': False, 'font_size': False, 'headings': False},
+        )
+        details = {check['code']: check['detail'] for check in report.checks}
+        self.assertIn('Arial', details['font'])
+        self.assertEqual(details['headings'], 'нет разделов: Список литературы')
+
+    def test_rules_change_rechecks(self):
+        version = self.upload(manuscript())
+        formatcheck.process_pending()
+        self.rules.font_name = 'Arial'
+        self.rules.save()
+        self.assertEqual(formatcheck.process_pending(), 1)
+        version.refresh_from_db()
+        self.assertIs(version.format_report.passed, False)
+
+    def test_doc_not_checked(self):
+        version = self.upload(b'\xd0\xcf\x11\xe0', name='paper.doc')
+        formatcheck.process_pending()
+        report = FormatReport.objects.get(version=version)
+        self.assertIsNone(report.passed)
+        self.assertTrue(report.error)
@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase
+
+from conferences.html import compile_html
+
+
+class CompileHtmlTests(SimpleTestCase):
+    def test_script_removed_with_content(self):
+        html = compile_html('<p>Текст</p><script>alert(1)</script>')
+        self.assertNotIn('script', html)
+        self.assertNotIn('alert', html)
+        self.assertIn('<p>Текст</p>', html)
+
+    def test_event_handler_attributes_removed(self):
+        html = compile_html(
+            '<p onclick="alert(1)" class="lead">Текст</p>'
+            '<img src="/media/a.png" onerror="alert(2)" width="10" height="10">'
+        )
+        self.assertNotIn('onclick', html)
+        self.assertNotIn('onerror', html)
+        self.assertNotIn('alert', html)
+        self.assertIn('class="lead"', html)
+
+    def test_javascript_urls_removed(self):
+        for href in ('javascript:alert(1)', ' JavaScript:alert(1)', 'java\tscript:alert(1)'):
+            with self.subTest(href=href):
+                html = compile_html(f'<a href="{href}">ссылка</a>')
+                self.assertNotIn('href', html)
+                self.assertIn('ссылка', html)
+
+    def test_safe_links_kept(self):
+        html = compile_html('<a href="https://kaznu.kz/" target="_blank">сайт</a>')
+        self.assertIn('href="https://kaznu.kz/"', html)
+
+    def test_dangerous_tags_and_styles_removed(self):
+        html = compile_html(
+            '<iframe src="https://evil.example/"></iframe>'
+            '<form action="/x"><input name="a"></form>'
+            '<svg onload="alert(1)"></svg>'
+            '<p style="background: url(javascript:alert(1))">Текст</p>'
+        )
+        for fragment in ('iframe', 'form', 'input', 'svg', 'javascript', 'style='):
+            self.assertNotIn(fragment, html)
+        self.assertIn('Текст', html)
+
+    def test_unknown_tags_unwrapped(self):
+        self.assertEqual(compile_html('<custom-tag><b>Жирный</b></custom-tag>'), '<b>Жирный</b>')
+
+    def test_empty_input(self):
+        self.assertEqual(compile_html(''), '')
+        self.assertEqual(compile_html('   '), '')
+        self.assertEqual(compile_html(None), '')
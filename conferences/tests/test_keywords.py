@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase
+
+from conferences.models import Keyword, parse_keywords
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+class ParseKeywordsTests(SimpleTestCase):
+    def test_normalized_and_deduplicated(self):
+        self.assertEqual(
+            parse_keywords(' Machine  Learning, NLP; nlp\nmachine learning ,, '),
+            ['machine learning', 'nlp'],
+        )
+
+    def test_empty(self):
+        self.assertEqual(parse_keywords(''), [])
+        self.assertEqual(parse_keywords(None), [])
+        self.assertEqual(parse_keywords(' , ; '), [])
+
+    def test_long_keyword_truncated(self):
+        self.assertEqual(parse_keywords('а' * 150), ['а' * Keyword.NAME_MAX_LENGTH])
+
+
+class SyncKeywordsTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+
+    def names(self, submission):
+        return sorted(submission.keyword_set.values_list('name', flat=True))
+
+    def test_keywords_created_on_save(self):
+        submission = make_submission(self.conference, keywords='Graphs, NLP')
+        self.assertEqual(self.names(submission), ['graphs', 'nlp'])
+
+    def test_resave_with_different_case_and_whitespace(self):
+        submission = make_submission(self.conference, keywords='Machine Learning, NLP')
+        keyword_ids = set(submission.keyword_set.values_list('id', flat=True))
+
+        submission.keywords = '  machine   LEARNING ;nlp\n'
+        submission.save()
+
+        self.assertEqual(set(submission.keyword_set.values_list('id', flat=True)), keyword_ids)
+        self.assertEqual(Keyword.objects.count(), 2)
+
+    def test_keywords_shared_between_submissions(self):
+        first = make_submission(self.conference, 'first', keywords='Graphs')
+        second = make_submission(self.conference, 'second', keywords=' GRAPHS , trees')
+        self.assertEqual(self.names(second), ['graphs', 'trees'])
+        self.assertEqual(Keyword.objects.count(), 2)
+        self.assertEqual(first.keyword_set.get(), second.keyword_set.get(name='graphs'))
+
+    def test_removed_keyword_unlinked(self):
+        submission = make_submission(self.conference, keywords='graphs, trees')
+        submission.keywords = 'Trees'
+        submission.save()
+        self.assertEqual(self.names(submission), ['trees'])
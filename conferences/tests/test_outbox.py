@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import override_settings
+from django.utils import timezone
+
+from conferences.models import OutboxEmail
+from conferences.notifications import LEASE, MAX_ATTEMPTS, _claim_batch, build_message, send_pending
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+class RejectingBackend(BaseEmailBackend):
+    """SMTP принимает соединение, но отклоняет письма."""
+
+    def send_messages(self, messages):
+        raise SMTPException('550 mailbox unavailable')
+
+
+class UnreachableBackend(BaseEmailBackend):
+    """SMTP-сервер недоступен."""
+
+    def open(self):
+        raise ConnectionRefusedError('connection refused')
+
+
+class OutboxTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.submission = make_submission(make_conference())
+
+    def change_status(self, status='accepted'):
+        self.submission.status = status
+        self.submission.save()
+        return OutboxEmail.objects.get(submission=self.submission, kind='status_changed')
+
+    def test_status_change_queued_in_author_language(self):
+        self.submission.user.language = 'kk'
+        self.submission.user.save()
+        email = self.change_status()
+        self.assertEqual((email.status, email.recipient, email.language), ('pending', 'author@example.com', 'kk'))
+        self.assertEqual(email.context['old_status'], 'under_review')
+
+    def test_sent_through_file_backend(self):
+        directory = tempfile.mkdtemp(prefix='test_emails_')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        email = self.change_status()
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend', EMAIL_FILE_PATH=directory,
+        ):
+            self.assertEqual(send_pending(), 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('sent', 1))
+        self.assertIsNotNone(email.sent_at)
+        self.assertEqual(len(os.listdir(directory)), 1)
+        # Отправленное письмо не уходит повторно
+        self.assertEqual(send_pending(), 0)
+
+    def test_claimed_batch_leased(self):
+        email = self.change_status()
+        self.assertEqual(_claim_batch(10), [email])
+        # Пока аренда не истекла, другой воркер пачку не получит
+        self.assertEqual(_claim_batch(10), [])
+        email.refresh_from_db()
+        self.assertAlmostEqual(email.next_attempt_at, timezone.now() + LEASE, delta=timedelta(seconds=5))
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(_claim_batch(10), [email])
+
+    @override_settings(EMAIL_BACKEND='conferences.tests.test_outbox.RejectingBackend')
+    def test_retry_with_backoff_then_failed(self):
+        email = self.change_status()
+        for attempt in range(1, MAX_ATTEMPTS):
+            send_pending()
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('pending', attempt))
+            self.assertIn('550', email.last_error)
+            self.assertAlmostEqual(
+                email.next_attempt_at, timezone.now() + timedelta(minutes=2 ** attempt), delta=timedelta(seconds=5),
+            )
+            OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        send_pending()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', MAX_ATTEMPTS))
+        self.assertEqual(send_pending(), 0)
+
+    @override_settings(EMAIL_BACKEND='conferences.tests.test_outbox.UnreachableBackend')
+    def test_unreachable_smtp_counts_attempt_for_whole_batch(self):
+        self.change_status()
+        other = make_submission(self.submission.conference, 'second')
+        other.status = 'rejected'
+        other.save()
+        self.assertEqual(send_pending(), 2)
+        for email in OutboxEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertIn('refused', email.last_error)
+
+
+class OutboxTemplateTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.templates = tempfile.mkdtemp(prefix='test_templates_')
+        self.addCleanup(shutil.rmtree, self.templates, ignore_errors=True)
+        directory = os.path.join(self.templates, 'conferences', 'emails')
+        os.makedirs(directory)
+        # Отдельный шаблон на казахском; язык активен при рендере, каталоги .mo не нужны
+        with open(os.path.join(directory, 'status_changed.kk.txt'), 'w', encoding='utf-8') as f:
+            f.write('{% load i18n %}{% get_current_language as language %}kk:{{ language }} {{ title }}')
+        engine = settings.TEMPLATES[0]
+        self.override = override_settings(TEMPLATES=[{**engine, 'DIRS': [self.templates, *engine['DIRS']]}])
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        submission = make_submission(make_conference(), title='Графы')
+        submission.status = 'accepted'
+        submission.save()
+        self.email = OutboxEmail.objects.get(submission=submission)
+
+    def test_language_template_preferred(self):
+        self.email.language = 'kk'
+        message = build_message(self.email)
+        self.assertEqual(message.body, 'kk:kk Графы')
+        self.assertEqual(message.to, ['author@example.com'])
+        self.assertTrue(message.subject)
+
+    def test_common_template_for_other_languages(self):
+        message = build_message(self.email)
+        self.assertNotIn('kk:', message.body)
+        self.assertIn('Графы', message.body)
+        self.assertIn('/ru/profile/', message.body)
+
+    def test_sent_message_rendered_per_recipient(self):
+        self.email.language = 'kk'
+        self.email.save()
+        send_pending()
+        self.assertEqual([message.body for message in mail.outbox], ['kk:kk Графы'])
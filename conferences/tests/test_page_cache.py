@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from conferences.models import PdfPreview, Submission
+from conferences.page_cache import get_cache, strip_csrf
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        # Клиент создается внутри override_settings: промежуточные слои загружаются при первом запросе
+        self.client = Client()
+        self.conference = make_conference(notification_date=(timezone.now() - timedelta(days=1)).date())
+
+    def get(self, page='', **kwargs):
+        return self.client.get(f'/ru/{self.conference.slug}/{page}', **kwargs)
+
+    def test_miss_then_hit(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+        second = self.get()
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        # Токен CSRF у каждого посетителя свой, остальная страница — из кэша
+        self.assertEqual(strip_csrf(second.content), strip_csrf(first.content))
+
+    def test_languages_cached_separately(self):
+        self.assertEqual(self.get()['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(f'/en/{self.conference.slug}/')['X-Page-Cache'], 'MISS')
+
+    def test_conference_save_invalidates(self):
+        self.get()
+        self.conference.title = 'Новое название'
+        # Словарь конференций (conferences.routing) сбрасывается после коммита
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conference.save()
+        response = self.get()
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Новое название')
+
+    def test_ready_for_print_submission_invalidates_proceedings(self):
+        submission = make_submission(
+            self.conference, final_file=SimpleUploadedFile('paper.pdf', b'%PDF-1.4\n', content_type='application/pdf'),
+        )
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'HIT')
+
+        submission.status = 'ready_for_print'
+        submission.save()
+        response = self.get('proceedings/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, submission.final_file.url)
+        # Другие страницы конференции остаются в кэше
+        self.get()
+        self.assertEqual(self.get()['X-Page-Cache'], 'HIT')
+
+    def published(self):
+        submission = make_submission(
+            self.conference, final_file=SimpleUploadedFile('paper.pdf', b'%PDF-1.4\n', content_type='application/pdf'),
+        )
+        submission.status = 'ready_for_print'
+        submission.save()
+        return submission
+
+    def test_author_rename_invalidates_proceedings(self):
+        user = self.published().user
+        self.get('proceedings/')
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'HIT')
+        user.first_name, user.last_name = 'Айгерим', 'Сапарова'
+        user.save()
+        response = self.get('proceedings/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Айгерим Сапарова')
+
+    def test_author_login_keeps_proceedings(self):
+        user = self.published().user
+        self.get('proceedings/')
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'HIT')
+
+    def test_preview_change_invalidates_proceedings(self):
+        submission = self.published()
+        preview = PdfPreview.objects.create(sha256=submission.final_file_hash, page_count=3)
+        # Воркер превью ставит ссылку через update(), без сигналов
+        Submission.objects.filter(pk=submission.pk).update(final_preview=preview)
+        self.get('proceedings/')
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'HIT')
+        preview.page_count = 12
+        preview.save()
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'HIT')
+        preview.delete()
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'MISS')
+
+    def test_registration_deadline_changes_key(self):
+        now = timezone.now()
+        self.conference.registration_deadline = now + timedelta(minutes=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conference.save()
+        self.get()
+        self.assertEqual(self.get()['X-Page-Cache'], 'HIT')
+        with mock.patch('django.utils.timezone.now', return_value=now + timedelta(minutes=2)):
+            self.assertEqual(self.get()['X-Page-Cache'], 'MISS')
+
+    def test_materials_published_on_notification_date(self):
+        # Материалы открываются по дате UTC; в Алматы это 05:00, местная дата та же
+        self.conference.notification_date = datetime(2026, 5, 11).date()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conference.save()
+        submission = self.published()
+        before = datetime(2026, 5, 10, 23, 59, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=before):
+            self.get('proceedings/')
+            self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'HIT')
+        with mock.patch('django.utils.timezone.now', return_value=before + timedelta(minutes=2)):
+            response = self.get('proceedings/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, submission.final_file.url)
+
+    def test_submission_under_review_keeps_proceedings(self):
+        submission = make_submission(self.conference)
+        self.get('proceedings/')
+        submission.title = 'Другое название'
+        submission.save()
+        self.assertEqual(self.get('proceedings/')['X-Page-Cache'], 'HIT')
+
+    def test_messages_cookie_bypasses_cache(self):
+        self.get()
+        self.client.cookies['messages'] = 'pending'
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_authenticated_user_bypasses_cache(self):
+        self.get()
+        self.client.force_login(make_submission(self.conference).user)
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
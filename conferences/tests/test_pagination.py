@@ -0,0 +1,40 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from conferences import pagination
+from conferences.models import User
+from conferences.pagination import EstimatedCountPaginator, estimated_count
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        for number in range(3):
+            User.objects.create_user(username=f'user{number}', email=f'user{number}@example.com', password='x')
+
+    @mock.patch.object(pagination, 'estimated_count', return_value=50000)
+    def test_estimate_for_unfiltered_list(self, estimate):
+        paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 100)
+        self.assertEqual(paginator.count, 50000)
+        self.assertEqual(paginator.num_pages, 500)
+        estimate.assert_called_once_with(User, 'default')
+
+    @mock.patch.object(pagination, 'estimated_count', return_value=50000)
+    def test_exact_count_when_filtered(self, estimate):
+        queryset = User.objects.filter(username__startswith='user').order_by('pk')
+        self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 3)
+        distinct = User.objects.distinct().order_by('pk')
+        self.assertEqual(EstimatedCountPaginator(distinct, 100).count, 3)
+        estimate.assert_not_called()
+
+    @mock.patch.object(pagination, 'estimated_count', return_value=500)
+    def test_exact_count_for_small_table(self, estimate):
+        self.assertEqual(EstimatedCountPaginator(User.objects.order_by('pk'), 100).count, 3)
+
+    @skipUnless(connection.vendor == 'sqlite', 'статистика SQLite')
+    def test_sqlite_statistics(self):
+        self.assertIsNone(estimated_count(User))
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {User._meta.db_table}')
+        self.assertEqual(estimated_count(User), 3)
@@ -0,0 +1,73 @@
+import os
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+from django.core.files.base import ContentFile
+
+from conferences import previews
+from conferences.models import PdfPreview
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+def pdf(pages):
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def fake_pdftoppm(args):
+    """Пишет страницы так же, как pdftoppm: <префикс>.jpg или <префикс>-<номер>.jpg."""
+    first, last = int(args[args.index('-f') + 1]), int(args[args.index('-l') + 1])
+    width = int(args[args.index('-scale-to-x') + 1])
+    prefix = args[-1]
+    names = [f'{prefix}.jpg'] if '-singlefile' in args else [
+        f'{prefix}-{number:0{len(str(last))}}.jpg' for number in range(first, last + 1)
+    ]
+    for name in names:
+        Image.new('RGB', (width, round(width * 842 / 595)), 'white').save(name, format='JPEG')
+
+
+class PdfPreviewTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.data = pdf(3)
+
+    def submit(self, username):
+        submission = make_submission(self.conference, username, final_file=ContentFile(self.data, name='paper.pdf'))
+        submission.status = 'ready_for_print'
+        submission.save()
+        return submission
+
+    @mock.patch.object(previews, '_pdftoppm', fake_pdftoppm)
+    def test_preview_with_page_count_shared_by_content(self):
+        first, second = self.submit('first'), self.submit('second')
+        self.assertEqual(previews.process_pending(), 2)
+        preview = PdfPreview.objects.get()
+        self.assertEqual((preview.sha256, preview.page_count, preview.error), (first.final_file_hash, 3, ''))
+        self.assertEqual(preview.thumbnail_width, previews.THUMBNAIL_WIDTH)
+        self.assertEqual(preview.strip_width, 3 * (previews.STRIP_PAGE_WIDTH + previews.STRIP_GAP) - previews.STRIP_GAP)
+        for submission in (first, second):
+            submission.refresh_from_db()
+            self.assertEqual(submission.final_preview, preview)
+        with preview.thumbnail.open('rb') as f, Image.open(f) as img:
+            self.assertEqual(img.format, 'WEBP')
+        self.assertEqual(previews.process_pending(), 0)
+
+    def test_missing_renderer_recorded(self):
+        submission = self.submit('first')
+        with mock.patch.object(previews.subprocess, 'run', side_effect=FileNotFoundError(os.strerror(2))):
+            self.assertEqual(previews.process_pending(), 1)
+        submission.refresh_from_db()
+        preview = submission.final_preview
+        self.assertEqual(preview.page_count, 3)
+        self.assertIn('pdftoppm', preview.error)
+        self.assertFalse(preview.thumbnail)
+        # Превью с ошибкой не строится заново при каждом проходе
+        self.assertEqual(previews.process_pending(), 0)
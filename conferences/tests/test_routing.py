@@ -0,0 +1,55 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conferences import routing
+from conferences.models import Conference
+
+from .utils import MediaTestCase, make_conference
+
+
+class RoutingTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = make_conference('old-2025', is_active=False)
+        self.conference = make_conference('math-2026')
+
+    def test_slug_lookup_without_queries(self):
+        self.assertEqual(routing.get_conference('math-2026'), self.conference)
+        self.assertIsNone(routing.get_conference('missing'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(routing.get_conference('old-2025'), self.old)
+            self.assertEqual(routing.default_conference(), self.conference)
+        self.assertEqual(len(queries), 0)
+
+    def test_pages_scoped_by_slug(self):
+        response = self.client.get('/ru/math-2026/program/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.conference, self.conference)
+        self.assertEqual(self.client.get('/ru/missing/program/').status_code, 404)
+
+    def test_reserved_slug_rejected(self):
+        with self.assertRaises(ValidationError) as error:
+            make_conference('admin')
+        self.assertIn('slug', error.exception.message_dict)
+        self.assertFalse(Conference.objects.filter(slug='admin').exists())
+
+    def test_legacy_address_redirects_to_default_conference(self):
+        response = self.client.get('/ru/program/?day=2')
+        self.assertRedirects(response, '/ru/math-2026/program/?day=2', fetch_redirect_response=False)
+
+    def test_rename_from_other_process_picked_up(self):
+        self.assertEqual(routing.get_conference('math-2026'), self.conference)
+        # Другой воркер переименовал конференцию: сигналы этого процесса не срабатывают
+        Conference.objects.filter(pk=self.conference.pk).update(
+            slug='math-2026-spring', updated_at=timezone.now() + timedelta(seconds=1),
+        )
+        # До истечения CHECK_INTERVAL отпечаток не сверяется
+        self.assertIsNotNone(routing.get_conference('math-2026'))
+        with mock.patch.object(routing, 'CHECK_INTERVAL', 0):
+            self.assertIsNone(routing.get_conference('math-2026'))
+            self.assertEqual(routing.get_conference('math-2026-spring').pk, self.conference.pk)
@@ -0,0 +1,73 @@
+from conferences.models import Submission, User
+from conferences.search import highlight, parse_query, rank_submissions, search_snippets, search_submissions
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+
+class SearchTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.graphs = make_submission(
+            self.conference, 'graphs', title='Раскраска графов', abstract_text='Жадные алгоритмы на графах',
+        )
+        self.climate = make_submission(
+            self.conference, 'climate', title='Модели климата', abstract_text='Нейросети для прогноза',
+        )
+
+    def titles(self, queryset):
+        return sorted(queryset.values_list('title', flat=True))
+
+    def test_parse_query(self):
+        self.assertEqual(parse_query('Графы  "графы" OR климат*'), ['графы', 'or', 'климат'])
+
+    def test_search_by_word_and_prefix(self):
+        submissions = Submission.objects.all()
+        self.assertEqual(self.titles(search_submissions(submissions, 'алгоритмы')), ['Раскраска графов'])
+        self.assertEqual(self.titles(search_submissions(submissions, 'граф')), ['Раскраска графов'])
+        self.assertEqual(self.titles(search_submissions(submissions, 'КЛИМАТ')), ['Модели климата'])
+        self.assertEqual(self.titles(search_submissions(submissions, 'граф климат')), [])
+        self.assertEqual(self.titles(search_submissions(submissions, '')), [])
+
+    def test_search_respects_queryset(self):
+        submissions = Submission.objects.exclude(pk=self.graphs.pk)
+        self.assertEqual(self.titles(search_submissions(submissions, 'граф')), [])
+
+    def test_author_profile_change_reindexes(self):
+        user = self.climate.user
+        user.organization = 'Институт географии'
+        user.save()
+        self.assertEqual(self.titles(search_submissions(Submission.objects.all(), 'географии')), ['Модели климата'])
+
+    def test_rank_and_snippets(self):
+        page = rank_submissions(Submission.objects.all(), 'граф', 10)
+        self.assertEqual([submission.pk for submission in page], [self.graphs.pk])
+        self.assertTrue(hasattr(page[0], 'search_rank'))
+        snippet = search_snippets([self.graphs.pk], 'граф')[self.graphs.pk]
+        self.assertIn('<mark>графов</mark>', snippet)
+
+    def test_highlight_escapes(self):
+        self.assertEqual(highlight('<b>граф</b>', 'граф'), '&lt;b&gt;<mark>граф</mark>&lt;/b&gt;')
+
+
+class SubmissionAdminSearchTests(MediaTestCase):
+    url = '/ru/admin/conferences/submission/'
+
+    def setUp(self):
+        super().setUp()
+        conference = make_conference()
+        self.submission = make_submission(conference, 'a', title='Раскраска графов')
+        make_submission(conference, 'b', title='Модели климата')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+    def found(self, query):
+        response = self.client.get(self.url, {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return list(response.context['cl'].result_list)
+
+    def test_full_text(self):
+        self.assertEqual(self.found('граф'), [self.submission])
+
+    def test_author_email(self):
+        # Email не входит в поисковый текст, поиск по нему — через search_fields
+        self.assertEqual(self.found('a@example.com'), [self.submission])
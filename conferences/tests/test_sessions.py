@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from conferences.sessions import expired_sessions, purge_expired
+
+
+class PurgeSessionsTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for number in range(5):
+            Session.objects.create(session_key=f'expired{number}', session_data='', expire_date=now - timedelta(days=1))
+        for number in range(2):
+            Session.objects.create(session_key=f'active{number}', session_data='', expire_date=now + timedelta(days=1))
+
+    def test_purged_in_batches(self):
+        self.assertEqual(purge_expired(batch_size=2), 2)
+        self.assertEqual(expired_sessions().count(), 3)
+        self.assertEqual(purge_expired(batch_size=2), 2)
+        self.assertEqual(purge_expired(batch_size=2), 1)
+        self.assertEqual(purge_expired(batch_size=2), 0)
+        self.assertEqual(set(Session.objects.values_list('session_key', flat=True)), {'active0', 'active1'})
+
+    def test_command_leaves_unexpired_sessions(self):
+        call_command('purge_sessions', '--batch-size', '2', '--pause', '0')
+        self.assertFalse(expired_sessions().exists())
+        self.assertEqual(Session.objects.count(), 2)
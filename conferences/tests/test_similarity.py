@@ -0,0 +1,65 @@
+import random
+
+from conferences.models import ManuscriptText, SubmissionVersion
+from conferences.similarity import MIN_SIMILARITY, find_duplicates, index_manuscript, pending_manuscripts
+
+from .utils import MediaTestCase, make_conference, make_submission
+
+VOCABULARY = [f'слово{number}' for number in range(2000)]
+
+
+def words(count, seed):
+    generator = random.Random(seed)
+    return [generator.choice(VOCABULARY) for _ in range(count)]
+
+
+def edited(text, every):
+    # Каждое every-е слово заменено: чем чаще правки, тем меньше общих шинглов
+    return [('правка' if number % every == 0 else word) for number, word in enumerate(text)]
+
+
+class NearDuplicateTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.conference = make_conference()
+        self.original = words(400, seed=1)
+        self.submission = self.submit('original', self.original)
+
+    def submit(self, username, text):
+        manuscript = ManuscriptText.objects.create(sha256=f'{username:0>64}', text=' '.join(text))
+        index_manuscript(manuscript)
+        submission = make_submission(self.conference, username)
+        # Хэш задан, поэтому файл не читается
+        SubmissionVersion.objects.create(
+            submission=submission, file=f'blobs/{username}.docx', file_hash=manuscript.sha256, manuscript=manuscript,
+        )
+        return submission
+
+    def found(self, **kwargs):
+        return {item['submission'].pk: item['similarity'] for item in find_duplicates(self.submission, **kwargs)}
+
+    def test_near_copy_found_above_threshold(self):
+        copy = self.submit('copy', edited(self.original, 50))
+        self.assertEqual(list(self.found()), [copy.pk])
+        self.assertGreater(self.found()[copy.pk], 0.7)
+
+    def test_rewritten_and_unrelated_texts_not_found(self):
+        rewritten = self.submit('rewritten', edited(self.original, 10))
+        self.submit('unrelated', words(400, seed=2))
+        self.assertEqual(self.found(), {})
+        # Ниже порога MIN_SIMILARITY, даже если работа и попала в кандидаты LSH
+        self.assertLess(self.found(min_similarity=0).get(rewritten.pk, 0), MIN_SIMILARITY)
+
+    def test_same_file_in_other_submission(self):
+        manuscript = ManuscriptText.objects.get(versions__submission=self.submission)
+        other = make_submission(self.conference, 'resubmitted')
+        SubmissionVersion.objects.create(
+            submission=other, file='blobs/same.docx', file_hash=manuscript.sha256, manuscript=manuscript,
+        )
+        self.assertEqual(self.found(), {other.pk: 1.0})
+
+    def test_indexed_once(self):
+        self.assertFalse(pending_manuscripts().exists())
+        empty = ManuscriptText.objects.create(sha256='e' * 64, text='...')
+        index_manuscript(empty)
+        self.assertFalse(pending_manuscripts().exists())
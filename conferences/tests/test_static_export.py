@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+from django.test import Client, override_settings
+
+from conferences.page_cache import get_cache
+from conferences.static_export import SITEMAP_NAME, export
+
+from .utils import MediaTestCase, make_conference
+
+
+class StaticExportTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.output = tempfile.mkdtemp(prefix='test_static_site_')
+        self.addCleanup(shutil.rmtree, self.output, ignore_errors=True)
+        self.conference = make_conference()
+
+    def read(self, path):
+        with open(os.path.join(self.output, path, 'index.html'), encoding='utf-8') as f:
+            return f.read()
+
+    def test_pages_written_with_language_links(self):
+        self.assertGreater(export(self.output), 0)
+        html = self.read(f'ru/{self.conference.slug}/committee')
+        self.assertIn(f'href="/en/{self.conference.slug}/committee/"', html)
+        self.assertIn(f'href="/kk/{self.conference.slug}/committee/"', html)
+        self.assertNotIn('csrfmiddlewaretoken', html)
+        self.assertNotIn('/i18n/setlang/', html)
+        self.assertTrue(os.path.exists(os.path.join(self.output, SITEMAP_NAME)))
+
+    def test_unchanged_pages_not_rendered_again(self):
+        export(self.output)
+        self.assertEqual(export(self.output), 0)
+        # Клиент оставляет активным язык последнего запроса, поэтому поле перевода — явно
+        self.conference.title_ru = 'Новое название'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conference.save()
+        self.assertGreater(export(self.output), 0)
+        self.assertIn('Новое название', self.read(f'ru/{self.conference.slug}'))
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_export_bypasses_page_cache(self):
+        get_cache().clear()
+        client = Client()
+        client.get(f'/ru/{self.conference.slug}/committee/')
+        export(self.output)
+        self.assertNotIn('/i18n/setlang/', self.read(f'ru/{self.conference.slug}/committee'))
+        # В кэше осталась страница с формой для обычных посетителей
+        response = client.get(f'/ru/{self.conference.slug}/committee/')
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertContains(response, '/i18n/setlang/')
+
+    def test_site_keeps_language_form_with_csrf(self):
+        response = self.client.get(f'/ru/{self.conference.slug}/committee/')
+        self.assertContains(response, '/i18n/setlang/')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        client = Client(enforce_csrf_checks=True)
+        self.assertEqual(client.post('/i18n/setlang/', {'language': 'en', 'next': '/en/'}).status_code, 403)
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+
+from PIL import Image
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone, translation
+
+from conferences import routing
+from conferences.models import Conference, Submission, User
+
+
+def poster():
+    output = BytesIO()
+    Image.new('RGB', (8, 4), 'white').save(output, format='PNG')
+    return SimpleUploadedFile('poster.png', output.getvalue(), content_type='image/png')
+
+
+def make_conference(slug='test', **fields):
+    now = timezone.now()
+    defaults = {
+        'title': 'Тестовая конференция',
+        'short_title': 'ТК',
+        'description': '<p>Описание</p>',
+        'location': 'Алматы',
+        'start_date': (now + timedelta(days=60)).date(),
+        'registration_deadline': now + timedelta(days=30),
+        'notification_date': (now + timedelta(days=45)).date(),
+        'program': '<p>Программа</p>',
+        'poster': poster(),
+    }
+    defaults.update(fields)
+    # Переводимые поля заполняются на языке по умолчанию, как в админке
+    with translation.override(settings.LANGUAGE_CODE):
+        return Conference.objects.create(slug=slug, **defaults)
+
+
+def make_submission(conference, username='author', **fields):
+    user = User.objects.create_user(username=username, email=f'{username}@example.com', password='x')
+    fields.setdefault('title', 'Работа')
+    return Submission.objects.create(user=user, conference=conference, **fields)
+
+
+class MediaMixin:
+    """Временный MEDIA_ROOT на класс тестов и свежий словарь конференций (conferences.routing)."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._media_root = tempfile.mkdtemp(prefix='test_media_')
+        cls._media_override = override_settings(MEDIA_ROOT=cls._media_root)
+        cls._media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._media_override.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+
+    def setUp(self):
+        # Тесты не фиксируют транзакции, поэтому сброс по on_commit не срабатывает
+        routing.invalidate()
+        # Тестовый клиент оставляет активным язык последнего запроса
+        translation.activate(settings.LANGUAGE_CODE)
+
+
+class MediaTestCase(MediaMixin, TestCase):
+    pass
@@ -19,6 +19,12 @@ class ConferenceTranslationOptions(TranslationOptions):
         'committee',
         'participation_fee',
         'submission_format',
+        'description_html',
+        'location_description_html',
+        'program_html',
+        'committee_html',
+        'participation_fee_html',
+        'submission_format_html',
     )
 
 @register(Document)
@@ -1,25 +1,21 @@
-from django.urls import path
+from django.urls import include, path
 from django.contrib.auth import views as auth_views
 from . import views, views_organizer
 from .api import active_conferences_api
 
 app_name = 'conferences'
 
-urlpatterns = [
+# Страницы конкретной конференции: /<slug>/program/ и т.д. Конференцию по slug
+# подставляет ConferenceMiddleware в request.conference
+conference_patterns = [
     path('', views.conference_detail, name='detail'),
-    
-    path('register/', views.register, name='register'),
-    path('login/', views.UserLoginView.as_view(), name='login'),
-    path('logout/', auth_views.LogoutView.as_view(), name='logout'),
-    path('profile/', views.profile_view, name='profile'),
-    
+
     path('submit/', views.submit_work, name='submit'),
-    path('submission/<int:submission_id>/resubmit/', views.resubmit_work, name='resubmit'),
-    
+
     path('management/submissions/', views_organizer.submission_management_list, name='submission_management_list'),
     path('management/submissions/<int:submission_id>/', views_organizer.submission_management_detail, name='submission_management_detail'),
     path('management/submissions/<int:submission_id>/update/', views_organizer.update_submission_status, name='update_submission_status'),
-    
+
     path('program/', views.conference_program, name='program'),
     path('committee/', views.conference_committee, name='committee'),
     path('gallery/', views.conference_gallery, name='gallery'),
@@ -29,8 +25,44 @@ urlpatterns = [
     path('contacts/', views.conference_contacts, name='contacts'),
     path('participation-fee/', views.participation_fee, name='participation_fee'),
     path('submission-format/', views.submission_format, name='submission_format'),
+]
+
+# Адреса до появления нескольких конференций ведут на страницы конференции по умолчанию
+LEGACY_PAGES = (
+    ('submit/', 'submit'),
+    ('management/submissions/', 'submission_management_list'),
+    ('program/', 'program'),
+    ('committee/', 'committee'),
+    ('gallery/', 'gallery'),
+    ('proceedings/', 'proceedings'),
+    ('venue/', 'venue'),
+    ('documentation/', 'documentation'),
+    ('contacts/', 'contacts'),
+    ('participation-fee/', 'participation_fee'),
+    ('submission-format/', 'submission_format'),
+)
+
+urlpatterns = [
+    path('', views.home, name='home'),
+
+    path('register/', views.register, name='register'),
+    path('login/', views.UserLoginView.as_view(), name='login'),
+    path('logout/', auth_views.LogoutView.as_view(), name='logout'),
+    path('profile/', views.profile_view, name='profile'),
+
+    path('submission/<int:submission_id>/resubmit/', views.resubmit_work, name='resubmit'),
+    path('version/<int:version_id>/download/', views.download_version, name='download_version'),
+
     path('privacy/', views.privacy_policy, name='privacy'),
     path('terms/', views.terms, name='terms'),
-    
+
     path('api/conferences/', active_conferences_api, name='api_conferences'),
-]
\ No newline at end of file
+]
+
+urlpatterns += [
+    path(route, views.legacy_redirect, {'url_name': url_name}) for route, url_name in LEGACY_PAGES
+]
+
+urlpatterns += [
+    path('<slug:conference_slug>/', include(conference_patterns)),
+]
@@ -1,23 +1,37 @@
+import os
+
 from django.utils import timezone
+from django.http import FileResponse, Http404
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
+from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
-from .models import Conference, Submission, SubmissionVersion, Proceedings
+from .models import Conference, Submission, SubmissionVersion, Proceedings, Keyword
 from django.contrib.auth import login
 from .forms import RegistrationForm, SubmissionForm
 from django.contrib import messages
-from django.db.models import Prefetch
+from django.db.models import Prefetch, Count
 from django.contrib.auth.views import LoginView
 from django.utils.translation import gettext as _
+from asgiref.sync import sync_to_async
+from .metrics import UPLOAD_BYTES
+from .routing import default_conference
+from .conditional import conditional_page
+
+# Контекст-процессоры и request.user в шаблонах обращаются к БД синхронно,
+# поэтому асинхронные представления рендерят шаблон в отдельном потоке
+arender = sync_to_async(render)
 
 
 def register(request):
-    conference = Conference.get_current()
+    conference = default_conference()
 
     if request.method == 'POST':
         form = RegistrationForm(request.POST)
         if form.is_valid():
             user = form.save(commit=False)
             user.set_password(form.cleaned_data['password'])
+            user.language = request.LANGUAGE_CODE
             user.save()
             login(request, user, backend='conferences.backends.EmailOrUsernameModelBackend')
             return redirect('conferences:profile')
@@ -30,11 +44,11 @@ def register(request):
 
 @login_required
 def submit_work(request):
-    conference = Conference.get_current()
+    conference = request.conference
     
     if conference.registration_deadline < timezone.now():
         messages.error(request, _("Срок подачи заявок на эту конференцию истек."))
-        return redirect('conferences:detail')
+        return redirect('conferences:detail', conference.slug)
 
     if Submission.objects.filter(user=request.user, conference=conference).exists():
         messages.warning(request, _("Вы уже подали заявку на эту конференцию."))
@@ -48,6 +62,7 @@ def submit_work(request):
             submission.conference = conference
             submission.save()
             
+            UPLOAD_BYTES.labels('submission').inc(form.cleaned_data['file'].size)
             SubmissionVersion.objects.create(
                 submission=submission,
                 file=form.cleaned_data['file'],
@@ -65,6 +80,24 @@ def submit_work(request):
         'conference': conference
     })
 
+@login_required
+def download_version(request, version_id):
+    """Файл версии работы: автору, оргкомитету и назначенным рецензентам. Сжатые версии распаковываются на лету."""
+    version = get_object_or_404(SubmissionVersion.objects.select_related('submission'), id=version_id)
+    submission = version.submission
+    if not (
+        submission.user_id == request.user.id
+        or request.user.is_organizer
+        or submission.review_assignments.filter(reviewer=request.user).exists()
+    ):
+        raise PermissionDenied
+    if not version.file:
+        raise Http404
+    ext = os.path.splitext(version.file.name)[1]
+    return FileResponse(
+        version.file.open('rb'), as_attachment=True, filename=f'{submission.id}_v{version.version_number}{ext}'
+    )
+
 @login_required
 def resubmit_work(request, submission_id):
     submission = get_object_or_404(Submission, id=submission_id, user=request.user)
@@ -84,6 +117,7 @@ def resubmit_work(request, submission_id):
         if new_file:
             new_version_num = (last_version.version_number + 1) if last_version else 1
             
+            UPLOAD_BYTES.labels('submission').inc(new_file.size)
             SubmissionVersion.objects.create(
                 submission=submission,
                 file=new_file,
@@ -104,84 +138,133 @@ def resubmit_work(request, submission_id):
         'last_version': last_version
     })
 
-def conference_detail(request):
-    conference = Conference.get_current()
+def home(request):
+    conference = default_conference()
+    if conference is None:
+        raise Http404("Конференции еще не созданы")
+    return redirect('conferences:detail', conference.slug)
+
+
+def legacy_redirect(request, url_name):
+    """Старые адреса без slug ведут на ту же страницу конференции по умолчанию."""
+    conference = default_conference()
+    if conference is None:
+        raise Http404("Конференции еще не созданы")
+    url = reverse(f'conferences:{url_name}', args=[conference.slug])
+    query = request.META.get('QUERY_STRING')
+    return redirect(f'{url}?{query}' if query else url)
+
+
+@conditional_page('detail')
+async def conference_detail(request):
+    conference = request.conference
     user_submission = None
-    if request.user.is_authenticated:
-        user_submission = Submission.objects.filter(user=request.user, conference=conference).first()
+    user = await request.auser()
+    if user.is_authenticated:
+        user_submission = await Submission.objects.filter(user=user, conference=conference).afirst()
     
     # Логика для таймера (передаем в контекст)
     now = timezone.now()
     
-    return render(request, 'conferences/detail.html', {
+    return await arender(request, 'conferences/detail.html', {
         'conference': conference,
         'user_submission': user_submission,
         'now': now
     })
 
-def conference_program(request):
-    conference = Conference.get_current()
-    return render(request, 'conferences/program.html', {'conference': conference})
+@conditional_page('program')
+async def conference_program(request):
+    conference = request.conference
+    return await arender(request, 'conferences/program.html', {'conference': conference})
 
-def conference_committee(request):
-    conference = Conference.get_current()
-    committee_members = conference.committee_members.all().order_by('order', 'full_name')
-    return render(request, 'conferences/committee.html', {
+@conditional_page('committee')
+async def conference_committee(request):
+    conference = request.conference
+    committee_members = [
+        member async for member in conference.committee_members.all().order_by('order', 'full_name')
+    ]
+    return await arender(request, 'conferences/committee.html', {
         'conference': conference,
         'committee_members': committee_members
     })
 
-def conference_gallery(request):
-    conference = Conference.get_current()
-    media = conference.media.all()
-    return render(request, 'conferences/gallery.html', {'conference': conference, 'media': media})
+@conditional_page('gallery')
+async def conference_gallery(request):
+    conference = request.conference
+    media = [item async for item in conference.media.all()]
+    return await arender(request, 'conferences/gallery.html', {'conference': conference, 'media': media})
 
-def conference_proceedings(request):
-    conference = Conference.get_current()
-    proceeding = Proceedings.objects.filter(conference=conference).first()
+@conditional_page('proceedings')
+async def conference_proceedings(request):
+    conference = request.conference
+    proceeding = await Proceedings.objects.filter(conference=conference).select_related('preview').afirst()
     is_released = timezone.now().date() >= conference.notification_date
     submissions = []
+    facets = []
+    active_keyword = request.GET.get('keyword', '').strip().lower()
     if is_released:
-        submissions = Submission.objects.filter(conference=conference, status='ready_for_print').prefetch_related('versions').order_by('title')
+        published = Submission.objects.filter(conference=conference, status='ready_for_print')
+        # Все фасеты с числом работ — одним запросом с группировкой
+        facets = [
+            keyword async for keyword in Keyword.objects.filter(submissions__in=published)
+            .annotate(count=Count('submissions')).order_by('-count', 'name')
+        ]
+        if active_keyword:
+            published = published.filter(keyword_set__name=active_keyword)
+        submissions = [
+            sub async for sub in published.select_related('user', 'final_preview').order_by('title')
+        ]
+        if proceeding:
+            # Номер первой страницы работы в сборнике — для ссылок в веб-просмотр
+            first_pages = {paper['submission']: paper['first_page'] for paper in proceeding.page_index}
+            for sub in submissions:
+                sub.volume_page = first_pages.get(sub.id)
         
-    return render(request, 'conferences/proceedings.html', {
+    return await arender(request, 'conferences/proceedings.html', {
         'conference': conference, 
         'is_released': is_released,
         'submissions': submissions,
+        'facets': facets,
+        'active_keyword': active_keyword,
         'proceeding': proceeding
     })
     
-def conference_venue(request):
-    conference = Conference.get_current()
-    return render(request, 'conferences/venue.html', {'conference': conference})
-
-def conference_documentation(request):
-    conference = Conference.get_current()
-    documents = conference.documents.all()
-    return render(request, 'conferences/documentation.html', {
+@conditional_page('venue')
+async def conference_venue(request):
+    conference = request.conference
+    return await arender(request, 'conferences/venue.html', {'conference': conference})
+
+@conditional_page('documentation')
+async def conference_documentation(request):
+    conference = request.conference
+    documents = [document async for document in conference.documents.all()]
+    return await arender(request, 'conferences/documentation.html', {
         'conference': conference,
         'documents': documents
     })
 
-def conference_contacts(request):
-    conference = Conference.get_current()
-    contacts = conference.contacts.all()
-    return render(request, 'conferences/contacts.html', {
+@conditional_page('contacts')
+async def conference_contacts(request):
+    conference = request.conference
+    contacts = [contact async for contact in conference.contacts.all()]
+    return await arender(request, 'conferences/contacts.html', {
         'conference': conference,
         'contacts': contacts
     })
 
+@conditional_page('participation_fee')
 def participation_fee(request):
-    conference = Conference.get_current()
+    conference = request.conference
     return render(request, 'conferences/participation_fee.html', {'conference': conference})
 
+@conditional_page('submission_format')
 def submission_format(request):
-    conference = Conference.get_current()
+    conference = request.conference
     return render(request, 'conferences/submission_format.html', {'conference': conference})
 
 @login_required
 def profile_view(request):
-    conference = Conference.get_current()
+    conference = default_conference()
     
     submissions = Submission.objects.filter(user=request.user)\
         .select_related('conference')\
@@ -199,17 +282,19 @@ class UserLoginView(LoginView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['conference'] = Conference.get_current()
+        context['conference'] = default_conference()
         return context
 
+@conditional_page('privacy')
 def privacy_policy(request):
-    conference = Conference.get_current()
+    conference = default_conference()
     return render(request, 'conferences/privacy.html', {
         'conference': conference
     })
 
+@conditional_page('terms')
 def terms(request):
-    conference = Conference.get_current()
+    conference = default_conference()
     return render(request, 'conferences/terms.html', {
         'conference': conference
     })
\ No newline at end of file
@@ -1,10 +1,20 @@
 from django.contrib import messages
+from django.db import transaction
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Conference, Submission
+from django.db.models import Prefetch
+import logging
+from .models import ReviewAssignment, Submission, SubmissionVersion
+from .search import rank_submissions, search_snippets, highlight
+from .similarity import find_duplicates
 from django.utils.translation import gettext as _
 
+logger = logging.getLogger(__name__)
+
+SEARCH_RESULTS_LIMIT = 100
+
+
 def organizer_required(view_func):
     def _wrapped_view(request, *args, **kwargs):
         if request.user.is_authenticated and request.user.is_organizer:
@@ -12,22 +22,37 @@ def organizer_required(view_func):
         raise PermissionDenied
     return _wrapped_view
 
+def reviewer_required(view_func):
+    # Рецензенты видят только назначенные им работы (см. reviewer_scope)
+    def _wrapped_view(request, *args, **kwargs):
+        if request.user.is_authenticated and (request.user.is_organizer or request.user.is_reviewer):
+            return view_func(request, *args, **kwargs)
+        raise PermissionDenied
+    return _wrapped_view
+
+def reviewer_scope(request, submissions):
+    if request.user.is_organizer:
+        return submissions
+    return submissions.filter(review_assignments__reviewer=request.user)
+
 @login_required
-@organizer_required
+@reviewer_required
 def submission_management_list(request):
-    conference = Conference.get_current()
+    conference = request.conference
     status_filter = request.GET.get('status')
     
     proceedings = conference.proceedings_archive.first()
-    if request.method == 'POST' and 'create_proceedings' in request.POST:
+    if request.method == 'POST' and 'create_proceedings' in request.POST and request.user.is_organizer:
         if not proceedings:
             from .services import create_conference_proceedings
             create_conference_proceedings(conference.id)
             messages.success(request, _("Сборник успешно сформирован."))
-            return redirect('conferences:submission_management_list')
+            return redirect('conferences:submission_management_list', conference.slug)
         
     
-    submissions = Submission.objects.filter(conference=conference).select_related('user')
+    submissions = reviewer_scope(
+        request, Submission.objects.filter(conference=conference).select_related('user', 'final_preview')
+    )
     total_count = submissions.count()
     
     status_counts = {}
@@ -39,6 +64,15 @@ def submission_management_list(request):
     
     if status_filter:
         submissions = submissions.filter(status=status_filter)
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        # Самые релевантные результаты; подсветка только для выводимых строк
+        submissions = rank_submissions(submissions.defer('search_document'), query, SEARCH_RESULTS_LIMIT)
+        snippets = search_snippets([sub.id for sub in submissions], query)
+        for sub in submissions:
+            sub.title_highlighted = highlight(sub.title, query)
+            sub.snippet = snippets.get(sub.id) or highlight(sub.abstract_text, query, snippet=True)
     
     status_choices = Submission.STATUS_CHOICES
     
@@ -50,45 +84,63 @@ def submission_management_list(request):
         'status_choices_with_counts': status_choices_with_counts,
         'status_counts': status_counts,
         'total_submissions_count': total_count,
-        'current_status': status_filter
+        'current_status': status_filter,
+        'query': query,
     })
 
 @login_required
-@organizer_required
+@reviewer_required
 def submission_management_detail(request, submission_id):
-    conference = Conference.get_current()
+    conference = request.conference
+    versions = SubmissionVersion.objects.select_related('manuscript', 'format_report').defer('manuscript__text')
     submission = get_object_or_404(
-        Submission.objects.prefetch_related('versions'), 
+        reviewer_scope(
+            request,
+            Submission.objects.select_related('final_preview').prefetch_related(Prefetch('versions', queryset=versions)),
+        ),
         id=submission_id, 
         conference=conference
     )
+    assignments = []
+    duplicates = []
+    if request.user.is_organizer:
+        assignments = ReviewAssignment.objects.filter(submission=submission).select_related('reviewer')
+        # Похожие работы — с названиями и авторами, в том числе чужих конференций: рецензентам их не показываем
+        duplicates = find_duplicates(submission)
     
     return render(request, 'conferences/management/submission_detail.html', {
         'conference': conference,
         'submission': submission,
+        'duplicates': duplicates,
+        'assignments': assignments,
     })
 
 @login_required
 @organizer_required
 def update_submission_status(request, submission_id):
     if request.method == 'POST':
-        submission = get_object_or_404(Submission, id=submission_id)
+        submission = get_object_or_404(Submission, id=submission_id, conference=request.conference)
         new_status = request.POST.get('new_status')
         comment = request.POST.get('comment', '')
-        print("Recieved next data from form: ", new_status, comment)
+        logger.debug(f"Смена статуса заявки #{submission.pk}: {submission.status} → {new_status}")
+
+        # Комментарий сохраняется до смены статуса, чтобы попасть в письмо автору.
+        # PDF для статуса «Готово к печати» конвертируется уже после коммита (Submission.save)
+        with transaction.atomic():
+            if comment and new_status == 'revision':
+                last_version = submission.versions.order_by('-created_at').first()
+                if last_version:
+                    last_version.admin_comment = comment
+                    last_version.save()
+
+            submission.status = new_status
+            submission.save()
 
-        submission.status = new_status
-        submission.save()
-        
         if comment and new_status == 'revision':
-            last_version = submission.versions.order_by('-created_at').first()
-            if last_version:
-                last_version.admin_comment = comment
-                last_version.save()
             messages.info(request, _("Замечания отправлены автору."))
 
         messages.success(request, _("Статус изменен на: {}").format(submission.get_status_display()))
         
-        return redirect('conferences:submission_management_detail', submission_id=submission.id)
+        return redirect('conferences:submission_management_detail', request.conference.slug, submission.id)
     
-    return redirect('conferences:submission_management_list')
\ No newline at end of file
+    return redirect('conferences:submission_management_list', request.conference.slug)
\ No newline at end of file
@@ -3,5 +3,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kaznu_center_conference.settings')
+# Настройки по умолчанию для ASGI (CONN_MAX_AGE в settings.py)
+os.environ['DJANGO_ASGI'] = '1'
 
 application = get_asgi_application()
@@ -23,6 +23,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'conferences.middleware.RequestIdMiddleware',
+    'conferences.middleware.ReplicaRoutingMiddleware',
+    'conferences.middleware.ProfilingMiddleware',
+    'conferences.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -30,6 +34,8 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'conferences.middleware.ConferenceMiddleware',
+    'conferences.middleware.AnonymousPageCacheMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -48,6 +54,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'conferences.context_processors.latest_conference',
                 'conferences.context_processors.base_site',
+                'conferences.context_processors.static_language_links',
             ],
         },
     },
@@ -63,9 +70,59 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # Постоянные соединения с проверкой перед повторным использованием. Под ASGI (asgi.py)
+        # по умолчанию 0: асинхронные представления обращаются к БД из разных потоков,
+        # и незакрытые соединения копились бы; вместо них — пул (DB_POOL)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0 if os.getenv('DJANGO_ASGI') == '1' else 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Встроенный пул psycopg 3 (только PostgreSQL); с пулом CONN_MAX_AGE должен быть 0
+if str(os.getenv('DB_POOL')) == '1':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+
+# Реплика для чтения: публичные страницы, API и экспорт. Запись и чтение после записи идут на основную БД
+if os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME'),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['conferences.db_router.PrimaryReplicaRouter']
+    DB_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', 15))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Сессии: db (по умолчанию) — чтение django_session на каждый запрос авторизованного пользователя;
+# cached_db — чтение из кэша, запись и в кэш, и в БД; cache — только кэш, без БД. Для cache и
+# cached_db нужен общий для всех воркеров кэш (Redis, Memcached), а не LocMemCache: иначе
+# пользователя будет разлогинивать при попадании на другой воркер (cache) или сессии будут читаться из БД (cached_db)
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+if os.getenv('SESSION_CACHE_LOCATION'):
+    # Отдельный кэш, чтобы вытеснение страниц из кэша не разлогинивало пользователей
+    CACHES['sessions'] = {
+        'BACKEND': os.getenv('SESSION_CACHE_BACKEND', CACHES['default']['BACKEND']),
+        'LOCATION': os.getenv('SESSION_CACHE_LOCATION'),
+    }
+    SESSION_CACHE_ALIAS = 'sessions'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -104,6 +161,15 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Холодный архив медиафайлов прошедших конференций (manage.py archive_conference), обычно другой том
+ARCHIVE_ROOT = os.getenv('ARCHIVE_ROOT', str(BASE_DIR / 'archive'))
+# Статическая копия публичных страниц (manage.py export_static_site)
+STATIC_EXPORT_ROOT = os.getenv('STATIC_EXPORT_ROOT', str(BASE_DIR / 'static_site'))
+
+STORAGES = {
+    'default': {'BACKEND': 'conferences.storage.ArchiveAwareStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -146,7 +212,13 @@ CKEDITOR_5_CONFIGS = {
         }
     }
 }
-CKEDITOR_5_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+CKEDITOR_5_FILE_STORAGE = "conferences.storage.CKEditorImageStorage"
+# Изображения из редактора: наибольшая сторона, качество WebP, бюджет времени на обработку (секунды),
+# наибольшее число пикселей для декодирования (больше — файл сохраняется как есть)
+CKEDITOR_IMAGE_MAX_SIDE = int(os.getenv('CKEDITOR_IMAGE_MAX_SIDE', 1920))
+CKEDITOR_IMAGE_QUALITY = int(os.getenv('CKEDITOR_IMAGE_QUALITY', 80))
+CKEDITOR_IMAGE_TIME_BUDGET = float(os.getenv('CKEDITOR_IMAGE_TIME_BUDGET', 5))
+CKEDITOR_IMAGE_MAX_PIXELS = int(os.getenv('CKEDITOR_IMAGE_MAX_PIXELS', 50_000_000))
 
 AUTHENTICATION_BACKENDS = [
     'conferences.backends.EmailOrUsernameModelBackend',
@@ -167,6 +239,17 @@ LOGOUT_REDIRECT_URL = 'conferences:detail'
 
 BASE_SITE = os.getenv('BASE_SITE')
 
+# Почта для уведомлений (отправляет воркер: python manage.py send_notifications --loop)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'sent_emails'))
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = str(os.getenv('EMAIL_USE_TLS')) == '1'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 30))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
+
 RECAPTCHA_PUBLIC_KEY = os.getenv('RECAPTCHA_PUBLIC_KEY')
 RECAPTCHA_PRIVATE_KEY = os.getenv('RECAPTCHA_PRIVATE_KEY')
 
@@ -189,17 +272,18 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
-        'file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(BASE_DIR, 'debug.log'),
-            'formatter': 'verbose',
-            'encoding': 'utf-8',
+        # Консоль + JSON-файл с ротацией; запись на диск идет в отдельном потоке
+        'queue': {
+            'class': 'conferences.log.QueueListenerHandler',
+            'filename': os.getenv('LOG_FILE', os.path.join(BASE_DIR, 'debug.log')),
+            'max_bytes': int(os.getenv('LOG_MAX_BYTES', 20 * 1024 * 1024)),
+            'backup_count': int(os.getenv('LOG_BACKUP_COUNT', 14)),
+            'when': os.getenv('LOG_ROTATE_WHEN', 'midnight'),
         },
     },
     'loggers': {
         'conferences': { 
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -214,11 +298,34 @@ LOGGING = {
             'propagate': False,
         },
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'ERROR',
             'propagate': False,
         },
     },
 }
 
-X_FRAME_OPTIONS = 'SAMEORIGIN'
\ No newline at end of file
+X_FRAME_OPTIONS = 'SAMEORIGIN'
+
+# Профилирование запросов (Server-Timing + выборочные дампы cProfile)
+PROFILING_ENABLED = str(os.getenv('PROFILING_ENABLED')) == '1'
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SLOW_THRESHOLD_MS = int(os.getenv('PROFILING_SLOW_THRESHOLD_MS', '500'))
+PROFILING_DUMP_DIR = os.getenv('PROFILING_DUMP_DIR', os.path.join(BASE_DIR, 'profiles'))
+# Заголовок Server-Timing видят только сотрудники (is_staff) и запросы с этих адресов
+INTERNAL_IPS = [ip for ip in os.getenv('INTERNAL_IPS', '').split(',') if ip]
+# Обратные прокси, которым доверяется X-Forwarded-For (см. conferences/remote.py)
+TRUSTED_PROXIES = [ip for ip in os.getenv('TRUSTED_PROXIES', '127.0.0.1').split(',') if ip]
+
+# Метрики Prometheus (/metrics). Для нескольких воркеров gunicorn задайте PROMETHEUS_MULTIPROC_DIR
+METRICS_ENABLED = str(os.getenv('METRICS_ENABLED')) == '1'
+METRICS_ALLOWED_IPS = [ip for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1').split(',') if ip]
+# Если задан, Prometheus должен передавать Authorization: Bearer <токен>
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_QUEUE_CACHE_SECONDS = int(os.getenv('METRICS_QUEUE_CACHE_SECONDS', 15))
+
+# Кэш полных страниц для анонимных посетителей (сбрасывается при изменении контента в админке)
+PAGE_CACHE_ENABLED = str(os.getenv('PAGE_CACHE_ENABLED')) == '1'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', 600))
+# Сколько секунд общий кэш (nginx, CDN) отдает публичную страницу анонимным посетителям без перепроверки
+PROXY_CACHE_MAX_AGE = int(os.getenv('PROXY_CACHE_MAX_AGE', 60))